@@ -0,0 +1,73 @@
+# Compara a correção de uma turma com um processo `meupia` por arquivo (como
+# num laço de shell) e com o modo em lote (meupia-lote), que reparte os
+# arquivos num pool de processos. Os arquivos são gerados numa pasta
+# temporária; um em cada dez tem um erro semântico.
+#
+#   python benchmarks/bench_batch.py --arquivos 200 --processos 4
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, ROOT)
+
+from meuPia import batch
+
+def program(index):
+    # Variable `z` is undeclared in every tenth file
+    target = 'z' if index % 10 == 9 else 'total'
+    return '\n'.join([
+        f'algoritmo "Aluno{index}"',
+        'var i, total: inteiro',
+        'inicio',
+        'total <- 0',
+        f'para i de 1 ate {index + 10} faca',
+        f'    {target} <- total + i',
+        'fim_para',
+        'escreva(total)',
+        'fimalgoritmo',
+    ])
+
+def write_class(directory, count):
+    files = []
+    for index in range(count):
+        folder = os.path.join(directory, f'aluno{index:03}')
+        os.makedirs(folder)
+        path = os.path.join(folder, 'prova.por')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(program(index))
+        files.append(path)
+    return files
+
+def main():
+    parser = argparse.ArgumentParser(description='Um processo por arquivo contra o modo em lote')
+    parser.add_argument('--arquivos', type=int, default=200)
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_class(os.path.join(directory, 'turma'), args.arquivos)
+        environment = dict(os.environ, PYTHONPATH=os.path.abspath(ROOT))
+
+        start = time.perf_counter()
+        for path in files:
+            output = os.path.join(directory, 'um_por_um', os.path.basename(os.path.dirname(path)))
+            subprocess.run([sys.executable, '-m', 'meuPia.compiler', path, '--saida', output,
+                            '--artefatos', 'nenhum'], capture_output=True, env=environment)
+        single = time.perf_counter() - start
+        print(f'um processo por arquivo: {single:.2f} s ({len(files) / single:.1f} arquivos/s)')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = batch.compile_batch(files, os.path.join(directory, 'lote'), args.processos,
+                                         {'artifacts': 'nenhum'})
+        print(f'lote ({report["processos"]} processo(s)): {report["segundos"]:.2f} s '
+              f'({report["arquivos_por_segundo"]:.1f} arquivos/s), '
+              f'{report["ok"]} ok, {report["erro"]} com erro')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Mede o tempo de compilar o mesmo programa várias vezes com o gerador de
+# texto, sem cache e com o cache de compilação (a primeira vez é uma falta,
+# as demais acertos que não rodam nenhuma fase).
+#
+#   python benchmarks/bench_cache.py --linhas 2000 --repeticoes 20
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia import compiler
+from meuPia.utils.cache import ContentCache
+
+def program(lines):
+    body = [f'x <- x + {index % 7} * 2' for index in range(lines)]
+    return '\n'.join(['algoritmo "Cache"', 'var x: inteiro', 'inicio', 'x <- 0', *body,
+                      'escreva(x)', 'fimalgoritmo'])
+
+def compile_many(source, output, repetitions, cache):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repetitions):
+            compiler.main(source, output, cache=cache)
+    return (time.perf_counter() - start) / repetitions
+
+def main():
+    parser = argparse.ArgumentParser(description='Compilação repetida sem e com o cache de compilação')
+    parser.add_argument('--linhas', type=int, default=2000)
+    parser.add_argument('--repeticoes', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'programa.por')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(program(args.linhas))
+        output = os.path.join(directory, 'saida')
+
+        print(f'sem cache: {compile_many(source, output, args.repeticoes, None) * 1000:.2f} ms por compilação')
+        cache = ContentCache(os.path.join(directory, 'cache'))
+        elapsed = compile_many(source, output, args.repeticoes, cache)
+        print(f'com cache: {elapsed * 1000:.2f} ms por compilação '
+              f'({cache.hits} acerto(s), {cache.misses} falta(s))')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# Mede a geração de código (code_generator.CodeGenerator) num programa Portugol
+# gerado, cheio de expressões aritméticas e lógicas. A árvore é construída uma
+# vez; só generate() entra na medida.
+#
+#   python benchmarks/bench_codegen.py --linhas 20000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.syntax_analyzer import Parser
+
+BODY = [
+    'para i de 1 ate n faca',
+    '    soma <- (soma + v[i] * 2 - (i / 3)) * (n - i) / ((i + 1) * 2)',
+    '    media <- ((a + b) * (c - d)) / (w + x * (y - z)) - m[i][j + 1]',
+    '    se (soma >= 1000 e nao (i = 7)) ou (a < b e (c <> d ou w = x)) entao',
+    '        escreva(f(a + b, [1, 2 * c], g(h) - 1))',
+    '    fim_se',
+    'fim_para',
+]
+
+def program(count):
+    lines = ['algoritmo "Expressoes"', 'var a, b, c, d, w, x, y, z, i, j, n, m, v, soma, media: inteiro', 'inicio']
+    while len(lines) < count - 1:
+        lines.extend(BODY)
+    lines.append('fimalgoritmo')
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de geração de código')
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    tokens = []
+    for i, line in enumerate(program(args.linhas)):
+        tokens.extend(scan_line(line, i+1)[1])
+    tree = Parser(tokens).parse()
+
+    best = None
+    for _ in range(args.repeticoes):
+        start = time.perf_counter()
+        CodeGenerator(tree).generate()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f'{args.linhas} linhas: {best * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Mede o tempo de um programa que lê muitos números com leia e escreve cada
+# soma parcial com escreva: código gerado com input()/print() por valor e com
+# --io-rapido (meuPia/runtime.py). Cada versão roda num processo separado, com
+# a entrada num arquivo, como no corretor.
+#
+#   python benchmarks/bench_io.py --numeros 100000
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer
+from meuPia.analyzers.syntax_analyzer import Parser
+
+PROGRAM = [
+    'algoritmo "Somas"',
+    'var n, i, x, total: inteiro',
+    'inicio',
+    'leia(n)',
+    'total <- 0',
+    'para i de 1 ate n faca',
+    '    leia(x)',
+    '    total <- total + x',
+    '    escreva(total)',
+    'fim_para',
+    'fimalgoritmo',
+]
+
+def generate(fast_io):
+    tokens = []
+    for i, line in enumerate(PROGRAM):
+        tokens.extend(scan_line(line, i+1)[1])
+    tree = Parser(tokens).parse()
+    semantic = SemanticAnalyzer(tree)
+    semantic.validate()
+    return CodeGenerator(tree, semantic.symbols, fast_io=fast_io).generate()
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de leia/escreva com input()/print() e com o runtime em buffer')
+    parser.add_argument('--numeros', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    with tempfile.TemporaryDirectory() as directory:
+        input_file = os.path.join(directory, 'entrada.txt')
+        with open(input_file, 'w') as f:
+            f.write(f'{args.numeros}\n')
+            f.write(''.join(f'{value % 1000}\n' for value in range(args.numeros)))
+
+        outputs = {}
+        for label, fast_io in (('input/print', False), ('io-rapido', True)):
+            program_file = os.path.join(directory, f'programa_{fast_io}.py')
+            with open(program_file, 'w') as f:
+                f.write(generate(fast_io))
+
+            best = None
+            for _ in range(args.repeticoes):
+                with open(input_file, 'rb') as stdin:
+                    start = time.perf_counter()
+                    completed = subprocess.run([sys.executable, program_file], stdin=stdin,
+                                               capture_output=True, env=environment, check=True)
+                    elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            outputs[label] = completed.stdout
+            print(f'{label}: {best * 1000:.2f} ms')
+
+        if len(set(outputs.values())) != 1:
+            print('ERRO: as saídas são diferentes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# Mede o tempo de execução do programa gerado sem e com o otimizador
+# (analyzers/optimizer.py). O programa tem um laço com constantes, um ramo
+# morto e variáveis que nunca são lidas; cada nível é compilado uma vez e só a
+# execução entra na medida.
+#
+#   python benchmarks/bench_optimizer.py --voltas 200000
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.optimizer import OPTIMIZE_LEVELS, Optimizer
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer
+from meuPia.analyzers.syntax_analyzer import Parser
+
+def program(laps):
+    return [
+        'algoritmo "Otimizar"',
+        'var i, total, salto, rastro, copia: inteiro',
+        'inicio',
+        'total <- 0',
+        'rastro <- 0',
+        f'para i de 1 ate {laps} faca',
+        '    salto <- (60 * 60 * 24) / (2 * 12) - 3600 + i',
+        '    rastro <- rastro + i * 2',
+        '    copia <- rastro',
+        '    se 1 = 0 entao',
+        '        escreva("depuração")',
+        '    fim_se',
+        '    total <- total + salto * (1 + 1)',
+        'fim_para',
+        'escreva(total)',
+        'fimalgoritmo',
+    ]
+
+def compile_level(lines, level):
+    tokens = []
+    for i, line in enumerate(lines):
+        tokens.extend(scan_line(line, i+1)[1])
+    tree = Parser(tokens).parse()
+    semantic = SemanticAnalyzer(tree)
+    semantic.validate()
+    tree = Optimizer(tree, level).optimize()
+    return compile(CodeGenerator(tree, semantic.symbols).generate(), '<bench>', 'exec')
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de execução por nível de otimização')
+    parser.add_argument('--voltas', type=int, default=200000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    lines = program(args.voltas)
+    for level in OPTIMIZE_LEVELS:
+        code = compile_level(lines, level)
+        best = None
+        for _ in range(args.repeticoes):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                exec(code, {'__name__': '__main__'})
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f'-O{level}: {best * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
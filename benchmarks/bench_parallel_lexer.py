@@ -0,0 +1,64 @@
+# Mede o léxico paralelo (lexical_analyzer.scan_lines_parallel) contra o
+# sequencial em programas Portugol gerados, variando o número de processos.
+#
+#   python benchmarks/bench_parallel_lexer.py --linhas 200000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.lexical_analyzer import scan_line, scan_lines_parallel
+
+BODY = [
+    '    para i de 1 ate n faca\n',
+    '        soma <- soma + v[i] * 2 - (i / 3)\n',
+    '        se soma >= 1000 e nao (i = 7) entao\n',
+    '            escreva("limite atingido em ", i) // aviso\n',
+    '        fim_se\n',
+    '    fim_para\n',
+]
+
+def generate_lines(count):
+    lines = ['algoritmo "Gerado"\n', 'var i, n, soma: inteiro\n', 'inicio\n']
+    while len(lines) < count - 1:
+        lines.extend(BODY)
+    lines.append('fimalgoritmo\n')
+    return lines
+
+def sequential(lines):
+    tokens = []
+    for i, line in enumerate(lines):
+        tokens.extend(scan_line(line, i+1)[1])
+    return tokens
+
+def best_of(repeat, function, *args, **kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Léxico paralelo x sequencial')
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = generate_lines(args.linhas)
+    base = best_of(args.repeticoes, sequential, lines)
+    print(f'{len(lines)} linhas, {os.cpu_count()} CPUs')
+    print(f'{"processos":>10} {"tempo (s)":>10} {"ganho":>7}')
+    print(f'{"seq":>10} {base:>10.3f} {1.0:>7.2f}')
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        elapsed = best_of(args.repeticoes, scan_lines_parallel, lines, workers=workers)
+        print(f'{workers:>10} {elapsed:>10.3f} {base / elapsed:>7.2f}')
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
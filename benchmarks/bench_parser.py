@@ -0,0 +1,87 @@
+# Mede o parser dirigido pela tabela LL(1) (syntax_analyzer.Parser, pilha
+# explícita) contra a descida recursiva escrita à mão (RecursiveDescentParser)
+# em programas rasos e aninhados.
+#
+#   python benchmarks/bench_parser.py --profundidade 150
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.syntax_analyzer import Parser, RecursiveDescentParser
+
+BODY = [
+    'para i de 1 ate n faca',
+    '    soma <- soma + v[i] * 2 - (i / 3)',
+    '    se soma >= 1000 e nao (i = 7) entao',
+    '        escreva(soma)',
+    '    fim_se',
+    'fim_para',
+]
+
+def tokenize(lines):
+    tokens = []
+    for i, line in enumerate(lines):
+        tokens.extend(scan_line(line, i+1)[1])
+    return tokens
+
+def flat_program(count):
+    lines = ['algoritmo "Raso"', 'var i, n, soma: inteiro', 'inicio']
+    while len(lines) < count - 1:
+        lines.extend(BODY)
+    lines.append('fimalgoritmo')
+    return lines
+
+def nested_blocks(depth):
+    lines = ['algoritmo "Blocos"', 'var x: inteiro', 'inicio']
+    lines += ['se x > 0 entao'] * depth
+    lines += ['x <- x + 1']
+    lines += ['fim_se'] * depth
+    lines.append('fimalgoritmo')
+    return lines
+
+def nested_parens(depth):
+    expression = '(' * depth + 'x' + ')' * depth
+    return ['algoritmo "Parenteses"', 'var x: inteiro', 'inicio', f'x <- {expression}', 'fimalgoritmo']
+
+def best_of(repeat, parser_class, tokens):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser_class(tokens).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def measure(repeat, parser_class, tokens):
+    try:
+        return f'{best_of(repeat, parser_class, tokens) * 1000:>12.2f}'
+    except RecursionError:
+        return f'{"RecursionError":>12}'
+
+def main():
+    parser = argparse.ArgumentParser(description='Parser LL(1) x descida recursiva')
+    parser.add_argument('--linhas', type=int, default=20000)
+    parser.add_argument('--profundidade', type=int, default=150)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    cases = [
+        (f'raso ({args.linhas} linhas)', flat_program(args.linhas)),
+        (f'{args.profundidade} blocos se', nested_blocks(args.profundidade)),
+        (f'{args.profundidade} parênteses', nested_parens(args.profundidade)),
+        (f'{args.profundidade * 10} parênteses', nested_parens(args.profundidade * 10)),
+    ]
+
+    print(f'{"caso":<24} {"LL(1) (ms)":>14} {"recursivo (ms)":>14}')
+    for name, lines in cases:
+        tokens = tokenize(lines)
+        table = measure(args.repeticoes, lambda t: Parser(t, max_depth=None), tokens)
+        recursive = measure(args.repeticoes, RecursiveDescentParser, tokens)
+        print(f'{name:<24} {table:>14} {recursive:>14}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# Mede o tempo de partida de um programa com `usar`, com o import do plugin no
+# início (padrão) e sob demanda (--plugins-sob-demanda), num caminho que nunca
+# chama as funções do plugin. O plugin de teste é criado numa pasta temporária
+# e importa módulos pesados da biblioteca padrão, como um plugin de IA faria.
+#
+#   python benchmarks/bench_plugins.py --repeticoes 10
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer
+from meuPia.analyzers.syntax_analyzer import Parser
+
+PLUGIN = """import asyncio
+import decimal
+import email.mime.multipart
+import http.server
+import json
+import unittest
+
+def pesado_treinar(x):
+    return x
+"""
+
+PROGRAM = [
+    'algoritmo "Partida"',
+    'usar "pesado"',
+    'var x: inteiro',
+    'inicio',
+    'x <- 0',
+    'se x > 0 entao',
+    '    pesado_treinar(x)',
+    'fim_se',
+    'escreva(x)',
+    'fimalgoritmo',
+]
+
+def generate(lazy_plugins):
+    tokens = []
+    for i, line in enumerate(PROGRAM):
+        tokens.extend(scan_line(line, i+1)[1])
+    tree = Parser(tokens).parse()
+    semantic = SemanticAnalyzer(tree)
+    semantic.validate()
+    return CodeGenerator(tree, semantic.symbols, lazy_plugins=lazy_plugins).generate()
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de partida com import do plugin no início e sob demanda')
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'meupia_pesado.py'), 'w') as f:
+            f.write(PLUGIN)
+        environment = dict(os.environ, PYTHONPATH=directory)
+
+        for label, lazy_plugins in (('no início', False), ('sob demanda', True)):
+            program_file = os.path.join(directory, f'programa_{lazy_plugins}.py')
+            with open(program_file, 'w') as f:
+                f.write(generate(lazy_plugins))
+
+            best = None
+            for _ in range(args.repeticoes):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, program_file], capture_output=True, env=environment, check=True)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            print(f'{label}: {best * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# Mede o tempo de execução de um laço para elemento a elemento sobre listas,
+# gerado como laço escalar e com --vetorizar (analyzers/vectorizer.py). Sem o
+# NumPy instalado o código vetorizado cai no laço escalar, e a medida mostra
+# só o custo das verificações do _vetor().
+#
+#   python benchmarks/bench_vectorize.py --tamanho 100000
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer
+from meuPia.analyzers.syntax_analyzer import Parser
+
+def program(size):
+    values = ", ".join(str(value % 97) for value in range(size))
+    return [
+        'algoritmo "Vetorizar"',
+        'var a, b, v, i, k: inteiro',
+        'inicio',
+        'k <- 3',
+        f'a <- [{values}]',
+        f'b <- [{values}]',
+        f'v <- [{values}]',
+        f'para i de 0 ate {size - 1} faca',
+        '    v[i] <- a[i] * k + b[i] - i',
+        '    a[i] <- v[i] * 2',
+        'fim_para',
+        'escreva(v[0])',
+        'fimalgoritmo',
+    ]
+
+def compile_program(lines, vectorize):
+    tokens = []
+    for i, line in enumerate(lines):
+        tokens.extend(scan_line(line, i+1)[1])
+    tree = Parser(tokens).parse()
+    semantic = SemanticAnalyzer(tree)
+    semantic.validate()
+    return compile(CodeGenerator(tree, semantic.symbols, vectorize).generate(), '<bench>', 'exec')
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de execução do laço escalar e do vetorizado')
+    parser.add_argument('--tamanho', type=int, default=100000)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import numpy
+        print(f'NumPy {numpy.__version__}')
+    except ImportError:
+        print('NumPy não instalado: o código vetorizado usa o laço escalar')
+
+    lines = program(args.tamanho)
+    for label, vectorize in (('escalar', False), ('vetorizado', True)):
+        code = compile_program(lines, vectorize)
+        best = None
+        for _ in range(args.repeticoes):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                exec(code, {'__name__': '__main__'})
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f'{label}: {best * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple
+
+# ----------------
+# AST built once by syntax_analyzer.Parser and shared by the semantic analysis
+# and code generation. Every node carries the 1-based line/col of the token it
+# starts at; child fields are declared in source order, so a generic walk visits
+# nodes in the same order as the tokens.
+# ----------------
+
+def node(cls):
+  cls = dataclass(cls)
+  cls._fields = tuple(field.name for field in fields(cls) if field.name not in ('line', 'col'))
+  return cls
+
+@node
+class Node:
+  line: int
+  col: int
+
+  @property
+  def code_index(self) -> str:
+    return f'{self.line}:{self.col}'
+
+# ----------------
+# Expressions
+# ----------------
+@node
+class Name(Node):
+  id: str
+
+@node
+class Number(Node):
+  text: str
+
+@node
+class String(Node):
+  text: str # Lexeme, quotes included
+
+@node
+class ListLiteral(Node):
+  items: List[Node]
+
+@node
+class Index(Node):
+  value: Node
+  index: Node
+
+@node
+class Call(Node):
+  func: Name
+  args: List[Node]
+
+@node
+class BinOp(Node):
+  left: Node
+  op: int # TokenKind of the operator
+  right: Node
+
+@node
+class Not(Node):
+  operand: Node
+
+@node
+class Group(Node):
+  # Parentheses written in the source
+  expr: Node
+
+# ----------------
+# Statements
+# ----------------
+@node
+class Assign(Node):
+  target: Node # Name, or Index for v[i] <- ...
+  value: Node
+
+@node
+class CallStatement(Node):
+  call: Call
+
+@node
+class Escreva(Node):
+  value: Node
+
+@node
+class Leia(Node):
+  target: Name
+
+@node
+class Se(Node):
+  condition: Node
+  body: List[Node]
+  orelse: List[Node]
+
+@node
+class Enquanto(Node):
+  condition: Node
+  body: List[Node]
+
+@node
+class Para(Node):
+  var: Name
+  start: Node
+  end: Node
+  step: Optional[Node]
+  body: List[Node]
+
+# ----------------
+# Program
+# ----------------
+@node
+class PluginUse(Node):
+  name: str # Without quotes
+
+@node
+class VarDeclaration(Node):
+  names: List[Name]
+  type_name: str # TIPO lexeme as written (inteiro, cadeia, string...)
+
+@node
+class Program(Node):
+  name: str # Lexeme, quotes included
+  plugins: List[PluginUse]
+  declarations: List[VarDeclaration]
+  body: List[Node]
+
+def iter_child_nodes(node: Node):
+  for field_name in node._fields:
+    value = getattr(node, field_name)
+    if isinstance(value, Node):
+      yield value
+    elif isinstance(value, list):
+      for item in value:
+        if isinstance(item, Node):
+          yield item
+
+def binop_chain(node: Node) -> Tuple[Node, List[BinOp]]:
+  # a + b - c is BinOp(BinOp(a, +, b), -, c): returns a and the BinOps from the
+  # innermost out, so walks loop over long flat chains instead of recursing
+  chain = []
+  while isinstance(node, BinOp):
+    chain.append(node)
+    node = node.left
+  chain.reverse()
+  return node, chain
+
+class NodeVisitor:
+  # Same protocol as Python's ast.NodeVisitor: visit() dispatches to
+  # visit_<ClassName>, falling back to generic_visit, which visits the children.
+  def visit(self, node: Node):
+    visitor = getattr(self, f'visit_{type(node).__name__}', self.generic_visit)
+    return visitor(node)
+
+  def generic_visit(self, node: Node):
+    for child in iter_child_nodes(node):
+      self.visit(child)
+
+  def visit_BinOp(self, node: BinOp):
+    # Same order as generic_visit (left before right), without recursing down
+    # the left operands
+    first, chain = binop_chain(node)
+    self.visit(first)
+    for binop in chain:
+      self.visit(binop.right)
@@ -1,346 +1,423 @@
-from typing import Dict, List
-from ..utils.token_enum import TokenEnum
+from typing import Iterable, List, Optional, Union
+from .ast_nodes import (
+    Assign, BinOp, Call, CallStatement, Enquanto, Escreva, Group, Index, Leia, ListLiteral,
+    Name, Node, NodeVisitor, Not, Number, Para, Program, Se, String, binop_chain, iter_child_nodes,
+)
+from .symbol_table import TYPE_INTEIRO, SymbolTable
+from .syntax_analyzer import Parser
+from .vectorizer import PRELUDE as VECTOR_PRELUDE, SLICES, ElementwiseLoop, elementwise_loops
+from ..utils.plugin_index import PluginInfo, default_module
+from ..utils.token import Token
+from ..utils.token_enum import TokenKind
 
-class CodeGenerator:
-    def __init__(self, lexemePairs: List[Dict[str, str]]):
-        self.lexeme_pairs = lexemePairs
-        self.pos = 0
+# Python text for each operator kind; arithmetic and comparisons are glued to
+# their operands (x+1, x>0), logic operators carry their own spaces.
+OPERATOR_TEXT = {
+    TokenKind.OPMAIS: "+",
+    TokenKind.OPMENOS: "-",
+    TokenKind.OPMULTI: "*",
+    TokenKind.OPDIVI: "/",
+    TokenKind.LOGIGUAL: "==",
+    TokenKind.LOGDIFF: "!=",
+    TokenKind.LOGMENOR: "<",
+    TokenKind.LOGMAIOR: ">",
+    TokenKind.LOGMENORIGUAL: "<=",
+    TokenKind.LOGMAIORIGUAL: ">=",
+    TokenKind.E: " and ",
+    TokenKind.OU: " or ",
+}
+
+# Python operator precedence (higher binds tighter). Parentheses are emitted
+# only where the tree needs them, whether or not they were in the source.
+PRECEDENCE_OR = 1
+PRECEDENCE_AND = 2
+PRECEDENCE_NOT = 3
+PRECEDENCE_COMPARISON = 4
+PRECEDENCE_SUM = 5
+PRECEDENCE_PRODUCT = 6
+PRECEDENCE_ATOM = 7
+
+OPERATOR_PRECEDENCE = {
+    TokenKind.OU: PRECEDENCE_OR,
+    TokenKind.E: PRECEDENCE_AND,
+    TokenKind.LOGIGUAL: PRECEDENCE_COMPARISON,
+    TokenKind.LOGDIFF: PRECEDENCE_COMPARISON,
+    TokenKind.LOGMENOR: PRECEDENCE_COMPARISON,
+    TokenKind.LOGMAIOR: PRECEDENCE_COMPARISON,
+    TokenKind.LOGMENORIGUAL: PRECEDENCE_COMPARISON,
+    TokenKind.LOGMAIORIGUAL: PRECEDENCE_COMPARISON,
+    TokenKind.OPMAIS: PRECEDENCE_SUM,
+    TokenKind.OPMENOS: PRECEDENCE_SUM,
+    TokenKind.OPMULTI: PRECEDENCE_PRODUCT,
+    TokenKind.OPDIVI: PRECEDENCE_PRODUCT,
+}
+
+def left_minimum(op: int) -> int:
+    # Precedence the left operand of `op` must have to go without parentheses
+    precedence = OPERATOR_PRECEDENCE[op]
+    return precedence + 1 if precedence == PRECEDENCE_COMPARISON else precedence
+
+def plugin_info(plugin: str, plugin_infos: Optional[dict] = None) -> PluginInfo:
+    # As resolved by the compiler's plugin index (see utils/plugin_index);
+    # without one, the default module and `import *`
+    info = (plugin_infos or {}).get(plugin)
+    return info if info is not None else PluginInfo(plugin, default_module(plugin))
+
+def plugin_import(plugin: str, plugin_infos: Optional[dict] = None, called: Iterable[str] = ()) -> str:
+    # Plugins with a manifest import just the called functions
+    return plugin_info(plugin, plugin_infos).import_line(called)
+
+def plugin_missing_message(plugin: str) -> str:
+    # Usando 'mpgp instale' conforme nomenclatura do mpgp.py
+    return f"Erro: O plugin '{plugin}' não está instalado. Execute: mpgp instale {plugin}"
+
+
+def called_functions(node: Node) -> List[str]:
+    # Names of the functions the program calls, in first-use order
+    names = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, Call) and current.func.id not in names:
+            names.append(current.func.id)
+        pending.extend(reversed(list(iter_child_nodes(current))))
+    return names
+
+def lazy_plugin_lines(plugins: List[str], functions: List[str], plugin_infos: Optional[dict] = None) -> List[str]:
+    # Module header that replaces the eager `from plugin import *`: the
+    # installed packages are only looked up (find_spec reads no module), and
+    # every function the program calls starts as a stub that imports the
+    # plugins on its first call and puts the real function in its place.
+    # Like the star imports, later plugins win when two define the same name.
+    lines = ["import importlib", "import importlib.util"]
+    for plugin in plugins:
+        lines += [
+            f"if importlib.util.find_spec({plugin_info(plugin, plugin_infos).module.split('.')[0]!r}) is None:",
+            f"    print(\"{plugin_missing_message(plugin)}\")",
+            "    sys.exit(1)",
+        ]
+    modules = ", ".join(repr(plugin_info(plugin, plugin_infos).module) for plugin in plugins)
+    lines += [
+        f"_PLUGINS = ({modules},)",
+        "",
+        "def _plugin_function(name):",
+        "    def call(*args):",
+        "        for module_name in reversed(_PLUGINS):",
+        "            module = importlib.import_module(module_name)",
+        "            if hasattr(module, name):",
+        "                globals()[name] = function = getattr(module, name)",
+        "                return function(*args)",
+        "        raise NameError(f\"name '{name}' is not defined\")",
+        "    return call",
+        "",
+    ]
+    lines += [f"{function} = _plugin_function({function!r})" for function in functions]
+    return lines
+
+# Builtins the generated code calls; the ones used inside a loop are bound to
+# locals of main() once, so the loop reads them with LOAD_FAST instead of a
+# globals + builtins lookup per iteration.
+LOOP_BUILTINS = ("print", "input", "int", "range")
+
+def loop_builtins(statements, symbols: SymbolTable, in_loop: bool = False, fast_io: bool = False) -> set:
+    # With fast I/O, leia and escreva call the runtime instead of builtins
+    used = set()
+    for statement in statements:
+        if in_loop:
+            if isinstance(statement, Escreva) and not fast_io:
+                used.add("print")
+            elif isinstance(statement, Leia) and not fast_io:
+                used.add("input")
+                symbol = symbols.lookup(statement.target.id)
+                if symbol is not None and symbol.type_name == TYPE_INTEIRO:
+                    used.add("int")
+            elif isinstance(statement, Para):
+                used.add("range")
+
+        nested = in_loop or isinstance(statement, (Enquanto, Para))
+        for block in (getattr(statement, "body", ()), getattr(statement, "orelse", ())):
+            used |= loop_builtins(block, symbols, nested, fast_io)
+    return used
+
+def private_name(name: str, symbols: SymbolTable) -> str:
+    # _name, or __name... when the program already uses it
+    alias = f"_{name}"
+    while symbols.lookup(alias) is not None:
+        alias = f"_{alias}"
+    return alias
+
+def builtin_aliases(program: Program, symbols: SymbolTable, fast_io: bool = False) -> dict:
+    # builtin -> local alias (_print...), skipping names the program uses
+    used = loop_builtins(program.body, symbols, fast_io=fast_io)
+    return {builtin: private_name(builtin, symbols) for builtin in LOOP_BUILTINS if builtin in used}
+
+# Functions of meuPia/runtime.py called by programs compiled with fast I/O:
+# leia and escreva without one input()/print() call per value
+RUNTIME_MODULE = "meuPia.runtime"
+RUNTIME_FUNCTIONS = ("descarrega", "escreva", "leia_inteiro", "leia_texto")
+
+def runtime_names(symbols: SymbolTable) -> dict:
+    # runtime function -> module-level name it is imported as
+    return {function: private_name(function, symbols) for function in RUNTIME_FUNCTIONS}
+
+def runtime_import(names: dict) -> str:
+    imported = ", ".join(f"{function} as {name}" for function, name in names.items())
+    return f"from {RUNTIME_MODULE} import {imported}"
+
+class CodeGenerator(NodeVisitor):
+    # Walks the AST built by the parser. Raw tokens (a list or a lazy iterator)
+    # are still accepted and parsed here first. `symbols` is the table filled by
+    # the semantic analysis; without one it is built from the declarations.
+    # `vectorize` turns elementwise para loops into NumPy expressions (see
+    # vectorizer), keeping the scalar loop as the fallback.
+    # `fast_io` makes leia and escreva use the buffered meuPia.runtime.
+    # `lazy_plugins` imports each plugin on the first call of one of its
+    # functions instead of at startup (see lazy_plugin_lines).
+    # `plugin_infos` maps plugin names to their PluginInfo (module and
+    # manifest), as resolved by the compiler.
+    # After generate(), source_map[n] is the Portugol line generated Python
+    # line n + 1 comes from (None for the fixed header and footer).
+    def __init__(self, program: Union[Program, Iterable[Token]], symbols: Optional[SymbolTable] = None,
+                 vectorize: bool = False, fast_io: bool = False, lazy_plugins: bool = False,
+                 plugin_infos: Optional[dict] = None):
+        if not isinstance(program, Program):
+            program = Parser(program).parse()
+
+        self.program = program
+        self.symbols = symbols if symbols is not None else SymbolTable.from_program(program)
+        self.runtime = runtime_names(self.symbols) if fast_io else {}
+        self.lazy_plugins = lazy_plugins
+        self.plugin_infos = plugin_infos
         self.python_code = []
+        self.source_map = []
+        self.source_line = None
         self.indent_level = 0
-        self.var_types = {}
+        self.aliases = builtin_aliases(program, self.symbols, fast_io)
+        self.vector_loops = elementwise_loops(program) if vectorize else {}
+        self.expression_generators = {
+            Name: self.gen_name,
+            Number: self.gen_literal,
+            String: self.gen_literal,
+            BinOp: self.gen_binop,
+            Not: self.gen_not,
+            Group: self.gen_group,
+            Call: self.gen_call,
+            Index: self.gen_index,
+            ListLiteral: self.gen_list,
+        }
 
     def add_line(self, line):
         indent = "    " * self.indent_level
         self.python_code.append(f"{indent}{line}")
+        self.source_map.append(self.source_line)
 
-    def current_token(self) -> str:
-        if self.pos < len(self.lexeme_pairs):
-            return self.lexeme_pairs[self.pos]['token']
-        return TokenEnum.END_OF_FILE.name
-    
-    def current_lexeme(self) -> str:
-        if self.pos < len(self.lexeme_pairs):
-            return self.lexeme_pairs[self.pos]['lexeme']
-        return ''
-
-    def advance(self):
-        self.pos += 1
-
-    def check_token(self, expected: TokenEnum) -> bool:
-        return self.current_token() == expected.name
+    def visit(self, node: Node):
+        # Lines added while visiting a statement map back to its line
+        outer, self.source_line = self.source_line, node.line
+        try:
+            return super().visit(node)
+        finally:
+            self.source_line = outer
 
     def generate(self):
         # Cabeçalho com Wrappers do meuPiá
         self.add_line("# -*- coding: utf-8 -*-")
         self.add_line("import sys")
-        self.imports = []
+        self.imports = [plugin.name for plugin in self.program.plugins]
 
-        # Pular algoritmo e nome se existirem
-        if self.check_token(TokenEnum.ALGORITMO):
-            self.advance() # ALGORITMO
-            self.advance() # "NOME"
-        
-        # Processar imports
-        while self.check_token(TokenEnum.USAR):
-            self.advance() # USAR
-            plugin_name = self.current_lexeme().strip('"')
-            self.imports.append(plugin_name)
-            self.advance() # "NOME_DO_PLUGIN"
-        
-
-        # Mapeamento: "comando usar" -> "linha de import python"
-        PLUGIN_IMPORT_MAP = {
-            "ia": "from meupia_ia.plugin_ia import *",       # Caminho explícito para o novo padrão
-            "maker": "from meupia_maker.plugin_iot import *", # (Ajuste se necessário, ou mantenha genérico)
-            "espacial": "from meupia_espacial.plugin_ksp import *"
-        }
+        called = called_functions(self.program)
+        if self.lazy_plugins and self.imports:
+            for line in lazy_plugin_lines(self.imports, called, self.plugin_infos):
+                self.add_line(line)
 
-        for plugin in self.imports:
-            # Tenta pegar do mapa, se não existir, usa o padrão 'meupia_{plugin}'
-            import_stmt = PLUGIN_IMPORT_MAP.get(plugin, f"from meupia_{plugin} import *")
-            
+        for plugin in self.imports if not self.lazy_plugins else ():
             self.add_line(f"try:")
             self.indent_level += 1
-            self.add_line(f"{import_stmt}")
+            self.add_line(f"{plugin_import(plugin, self.plugin_infos, called)}")
             self.indent_level -= 1
             self.add_line(f"except ImportError:")
             self.indent_level += 1
-            # Usando 'mpgp instale' conforme nomenclatura do mpgp.py
-            self.add_line(f"print(\"Erro: O plugin '{plugin}' não está instalado. Execute: mpgp instale {plugin}\")")
+            self.add_line(f"print(\"{plugin_missing_message(plugin)}\")")
             self.add_line(f"sys.exit(1)")
             self.indent_level -= 1
             
+        if self.runtime:
+            self.add_line(runtime_import(self.runtime))
+
         self.add_line("")
-        
-        if self.check_token(TokenEnum.VAR):
-            self.gen_variables()
+        if self.vector_loops:
+            for line in VECTOR_PRELUDE:
+                self.add_line(line)
 
-        if self.check_token(TokenEnum.INICIO):
-            self.advance() # INICIO
-        
+        # Portugol variables are locals of main(), initialized before any use
         self.add_line("def main():")
         self.indent_level += 1
-        
-        while not self.check_token(TokenEnum.FIMALGORITMO) and not self.check_token(TokenEnum.END_OF_FILE):
-            self.gen_statement()
-
+        self.gen_variables()
+        self.source_line = self.program.line
+        for builtin, alias in self.aliases.items():
+            self.add_line(f"{alias} = {builtin}")
+        self.source_line = None
+        self.gen_block(self.program.body)
         self.indent_level -= 1
+
         self.add_line("")
         self.add_line("if __name__ == '__main__':")
-        self.add_line("    main()")
+        if self.runtime:
+            # Buffered output is written even when the program fails
+            self.add_line("    try:")
+            self.add_line("        main()")
+            self.add_line("    finally:")
+            self.add_line(f"        {self.runtime['descarrega']}()")
+        else:
+            self.add_line("    main()")
         
         return "\n".join(self.python_code)
 
     def gen_variables(self):
-        self.advance() # VAR
-        while self.check_token(TokenEnum.ID):
-            ids = []
-            ids.append(self.current_lexeme())
-            self.advance()
-            
-            while self.check_token(TokenEnum.COMMA):
-                self.advance() # ,
-                ids.append(self.current_lexeme())
-                self.advance() # ID
-                
-            self.advance() # :
-            tipo = self.current_lexeme()
-            self.advance() # TIPO
-            
+        for declaration in self.program.declarations:
+            tipo = declaration.type_name
             val_inicial = "0" if tipo == "inteiro" else "''"
-            for var_name in ids:
-                self.var_types[var_name] = tipo
-                self.add_line(f"{var_name} = {val_inicial}")
-
-    def gen_statement(self):
-        if self.check_token(TokenEnum.ID):
-            self.gen_assignment_or_call()
+            for name in declaration.names:
+                self.source_line = name.line
+                self.add_line(f"{name.id} = {val_inicial}")
+        self.source_line = None
 
-        elif self.check_token(TokenEnum.ESCREVA):
-            self.gen_escreva()
-        
-        elif self.check_token(TokenEnum.LEIA):
-            self.gen_leia()
+    def builtin(self, name: str) -> str:
+        return self.aliases.get(name, name)
 
-        elif self.check_token(TokenEnum.SE):
-            self.gen_se()
+    def gen_block(self, statements):
+        # Python needs at least one statement in every block
+        if not statements:
+            self.add_line("pass")
 
-        elif self.check_token(TokenEnum.ENQUANTO):
-            self.gen_enquanto()
+        for statement in statements:
+            self.visit(statement)
 
-        elif self.check_token(TokenEnum.PARA):
-            self.gen_para()
+    # ----------------
+    # Statements
+    # ----------------
+    def visit_Assign(self, node: Assign):
+        self.add_line(f"{self.gen_expression(node.target)} = {self.gen_expression(node.value)}")
 
-        else:
-             self.advance() 
+    def visit_CallStatement(self, node: CallStatement):
+        self.add_line(self.gen_expression(node.call))
 
-    def gen_enquanto(self):
-        self.advance() # ENQUANTO
-        cond = self.gen_expression()
-        
-        if self.check_token(TokenEnum.FACA):
-            self.advance()
-
-        self.add_line(f"while {cond}:")
-        self.indent_level += 1
-        
-        while not self.check_token(TokenEnum.FIMENQUANTO):
-            self.gen_statement()
-
-        self.indent_level -= 1
-        self.advance() # FIMENQUANTO
-
-    def gen_assignment_or_call(self):
-        lexeme = self.current_lexeme()
-        self.advance()
-        
-        if self.check_token(TokenEnum.ATR):
-            self.advance() # <-
-            expr = self.gen_expression()
-            self.add_line(f"{lexeme} = {expr}")
-            
-        elif self.check_token(TokenEnum.PARAB):
-            self.advance() # (
-            args = []
-            if not self.check_token(TokenEnum.PARFE):
-                args.append(self.gen_expression())
-                while self.check_token(TokenEnum.COMMA):
-                    self.advance()
-                    args.append(self.gen_expression())
-            self.advance() # )
-            self.add_line(f"{lexeme}({', '.join(args)})")
-
-    def gen_escreva(self):
-        self.advance() # ESCREVA
-        self.advance() # (
-        expr = self.gen_expression()
+    def visit_Escreva(self, node: Escreva):
         # O python print adiciona newline por padrao, portugol as vezes nao.
         # Mas vamos manter simples: print()
-        self.add_line(f"print({expr})")
-        self.advance() # )
-
-    def gen_leia(self):
-        self.advance() # LEIA
-        self.advance() # (
-        var_name = self.current_lexeme()
-        self.advance() # ID
-        
-        is_int = self.var_types.get(var_name) == 'inteiro'
+        write = self.runtime.get("escreva") or self.builtin("print")
+        self.add_line(f"{write}({self.gen_expression(node.value)})")
+
+    def visit_Leia(self, node: Leia):
+        var_name = node.target.id
+        symbol = self.symbols.lookup(var_name)
+        is_int = symbol is not None and symbol.type_name == TYPE_INTEIRO
         
-        if is_int:
-             self.add_line(f"{var_name} = int(input())") 
+        read = f"{self.builtin('input')}()"
+        if self.runtime:
+            function = "leia_inteiro" if is_int else "leia_texto"
+            self.add_line(f"{var_name} = {self.runtime[function]}()")
+        elif is_int:
+             self.add_line(f"{var_name} = {self.builtin('int')}({read})") 
         else:
-             self.add_line(f"{var_name} = input()")
-             
-        self.advance() # )
-
-    def gen_se(self):
-        self.advance() # SE
-        cond = self.gen_expression()
-        self.advance() # ENTAO
-        
-        self.add_line(f"if {cond}:")
+             self.add_line(f"{var_name} = {read}")
+
+    def visit_Se(self, node: Se):
+        self.add_line(f"if {self.gen_expression(node.condition)}:")
         self.indent_level += 1
-        
-        # Processa bloco
-        while not (self.check_token(TokenEnum.SENAO) or self.check_token(TokenEnum.FIMSE) or self.check_token(TokenEnum.FIMALGORITMO)):
-             self.gen_statement()
-        
+        self.gen_block(node.body)
         self.indent_level -= 1
         
-        if self.check_token(TokenEnum.SENAO):
-            self.advance() # SENAO
+        if node.orelse:
             self.add_line("else:")
             self.indent_level += 1
-            while not (self.check_token(TokenEnum.FIMSE) or self.check_token(TokenEnum.FIMALGORITMO)):
-                self.gen_statement()
+            self.gen_block(node.orelse)
             self.indent_level -= 1
-            
-        self.advance() # FIMSE
 
-    def gen_para(self):
-        self.advance() # PARA
-        var_controle = self.current_lexeme()
-        self.advance() # ID
-        
-        self.advance() # DE
-        inicio_val = self.gen_expression() # A expressão pode ser complexa? gen_expression lida com tudo até achar token invalido (ate)
-        # Note: gen_expression para em 'ate' se não tiver em valid_tokens. 'ate' nao esta na lista. OK.
-        
-        self.advance() # ATE
-        fim_val = self.gen_expression()
-        
-        passo_val = "1"
-        if self.check_token(TokenEnum.PASSO):
-            self.advance()
-            passo_val = self.gen_expression() # Allow expression for step too
-            
-        if self.check_token(TokenEnum.FACA):
-            self.advance()
-            
-        self.add_line(f"for {var_controle} in range({inicio_val}, {fim_val} + 1, {passo_val}):") # Range inclusivo
-        
+    def visit_Enquanto(self, node: Enquanto):
+        self.add_line(f"while {self.gen_expression(node.condition)}:")
         self.indent_level += 1
-        while not self.check_token(TokenEnum.FIMPARA):
-            self.gen_statement()
+        self.gen_block(node.body)
         self.indent_level -= 1
-        self.advance() # FIMPARA
 
-    def gen_expression(self):
-        # Simplificação: Coletar tokens até encontrar um que não pertence a expressão/comparação
-        expr_parts = []
-        paren_balance = 0
-        last_token_type = None
-        
-        while True:
-            t = self.current_token()
-            l = self.current_lexeme()
-            
-            # Break conditions based on balance
-            if t == TokenEnum.PARFE.name:
-                if paren_balance == 0:
-                    break
-                else:
-                    paren_balance -= 1
-            elif t == TokenEnum.COMMA.name:
-                if paren_balance == 0:
-                    break
-            elif t == TokenEnum.PARAB.name:
-                paren_balance += 1
-            elif t == TokenEnum.COLCHETEA.name:
-                paren_balance += 1 # Using same counter since logic is identical for nesting
-            elif t == TokenEnum.COLCHETEF.name:
-                if paren_balance == 0:
-                    break
-                else:
-                    paren_balance -= 1
-            
-            # Stop on keywords or unrelated tokens (if balance 0? or always?)
-            # Keywords like SE, ENTAO... should not appear in valid expression unless syntax error
-            # But specific tokens like FIMALGORITMO check is good.
-            if t in [TokenEnum.FIMALGORITMO.name, TokenEnum.FIMSE.name, TokenEnum.FIMPARA.name, TokenEnum.FIMENQUANTO.name, TokenEnum.ENTAO.name]:
-                 break
-            
-            # Lexeme mapping
-            if t == TokenEnum.LOGIGUAL.name: l = "=="
-            elif t == TokenEnum.LOGDIFF.name: l = "!="
-            elif t == TokenEnum.LOGMENOR.name: l = "<"
-            elif t == TokenEnum.LOGMAIOR.name: l = ">"
-            elif t == TokenEnum.LOGMENORIGUAL.name: l = "<="
-            elif t == TokenEnum.LOGMAIORIGUAL.name: l = ">="
-            elif t == TokenEnum.E.name: l = " and "
-            elif t == TokenEnum.OU.name: l = " or "
-            elif t == TokenEnum.NAO.name: l = " not "
-            elif t == TokenEnum.COLCHETEA.name: l = "["
-            elif t == TokenEnum.COLCHETEF.name: l = "]"
-            elif t == TokenEnum.COMMA.name: l = ", "
-            elif t == TokenEnum.ATR.name: break 
-            
-            # Valid tokens
-            valid_expr_tokens = [
-                TokenEnum.ID.name, TokenEnum.NUMINT.name, TokenEnum.STRING.name, 
-                TokenEnum.OPMAIS.name, TokenEnum.OPMENOS.name, TokenEnum.OPMULTI.name, TokenEnum.OPDIVI.name,
-                TokenEnum.PARAB.name, TokenEnum.PARFE.name,
-                TokenEnum.COLCHETEA.name, TokenEnum.COLCHETEF.name, TokenEnum.COMMA.name, 
-                TokenEnum.LOGIGUAL.name, TokenEnum.LOGDIFF.name, TokenEnum.LOGMENOR.name, TokenEnum.LOGMAIOR.name,
-                TokenEnum.LOGMENORIGUAL.name, TokenEnum.LOGMAIORIGUAL.name,
-                TokenEnum.E.name, TokenEnum.OU.name, TokenEnum.NAO.name
-            ]
-            
-            # If strictly not in valid tokens, break (safety)
-            if t not in valid_expr_tokens and paren_balance == 0:
-                 break
-
-            # Adjacency check for implicit break (e.g. "20 ia_treinar")
-            # Operands: ID, NUMINT, STRING, PARFE, COLCHETEF
-            # Next Operand starts with: ID, NUMINT, STRING, PARAB, NAO, COLCHETEA
-            operands_end = [TokenEnum.ID.name, TokenEnum.NUMINT.name, TokenEnum.STRING.name, TokenEnum.PARFE.name, TokenEnum.COLCHETEF.name]
-            operands_start = [TokenEnum.ID.name, TokenEnum.NUMINT.name, TokenEnum.STRING.name, TokenEnum.PARAB.name, TokenEnum.NAO.name, TokenEnum.COLCHETEA.name]
-            
-            if len(expr_parts) > 0:
-                 # Need to know the type of previous token processed
-                 # We don't track it easily in expr_parts (strings).
-                 # We can peek current token and rely on knowing we just processed one.
-                 # Wait, checking adjacency requires knowing PREVIOUS token Type.
-                 pass
-
-            # Update prev_token_type at end of loop.
-            # But I need to check NOW before consuming.
-            
-            if last_token_type in operands_end and t in operands_start:
-                 # Special case: Function call ID + ( is allowed.
-                 # If last was ID and current is PARAB -> ALLOW.
-                 if (last_token_type == TokenEnum.ID.name and t == TokenEnum.PARAB.name) or \
-                    (last_token_type == TokenEnum.ID.name and t == TokenEnum.COLCHETEA.name) or \
-                    (last_token_type == TokenEnum.COLCHETEF.name and t == TokenEnum.COLCHETEA.name):
-                     pass
-                 else:
-                     # Break if operand follows operand (missing operator)
-                     if paren_balance == 0:
-                         break
-
-            expr_parts.append(l)
-            last_token_type = t
-            self.advance()
+    def visit_Para(self, node: Para):
+        loop = self.vector_loops.get(id(node))
+        if loop is not None:
+            return self.gen_vector_para(node, loop)
+
+        inicio_val = self.gen_expression(node.start)
+        fim_val = self.gen_expression(node.end)
+        passo_val = self.gen_expression(node.step) if node.step is not None else "1"
             
-        return "".join(expr_parts)
\ No newline at end of file
+        self.add_line(f"for {node.var.id} in {self.builtin('range')}({inicio_val}, {fim_val} + 1, {passo_val}):") # Range inclusivo
+        self.indent_level += 1
+        self.gen_block(node.body)
+        self.indent_level -= 1
+
+    def gen_vector_para(self, node: Para, loop: ElementwiseLoop):
+        for line in loop.setup_lines(self.gen_expression(node.start), self.gen_expression(node.end)):
+            self.add_line(line)
+
+        self.add_line(f"if {SLICES} is not None:")
+        self.indent_level += 1
+        for line in loop.vector_lines():
+            self.add_line(line)
+        self.indent_level -= 1
+
+        self.add_line("else:")
+        self.indent_level += 1
+        self.add_line(f"for {node.var.id} in {self.builtin('range')}({loop.fallback_range()}):")
+        self.indent_level += 1
+        self.gen_block(node.body)
+        self.indent_level -= 2
+
+    # ----------------
+    # Expressions
+    # ----------------
+    # Each generator gets the lowest precedence its position accepts
+    # (`minimum`) and wraps itself in parentheses below it.
+    def gen_expression(self, node: Node, minimum: int = 0) -> str:
+        generator = self.expression_generators.get(type(node))
+        if generator is None:
+            raise TypeError(f"Unexpected expression node {type(node).__name__}")
+
+        return generator(node, minimum)
+
+    def gen_name(self, node: Name, minimum: int) -> str:
+        return node.id
+
+    def gen_literal(self, node: Union[Number, String], minimum: int) -> str:
+        return node.text
+
+    def gen_binop(self, node: BinOp, minimum: int) -> str:
+        # Left-associative: only the right operand needs parentheses at the same
+        # level. Comparisons need them on both sides, or Python would chain them.
+        # The left operands are walked in a loop, from the innermost BinOp out.
+        first, chain = binop_chain(node)
+        minimums = [left_minimum(binop.op) for binop in chain[1:]] + [minimum]
+        text = self.gen_expression(first, left_minimum(chain[0].op))
+        for binop, outer_minimum in zip(chain, minimums):
+            precedence = OPERATOR_PRECEDENCE[binop.op]
+            right = self.gen_expression(binop.right, precedence + 1)
+            text = f"{text}{OPERATOR_TEXT[binop.op]}{right}"
+            if precedence < outer_minimum:
+                text = f"({text})"
+        return text
+
+    def gen_not(self, node: Not, minimum: int) -> str:
+        text = f"not {self.gen_expression(node.operand, PRECEDENCE_NOT)}"
+        return f"({text})" if PRECEDENCE_NOT < minimum else text
+
+    def gen_group(self, node: Group, minimum: int) -> str:
+        return self.gen_expression(node.expr, minimum)
+
+    def gen_call(self, node: Call, minimum: int) -> str:
+        args = ", ".join(self.gen_expression(arg) for arg in node.args)
+        return f"{node.func.id}({args})"
+
+    def gen_index(self, node: Index, minimum: int) -> str:
+        return f"{self.gen_expression(node.value, PRECEDENCE_ATOM)}[{self.gen_expression(node.index)}]"
+
+    def gen_list(self, node: ListLiteral, minimum: int) -> str:
+        items = ", ".join(self.gen_expression(item) for item in node.items)
+        return f"[{items}]"
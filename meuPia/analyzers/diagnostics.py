@@ -0,0 +1,22 @@
+from typing import NamedTuple, Optional
+
+# Compiler phases a diagnostic can come from
+PHASE_LEXICAL = 'lexico'
+PHASE_SYNTAX = 'sintatico'
+PHASE_SEMANTIC = 'semantico'
+
+class Diagnostic(NamedTuple):
+  # One error collected in recovery mode. message is the same text the phase
+  # raises when it stops at the first error; line/col are 1-based and None
+  # when the position is unknown (e.g. end of file on an empty input).
+  phase: Optional[str] # PHASE_*, None for errors outside the compiler phases
+  message: str
+  line: Optional[int] = None
+  col: Optional[int] = None
+
+  @property
+  def code_index(self) -> str:
+    return f'{self.line}:{self.col}'
+
+  def to_dict(self) -> dict:
+    return self._asdict()
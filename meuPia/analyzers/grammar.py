@@ -0,0 +1,261 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..utils.token_enum import TOKEN_NAMES, TOKEN_VALUES, TokenKind
+
+# ----------------
+# Declarative Portugol grammar driving syntax_analyzer.Parser.
+#
+# Lowercase symbols are nonterminals, uppercase ones are TokenKind names and an
+# empty right-hand side is ε. The last field names the Parser.build_<action>
+# method that turns the values of the right-hand side (a Token per terminal,
+# the result of each nonterminal) into an AST node; without one, a
+# single-symbol production passes its value through and ε gives None.
+#
+# Repetitions are right-recursive and build their lists back to front
+# ('lista' starts the list, 'acrescenta' appends the head), so the actions
+# reverse them once when the list is complete.
+# ----------------
+BLOCKS = {
+  # Block nonterminal -> tokens that close it
+  'bloco_programa': ('FIMALGORITMO',),
+  'bloco_se': ('SENAO', 'FIMSE'),
+  'bloco_senao': ('FIMSE',),
+  'bloco_enquanto': ('FIMENQUANTO',),
+  'bloco_para': ('FIMPARA',),
+}
+
+PRODUCTIONS: List[Tuple[str, str, Optional[str]]] = [
+  ('programa', 'ALGORITMO STRING plugins declaracoes INICIO bloco_programa FIMALGORITMO END_OF_FILE', 'programa'),
+  ('plugins', 'USAR STRING plugins', 'plugin'),
+  ('plugins', '', 'lista'),
+  ('declaracoes', 'VAR lista_declaracoes', 'segundo'),
+  ('declaracoes', '', 'lista'),
+  ('lista_declaracoes', 'declaracao lista_declaracoes', 'acrescenta'),
+  ('lista_declaracoes', '', 'lista'),
+  ('declaracao', 'ID mais_nomes COLON TIPO', 'declaracao'),
+  ('mais_nomes', 'COMMA ID mais_nomes', 'nome'),
+  ('mais_nomes', '', 'lista'),
+] + [
+  production
+  for block in BLOCKS
+  for production in ((block, f'comando {block}', 'acrescenta'), (block, '', 'lista'))
+] + [
+  ('comando', 'ID resto_id', 'comando_id'),
+  ('comando', 'ESCREVA PARAB expressao PARFE', 'escreva'),
+  ('comando', 'LEIA PARAB variavel_leia PARFE', 'leia'),
+  ('comando', 'se', None),
+  ('comando', 'enquanto', None),
+  ('comando', 'para', None),
+  ('resto_id', 'ATR expressao', 'segundo'),
+  ('resto_id', 'indices ATR expressao', 'atribuicao_indexada'),
+  ('resto_id', 'chamada', None),
+  ('indices', 'COLCHETEA expressao COLCHETEF mais_indices', 'indice'),
+  ('mais_indices', 'COLCHETEA expressao COLCHETEF mais_indices', 'indice'),
+  ('mais_indices', '', 'lista'),
+  ('chamada', 'PARAB argumentos PARFE', 'chamada'),
+  ('argumentos', 'expressao mais_argumentos', 'acrescenta'),
+  ('argumentos', '', 'lista'),
+  ('mais_argumentos', 'COMMA expressao mais_argumentos', 'argumento'),
+  ('mais_argumentos', '', 'lista'),
+  ('variavel_leia', 'ID', None),
+  ('se', 'SE condicao ENTAO bloco_se senao FIMSE', 'se'),
+  ('senao', 'SENAO bloco_senao', 'segundo'),
+  ('senao', '', 'lista'),
+  ('enquanto', 'ENQUANTO condicao faca bloco_enquanto FIMENQUANTO', 'enquanto'),
+  ('para', 'PARA ID DE termo ATE termo passo faca bloco_para FIMPARA', 'para'),
+  ('passo', 'PASSO termo', 'segundo'),
+  ('passo', '', None),
+  ('faca', 'FACA', None),
+  ('faca', '', None),
+]
+
+START = 'programa'
+
+# Expressions are parsed by the Parser's operator-precedence sub-parser; the
+# table only needs the tokens they can start with.
+EXPRESSION_FIRST = ('ID', 'NUMINT', 'STRING', 'COLCHETEA', 'PARAB')
+EXTERNAL = {
+  'expressao': EXPRESSION_FIRST,
+  'termo': EXPRESSION_FIRST,
+  'condicao': ('NAO', 'PARAB', 'ID', 'NUMINT', 'STRING'),
+}
+
+# Nonterminals that open a nesting level (counted against Parser.max_depth)
+NESTED = ('se', 'enquanto', 'para', 'chamada')
+
+# Production used when the lookahead has no LL(1) entry, mirroring what the
+# hand-written parser did in its 'else' branches: a block tries one more
+# statement (and fails on it), call arguments try an expression and an
+# identifier statement is read as an assignment. Other nullable nonterminals
+# fall back to ε and the error shows up at the next expected token.
+DEFAULTS = {
+  **{block: f'comando {block}' for block in BLOCKS},
+  'argumentos': 'expressao mais_argumentos',
+  'resto_id': 'ATR expressao',
+}
+
+# The program body also ends at the end of the file, where 'fimalgoritmo' is reported missing
+EXTRA_LOOKAHEAD = {
+  'bloco_programa': ('END_OF_FILE',),
+}
+
+# Error recovery (RECOVERY_TABLE): a nested block also ends at the end keyword
+# of an enclosing one, so a missing fim_se is reported once, at that keyword
+RECOVERY_BLOCK_ENDS = ('FIMSE', 'FIMENQUANTO', 'FIMPARA', 'FIMALGORITMO', 'END_OF_FILE')
+NESTED_BLOCKS = ('bloco_se', 'bloco_senao', 'bloco_enquanto', 'bloco_para')
+
+ERROR_MESSAGES = {
+  'comando': 'Token inesperado "{lexeme}" na linha {code_index}',
+  'variavel_leia': 'Esperado variável no comando leia, encontrado "{lexeme}" na linha {code_index}',
+}
+
+# ----------------
+# Table construction
+# ----------------
+EPSILON = ''
+
+NONTERMINALS = list(dict.fromkeys([lhs for (lhs, _, _) in PRODUCTIONS] + list(EXTERNAL)))
+NONTERMINAL_INDEX = {name: index for index, name in enumerate(NONTERMINALS)}
+NUM_KINDS = len(TOKEN_NAMES)
+
+class GrammarError(Exception):
+  pass
+
+def symbols(rhs: str) -> List[str]:
+  return rhs.split()
+
+def is_terminal(symbol: str) -> bool:
+  return symbol.isupper()
+
+def compute_first() -> Dict[str, Set[str]]:
+  first = {name: set() for name in NONTERMINALS}
+  for name, kinds in EXTERNAL.items():
+    first[name] = set(kinds)
+
+  changed = True
+  while changed:
+    changed = False
+    for (lhs, rhs, _) in PRODUCTIONS:
+      before = len(first[lhs])
+      first[lhs] |= sequence_first(symbols(rhs), first)
+      changed |= len(first[lhs]) != before
+
+  return first
+
+def sequence_first(sequence: List[str], first: Dict[str, Set[str]]) -> Set[str]:
+  # FIRST of a symbol sequence; contains EPSILON when the whole sequence is nullable
+  result = set()
+  for symbol in sequence:
+    if is_terminal(symbol):
+      result.add(symbol)
+      return result
+    result |= first[symbol] - {EPSILON}
+    if EPSILON not in first[symbol]:
+      return result
+
+  result.add(EPSILON)
+  return result
+
+def compute_follow(first: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+  follow = {name: set() for name in NONTERMINALS}
+
+  changed = True
+  while changed:
+    changed = False
+    for (lhs, rhs, _) in PRODUCTIONS:
+      sequence = symbols(rhs)
+      for i, symbol in enumerate(sequence):
+        if is_terminal(symbol):
+          continue
+        before = len(follow[symbol])
+        rest = sequence_first(sequence[i+1:], first)
+        follow[symbol] |= rest - {EPSILON}
+        if EPSILON in rest:
+          follow[symbol] |= follow[lhs]
+        changed |= len(follow[symbol]) != before
+
+  return follow
+
+FIRST = compute_first()
+FOLLOW = compute_follow(FIRST)
+
+def ll1_entries() -> Dict[Tuple[str, str], List[int]]:
+  # (nonterminal, terminal) -> productions predicted by FIRST/FOLLOW; more
+  # than one production in a cell is an LL(1) conflict
+  entries = {}
+  for index, (lhs, rhs, _) in enumerate(PRODUCTIONS):
+    predict = sequence_first(symbols(rhs), FIRST)
+    if EPSILON in predict:
+      predict = (predict - {EPSILON}) | FOLLOW[lhs]
+    for terminal in predict:
+      entries.setdefault((lhs, terminal), []).append(index)
+  return entries
+
+def conflicts() -> List[Tuple[str, str, List[int]]]:
+  return [(lhs, terminal, found) for (lhs, terminal), found in ll1_entries().items() if len(found) > 1]
+
+def find_production(lhs: str, rhs: str) -> int:
+  for index, production in enumerate(PRODUCTIONS):
+    if production[0] == lhs and production[1] == rhs:
+      return index
+  raise GrammarError(f'No production {lhs} -> {rhs}')
+
+def build_table(recovery: bool = False) -> List[int]:
+  # Flat integer table: TABLE[nonterminal * NUM_KINDS + token kind] is the
+  # production to expand, or -1 for a syntax error
+  found = conflicts()
+  if found:
+    raise GrammarError(f'LL(1) conflicts: {found}')
+
+  table = [-1] * (len(NONTERMINALS) * NUM_KINDS)
+  for (lhs, terminal), (index,) in ll1_entries().items():
+    table[NONTERMINAL_INDEX[lhs] * NUM_KINDS + getattr(TokenKind, terminal)] = index
+
+  for lhs in NONTERMINALS:
+    if lhs in EXTERNAL:
+      continue
+    row = NONTERMINAL_INDEX[lhs] * NUM_KINDS
+    epsilon = next((i for i, (name, rhs, _) in enumerate(PRODUCTIONS) if name == lhs and rhs == ''), None)
+
+    for terminal in EXTRA_LOOKAHEAD.get(lhs, ()):
+      table[row + getattr(TokenKind, terminal)] = epsilon
+    if recovery and lhs in NESTED_BLOCKS:
+      for terminal in RECOVERY_BLOCK_ENDS:
+        table[row + getattr(TokenKind, terminal)] = epsilon
+
+    default = find_production(lhs, DEFAULTS[lhs]) if lhs in DEFAULTS else epsilon
+    if default is not None:
+      for kind in range(NUM_KINDS):
+        if table[row + kind] == -1:
+          table[row + kind] = default
+
+  return table
+
+def error_message(nonterminal: str) -> str:
+  if nonterminal in ERROR_MESSAGES:
+    return ERROR_MESSAGES[nonterminal]
+
+  # Name the first token the nonterminal's first production starts with
+  expected = sequence_first(symbols(next(rhs for (lhs, rhs, _) in PRODUCTIONS if lhs == nonterminal)), FIRST)
+  expected = min(expected - {EPSILON}, key=lambda terminal: getattr(TokenKind, terminal))
+  return f'Esperado "{TOKEN_VALUES[getattr(TokenKind, expected)]}", encontrado "{{lexeme}}" na linha {{code_index}}'
+
+# ----------------
+# Integer encoding used by the parser driver: a token kind stands for itself,
+# nonterminal i is NUM_KINDS + i and a production's right-hand side is stored
+# reversed, ready to be pushed on the parse stack.
+# ----------------
+def encode(symbol: str) -> int:
+  if is_terminal(symbol):
+    return getattr(TokenKind, symbol)
+  return NUM_KINDS + NONTERMINAL_INDEX[symbol]
+
+START_SYMBOL = encode(START)
+PRODUCTION_LHS = [encode(lhs) for (lhs, _, _) in PRODUCTIONS]
+PRODUCTION_PUSH = [tuple(encode(symbol) for symbol in reversed(symbols(rhs))) for (_, rhs, _) in PRODUCTIONS]
+PRODUCTION_ACTIONS = [action for (_, _, action) in PRODUCTIONS]
+PRODUCTION_NESTED = [lhs in NESTED for (lhs, _, _) in PRODUCTIONS]
+NONTERMINAL_ERRORS = [error_message(name) if name not in EXTERNAL else None for name in NONTERMINALS]
+
+TABLE = build_table()
+RECOVERY_TABLE = build_table(recovery=True)
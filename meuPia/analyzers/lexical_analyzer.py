@@ -1,9 +1,15 @@
 import json
 import os
-from typing import Callable, List, NamedTuple, Optional
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, NamedTuple, Optional
 
-from ..utils.file_helper import read_lines_from_file
-from ..utils.token_enum import TokenEnum
+from .diagnostics import PHASE_LEXICAL, Diagnostic
+from ..utils.file_helper import LineIndex, iter_lines_from_file, read_lines_from_file
+from ..utils.token import Token
+from ..utils.token_dump import write_tokens
+from ..utils.token_enum import TOKEN_KINDS, TOKEN_NAMES, TokenEnum, TokenKind
 
 # OUTPUT_PATH_BASE removed, using argument instead
 
@@ -15,38 +21,278 @@ class TokenMatch(NamedTuple):
   end: int
   replacement: str
 
-def compile(file_path: str, output_path: str = None) -> List[str]:
+# Lexer engines: 'table' scans each line once with a precompiled master regex,
+# 'matchers' runs the original chain of match_token_* functions (kept so both
+# engines can be checked against each other).
+ENGINE_TABLE = 'table'
+ENGINE_MATCHERS = 'matchers'
+
+KEYWORDS = {
+  'até': TokenEnum.ATE,
+  'ate': TokenEnum.ATE,
+  'de': TokenEnum.DE,
+  'enquanto': TokenEnum.ENQUANTO,
+  'e': TokenEnum.E,
+  'então': TokenEnum.ENTAO,
+  'entao': TokenEnum.ENTAO,
+  'escreva': TokenEnum.ESCREVA,
+  'faça': TokenEnum.FACA,
+  'faca': TokenEnum.FACA,
+  'fim_para': TokenEnum.FIMPARA,
+  'fim_se': TokenEnum.FIMSE,
+  'fimenquanto': TokenEnum.FIMENQUANTO,
+  'leia': TokenEnum.LEIA,
+  'não': TokenEnum.NAO,
+  'nao': TokenEnum.NAO,
+  'ou': TokenEnum.OU,
+  'para': TokenEnum.PARA,
+  'passo': TokenEnum.PASSO,
+  'se': TokenEnum.SE,
+  'senão': TokenEnum.SENAO,
+  'senao': TokenEnum.SENAO,
+  'inteiro': TokenEnum.TIPO,
+  'string': TokenEnum.TIPO,
+  'cadeia': TokenEnum.TIPO,
+  # Additional Tokens (not in documentation)
+  'algoritmo': TokenEnum.ALGORITMO,
+  'var': TokenEnum.VAR,
+  'inicio': TokenEnum.INICIO,
+  'fimalgoritmo': TokenEnum.FIMALGORITMO,
+  'usar': TokenEnum.USAR,
+}
+
+_KEYWORD_KINDS = {keyword: TOKEN_KINDS[token.name] for keyword, token in KEYWORDS.items()}
+
+_OPERATOR_KINDS = {
+  '<-': TokenKind.ATR,
+  '<>': TokenKind.LOGDIFF,
+  '<=': TokenKind.LOGMENORIGUAL,
+  '>=': TokenKind.LOGMAIORIGUAL,
+  '=': TokenKind.LOGIGUAL,
+  '<': TokenKind.LOGMENOR,
+  '>': TokenKind.LOGMAIOR,
+  '+': TokenKind.OPMAIS,
+  '-': TokenKind.OPMENOS,
+  '*': TokenKind.OPMULTI,
+  '/': TokenKind.OPDIVI,
+  '(': TokenKind.PARAB,
+  ')': TokenKind.PARFE,
+  '[': TokenKind.COLCHETEA,
+  ']': TokenKind.COLCHETEF,
+  ':': TokenKind.COLON,
+  ',': TokenKind.COMMA,
+}
+
+# One alternative per token class. \s and \w follow str.isspace() and
+# str.isalnum() (plus '_'), so words are split exactly where the matchers split them.
+_MASTER_PATTERN = re.compile(r'''
+    (?P<SPACE>\s+)
+  | (?P<COMMENT>//)
+  | (?P<STRING>".*?(?<!\\)")
+  | (?P<UNTERMINATED>")
+  | (?P<WORD>\w+)
+  | (?P<OPERATOR><-|<>|<=|>=|[=<>+\-*/()\[\]:,])
+''', re.VERBOSE | re.DOTALL)
+_WORD_PATTERN = re.compile(r'\w*') # A WORD of _MASTER_PATTERN, for the matchers' error recovery
+
+# Lexer artifacts written next to the generated code:
+# 'json' writes the readable <file>_lexic-replaced.tem and <file>_lexic-lexems.tem,
+# 'binario' writes only the compact <file>_lexic-lexems.tkn (see utils.token_dump),
+# 'nenhum' writes nothing.
+ARTIFACTS_JSON = 'json'
+ARTIFACTS_BINARY = 'binario'
+ARTIFACTS_NONE = 'nenhum'
+ARTIFACT_FORMATS = (ARTIFACTS_JSON, ARTIFACTS_BINARY, ARTIFACTS_NONE)
+
+# Opt-in parallel lexing: files with at least PARALLEL_THRESHOLD_LINES lines are
+# split into chunks of PARALLEL_CHUNK_LINES lines and scanned on a process pool.
+# Smaller files are scanned in-process, where the pool start-up would dominate.
+PARALLEL_THRESHOLD_LINES = 20000
+PARALLEL_CHUNK_LINES = 5000
+
+# Recovery mode: when an `errors` list is passed, lexical errors are appended to it
+# as Diagnostics and scanning goes on past the offending characters (an unknown
+# char or a malformed word is skipped, an unterminated string ends the line).
+def compile(file_path: str, output_path: str = None, engine: str = ENGINE_TABLE, artifacts: str = ARTIFACTS_JSON,
+            parallel: bool = False, workers: Optional[int] = None, errors: Optional[List[Diagnostic]] = None) -> List[Token]:
   print('(Lexer started)')
 
+  if artifacts not in ARTIFACT_FORMATS:
+    raise ValueError(f'Unknown artifact format "{artifacts}"')
+
   if output_path:
       base_output_path = os.path.join(output_path, 'lexic_analyzer')
   else:
       base_output_path = 'output/lexic_analyzer'
 
-  os.makedirs(base_output_path, exist_ok=True)
   lines = read_lines_from_file(file_path)
+  keep_lines = artifacts == ARTIFACTS_JSON
 
-  lexeme_pairs = []
-
-  file_name = os.path.basename(file_path)
-  tokens_file_name = f'{file_name}_lexic-replaced.tem'
-  with open(os.path.join(base_output_path, tokens_file_name), 'w', encoding='utf-8') as tokens_file:
-    # Scan and write each line
+  if parallel and len(lines) >= PARALLEL_THRESHOLD_LINES:
+    print(f'Scanning {len(lines)} lines in parallel...')
+    (new_lines, lexeme_pairs) = scan_lines_parallel(lines, engine, workers, errors=errors)
+  else:
+    new_lines = []
+    lexeme_pairs = []
     for i, line in enumerate(lines):
-      print(f'Scanning line [{i+1}]...\t{line.strip()}')
-      (new_line, token_lexem) = scan_line(line, i+1)
-      tokens_file.write(new_line + '\n')
+      if keep_lines:
+        print(f'Scanning line [{i+1}]...\t{line.strip()}')
+      (new_line, token_lexem) = scan_line(line, i+1, engine, errors)
+      if keep_lines:
+        new_lines.append(new_line)
       lexeme_pairs.extend(token_lexem)
 
-  pairs_file_name = f'{file_name}_lexic-lexems.tem'
-  with open(os.path.join(base_output_path, pairs_file_name), 'w', encoding='utf-8') as lexeme_file:
-    json.dump(lexeme_pairs, lexeme_file, ensure_ascii=False, indent=2)
-    
-  print(f'Output written to {base_output_path}')
+  file_name = os.path.basename(file_path)
+  if artifacts == ARTIFACTS_JSON:
+    os.makedirs(base_output_path, exist_ok=True)
+    tokens_file_name = f'{file_name}_lexic-replaced.tem'
+    with open(os.path.join(base_output_path, tokens_file_name), 'w', encoding='utf-8') as tokens_file:
+      for new_line in new_lines:
+        tokens_file.write(new_line + '\n')
+
+    pairs_file_name = f'{file_name}_lexic-lexems.tem'
+    with open(os.path.join(base_output_path, pairs_file_name), 'w', encoding='utf-8') as lexeme_file:
+      json.dump([token.to_dict() for token in lexeme_pairs], lexeme_file, ensure_ascii=False, indent=2)
+  elif artifacts == ARTIFACTS_BINARY:
+    os.makedirs(base_output_path, exist_ok=True)
+    write_tokens(os.path.join(base_output_path, f'{file_name}_lexic-lexems.tkn'), lexeme_pairs)
+
+  if artifacts != ARTIFACTS_NONE:
+    print(f'Output written to {base_output_path}')
   print('(Lexer ended)')
   return lexeme_pairs
 
-def scan_line(line: str, lineNumber: int) -> tuple[str, List[str]]:
+def scan_chunk(lines: List[str], first_line_number: int, engine: str = ENGINE_TABLE,
+               recover: bool = False) -> tuple[List[str], List[tuple], List[Diagnostic]]:
+  # Worker side of scan_lines_parallel. Tokens go back as plain tuples, which
+  # pickle smaller and faster than Token objects.
+  new_lines = []
+  records = []
+  errors = [] if recover else None
+  for i, line in enumerate(lines):
+    (new_line, token_lexem) = scan_line(line, first_line_number + i, engine, errors)
+    new_lines.append(new_line)
+    records.extend([(token.kind, token.lexeme, token.line, token.col) for token in token_lexem])
+  return (new_lines, records, errors or [])
+
+# scan_line keeps no state across lines (no multi-line strings or comments), so
+# chunks can be scanned independently and merged in order. The first LexicalError
+# in line order is the one re-raised.
+def scan_lines_parallel(lines: List[str], engine: str = ENGINE_TABLE, workers: Optional[int] = None,
+                        chunk_lines: int = PARALLEL_CHUNK_LINES,
+                        errors: Optional[List[Diagnostic]] = None) -> tuple[List[str], List[Token]]:
+  starts = range(0, len(lines), chunk_lines)
+  chunks = [lines[start:start + chunk_lines] for start in starts]
+  first_line_numbers = [start + 1 for start in starts]
+
+  new_lines = []
+  lexeme_pairs = []
+  recover = [errors is not None] * len(chunks)
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    for (chunk_new_lines, records, chunk_errors) in pool.map(scan_chunk, chunks, first_line_numbers,
+                                                             [engine] * len(chunks), recover):
+      new_lines.extend(chunk_new_lines)
+      if errors is not None:
+        errors.extend(chunk_errors)
+      lexeme_pairs.extend([Token(kind, sys.intern(lexeme), line, col) for (kind, lexeme, line, col) in records])
+
+  return (new_lines, lexeme_pairs)
+
+# Streaming mode: yields tokens line by line without building the full list or
+# writing the .tem artifacts, so a consumer that stops early (e.g. on the first
+# syntax error) never lexes the rest of the file.
+def iter_tokens(file_path: str, engine: str = ENGINE_TABLE, line_index: Optional[LineIndex] = None,
+                errors: Optional[List[Diagnostic]] = None) -> Iterator[Token]:
+  lines = iter_lines_from_file(file_path, line_index)
+  for i, line in enumerate(lines):
+    yield from scan_line(line, i+1, engine, errors)[1]
+
+def scan_line(line: str, lineNumber: int, engine: str = ENGINE_TABLE,
+              errors: Optional[List[Diagnostic]] = None) -> tuple[str, List[Token]]:
+  if engine == ENGINE_TABLE:
+    return scan_line_table(line, lineNumber, errors)
+  if engine == ENGINE_MATCHERS:
+    return scan_line_matchers(line, lineNumber, errors)
+
+  raise ValueError(f'Unknown lexer engine "{engine}"')
+
+def report_error(errors: Optional[List[Diagnostic]], message: str, lineNumber: int, col: int):
+  if errors is None:
+    raise LexicalError(message)
+
+  errors.append(Diagnostic(PHASE_LEXICAL, message, lineNumber, col))
+
+def scan_line_table(line: str, lineNumber: int, errors: Optional[List[Diagnostic]] = None) -> tuple[str, List[Token]]:
+  match_at = _MASTER_PATTERN.match
+  line_length = len(line)
+
+  i = 0
+  token_lexem = []
+
+  while i < line_length:
+    match = match_at(line, i)
+    if match is None:
+      report_error(errors, f'Unknown char "{line[i]}" at line {lineNumber}:{i+1}', lineNumber, i + 1)
+      i += 1
+      continue
+
+    kind = match.lastgroup
+    end = match.end()
+
+    if kind == 'SPACE':
+      i = end
+      continue
+    if kind == 'COMMENT':
+      break # Ignore the rest of the line
+
+    if kind == 'WORD':
+      (token_kind, error_index) = classify_word(line, i, end)
+      if token_kind is None:
+        report_error(errors, f'Unknown char "{line[error_index]}" at line {lineNumber}:{error_index+1}',
+                     lineNumber, error_index + 1)
+        i = end # Skip the whole word
+        continue
+    elif kind == 'OPERATOR':
+      token_kind = _OPERATOR_KINDS[match.group()]
+    elif kind == 'STRING':
+      token_kind = TokenKind.STRING
+    else:
+      report_error(errors, f'Unterminated string starting at line {lineNumber}:{i}', lineNumber, i + 1)
+      break # The string runs to the end of the line
+
+    token_lexem.append(Token(token_kind, sys.intern(line[i:end]), lineNumber, i + 1))
+    i = end
+
+  return (' '.join([TOKEN_NAMES[token.kind] for token in token_lexem]), token_lexem)
+
+# Classifies the word line[start:end] and returns (token kind, error index).
+# The matchers let a keyword or number stop at an underscore inside the word
+# ("se_x", "12_"), but the "_" that follows can then never start a token, so
+# such words are reported at that underscore. A None name means a LexicalError
+# at the returned index.
+def classify_word(line: str, start: int, end: int) -> tuple[Optional[int], int]:
+  first = line[start]
+
+  if first.isdigit():
+    i = start + 1
+    while i < end and line[i].isdigit():
+      i += 1
+    if i == end:
+      return (TokenKind.NUMINT, end)
+    return (None, i if line[i] == '_' else start)
+
+  if not (first.isalpha() or first == '_'):
+    return (None, start)
+
+  boundary = line.find('_', start + 1, end)
+  while boundary != -1:
+    if line[start:boundary].lower() in _KEYWORD_KINDS:
+      return (None, boundary)
+    boundary = line.find('_', boundary + 1, end)
+
+  return (_KEYWORD_KINDS.get(line[start:end].lower(), TokenKind.ID), end)
+
+def scan_line_matchers(line: str, lineNumber: int, errors: Optional[List[Diagnostic]] = None) -> tuple[str, List[Token]]:
   token_matchers: List[Callable[[str, int], Optional[TokenMatch]]] = [
     match_token_string,
     match_token_keywords,
@@ -75,30 +321,44 @@ def scan_line(line: str, lineNumber: int) -> tuple[str, List[str]]:
     if i + 1 < len(line) and line[i:i+2] == '//':
         break # Ignore the rest of the line
 
-    match_found = False
-    
     # Run all token matchers
-    for matcher in token_matchers:
-      match = matcher(line, i, lineNumber)
-      if match:
-        # Line replacement
-        new_line_parts.append(f' {match.replacement} ')
-
-        # Token-lexeme
-        lexeme = line[match.start:match.end]
-        token_lexem.append({
-          "token": match.replacement,
-          "lexeme": lexeme,
-          "code_index": f'{lineNumber}:{match.start + 1}'
-        })
-
-        i = match.end
-        match_found = True
-        break # Exit after match
-
-    if not match_found:
+    try:
+      match = None
+      for matcher in token_matchers:
+        match = matcher(line, i, lineNumber)
+        if match:
+          break # Exit after match
+    except LexicalError as error:
+      # Unterminated string: the rest of the line is the string
+      report_error(errors, str(error), lineNumber, i + 1)
+      break
+
+    if match:
+      # Line replacement
+      new_line_parts.append(f' {match.replacement} ')
+
+      # Token-lexeme
+      lexeme = sys.intern(line[match.start:match.end])
+      token_lexem.append(Token(TOKEN_KINDS[match.replacement], lexeme, lineNumber, match.start + 1))
+
+      i = match.end
+    else:
       # Unknown char
-      raise LexicalError(f'Unknown char "{line[i]}" at line {lineNumber}:{i+1}')
+      report_error(errors, f'Unknown char "{line[i]}" at line {lineNumber}:{i+1}', lineNumber, i + 1)
+      word_end = _WORD_PATTERN.match(line, i).end()
+      if word_end == i:
+        i += 1
+        continue
+
+      # Inside a word, as in scan_line_table: the whole word is skipped,
+      # dropping the tokens already matched in it ("12" of "12_")
+      word_start = i
+      while word_start > 0 and _WORD_PATTERN.fullmatch(line[word_start - 1]):
+        word_start -= 1
+      while token_lexem and token_lexem[-1].col > word_start:
+        token_lexem.pop()
+        new_line_parts.pop()
+      i = word_end
 
   # Collapse multiple spaces into single space and trim the line
   new_line = ' '.join(''.join(new_line_parts).split())
@@ -130,41 +390,7 @@ def match_token_keywords(line: str, startIndex: int, lineNumber: int) -> Optiona
     next_valid = end >= len(line) or not line[end].isalnum()
     return prev_valid and next_valid
 
-  keywords = {
-    'até': TokenEnum.ATE,
-    'ate': TokenEnum.ATE,
-    'de': TokenEnum.DE,
-    'enquanto': TokenEnum.ENQUANTO,
-    'e': TokenEnum.E,
-    'então': TokenEnum.ENTAO,
-    'entao': TokenEnum.ENTAO,
-    'escreva': TokenEnum.ESCREVA,
-    'faça': TokenEnum.FACA,
-    'faca': TokenEnum.FACA,
-    'fim_para': TokenEnum.FIMPARA,
-    'fim_se': TokenEnum.FIMSE,
-    'fimenquanto': TokenEnum.FIMENQUANTO,
-    'leia': TokenEnum.LEIA,
-    'não': TokenEnum.NAO,
-    'nao': TokenEnum.NAO,
-    'ou': TokenEnum.OU,
-    'para': TokenEnum.PARA,
-    'passo': TokenEnum.PASSO,
-    'se': TokenEnum.SE,
-    'senão': TokenEnum.SENAO,
-    'senao': TokenEnum.SENAO,
-    'inteiro': TokenEnum.TIPO,
-    'string': TokenEnum.TIPO,
-    'cadeia': TokenEnum.TIPO,
-    # Additional Tokens (not in documentation)
-    'algoritmo': TokenEnum.ALGORITMO,
-    'var': TokenEnum.VAR,
-    'inicio': TokenEnum.INICIO,
-    'fimalgoritmo': TokenEnum.FIMALGORITMO,
-    'usar': TokenEnum.USAR,
-  }
-
-  for keyword, token in keywords.items():
+  for keyword, token in KEYWORDS.items():
     length = len(keyword)
     if line[startIndex:startIndex + length].lower() == keyword:
       if is_valid_boundary(startIndex, startIndex + length):
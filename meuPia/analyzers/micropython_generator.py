@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, Optional, Union
+from .ast_nodes import Assign, Name, Number, Program
+from .code_generator import CodeGenerator, called_functions, plugin_import
+from .optimizer import iter_statements, statement_reads, written_name
+from .symbol_table import SymbolTable
+from ..utils.token import Token
+
+# MicroPython stores small ints in a machine word minus one tag bit; const()
+# only makes sense for values that fit (31 bits on 32-bit ports)
+SMALL_INT_BITS = 30
+
+def constant_variables(program: Program) -> Dict[str, Number]:
+    # name -> value of the variables that behave as constants: assigned once,
+    # at the top level, from an int literal, and never read before that
+    writes = {}
+    for statement in iter_statements(program.body):
+        name = written_name(statement)
+        if name is not None:
+            writes[name] = writes.get(name, 0) + 1
+
+    constants, read = {}, set()
+    for statement in program.body:
+        name = written_name(statement)
+        if (isinstance(statement, Assign) and name is not None and writes[name] == 1 and name not in read
+                and isinstance(statement.value, Number) and int(statement.value.text).bit_length() <= SMALL_INT_BITS):
+            constants[name] = statement.value
+        for nested in iter_statements([statement]):
+            read |= statement_reads(nested)
+    return constants
+
+class MicroPythonGenerator(CodeGenerator):
+    # CodeGenerator for ESP32/Pico boards: the same main() with local variables
+    # and builtin aliases, without the CPython wrapper. No `import sys`, no
+    # try/except around the plugin imports (the board reports the ImportError)
+    # and main() is called directly. Variables that never change become
+    # module-level const()s with a leading underscore, which the MicroPython
+    # compiler inlines without keeping a global for them.
+    #
+    # `native` compiles main() with @micropython.native: machine code, same
+    # semantics, about twice the flash. @micropython.viper is never emitted:
+    # its integers wrap at the machine word, and Portugol's do not.
+    def __init__(self, program: Union[Program, Iterable[Token]], symbols: Optional[SymbolTable] = None,
+                 native: bool = False, plugin_infos: Optional[dict] = None):
+        super().__init__(program, symbols, plugin_infos=plugin_infos)
+        self.native = native
+        self.constants = constant_variables(self.program)
+        self.constant_names = {}
+        taken = set(self.aliases.values())
+        for name in self.constants:
+            alias = f"_{name}"
+            while self.symbols.lookup(alias) is not None or alias in taken:
+                alias = f"_{alias}"
+            taken.add(alias)
+            self.constant_names[name] = alias
+
+    def generate(self):
+        # Plugins with a manifest import only the called functions: less RAM
+        called = called_functions(self.program)
+        for plugin in self.program.plugins:
+            self.add_line(plugin_import(plugin.name, self.plugin_infos, called))
+
+        if self.constants:
+            self.add_line("from micropython import const")
+            for name, value in self.constants.items():
+                self.source_line = value.line
+                self.add_line(f"{self.constant_names[name]} = const({value.text})")
+            self.source_line = None
+
+        if self.native:
+            self.add_line("@micropython.native")
+        self.add_line("def main():")
+        self.indent_level += 1
+        self.gen_variables()
+        self.source_line = self.program.line
+        for builtin, alias in self.aliases.items():
+            self.add_line(f"{alias} = {builtin}")
+        self.source_line = None
+        self.gen_block([statement for statement in self.program.body if not self.is_constant_assignment(statement)])
+        self.indent_level -= 1
+
+        self.add_line("main()")
+        return "\n".join(self.python_code)
+
+    def gen_variables(self):
+        for declaration in self.program.declarations:
+            initial = "0" if declaration.type_name == "inteiro" else "''"
+            for name in declaration.names:
+                if name.id not in self.constants:
+                    self.source_line = name.line
+                    self.add_line(f"{name.id} = {initial}")
+        self.source_line = None
+
+    def is_constant_assignment(self, statement) -> bool:
+        return (isinstance(statement, Assign) and isinstance(statement.target, Name)
+                and self.constants.get(statement.target.id) is statement.value)
+
+    def gen_name(self, node: Name, minimum: int) -> str:
+        return self.constant_names.get(node.id, node.id)
+
+def code_size(python_code: str) -> int:
+    # Bytes the .py takes on the board's filesystem
+    return len(python_code.encode("utf-8"))
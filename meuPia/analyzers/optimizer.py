@@ -0,0 +1,317 @@
+import ast
+import operator
+from typing import Iterator, List, Set
+
+from .ast_nodes import (
+  Assign, BinOp, Call, CallStatement, Enquanto, Escreva, Group, Index, Leia, ListLiteral,
+  Name, Node, NodeVisitor, Not, Number, Para, Program, Se, String, binop_chain, iter_child_nodes,
+)
+from ..utils.token_enum import TokenKind
+
+# ----------------
+# Optional AST -> AST pass between the semantic analysis and code generation.
+#
+#   -O0  nothing, the tree goes to the generator as parsed
+#   -O1  constant folding and removal of unreachable se/senao, enquanto and
+#        para bodies
+#   -O2  -O1 plus removal of variables that are never read: their declaration
+#        and every assignment to them
+#
+# Folding follows the semantics of the generated Python. Only int and string
+# results are folded (Portugol has no float or boolean literal); `/` is left
+# alone, as it produces a float or raises at runtime. Comparisons and logic
+# are still evaluated when they decide a branch.
+# ----------------
+OPTIMIZE_NONE = 0
+OPTIMIZE_BASIC = 1
+OPTIMIZE_FULL = 2
+OPTIMIZE_LEVELS = (OPTIMIZE_NONE, OPTIMIZE_BASIC, OPTIMIZE_FULL)
+
+# Folded literals bigger than this would bloat the generated code
+MAX_FOLDED_INT_BITS = 64
+MAX_FOLDED_STRING = 256
+
+ARITHMETIC_OPERATORS = {
+  TokenKind.OPMAIS: operator.add,
+  TokenKind.OPMENOS: operator.sub,
+  TokenKind.OPMULTI: operator.mul,
+}
+
+CONDITION_OPERATORS = {
+  TokenKind.LOGIGUAL: operator.eq,
+  TokenKind.LOGDIFF: operator.ne,
+  TokenKind.LOGMENOR: operator.lt,
+  TokenKind.LOGMAIOR: operator.gt,
+  TokenKind.LOGMENORIGUAL: operator.le,
+  TokenKind.LOGMAIORIGUAL: operator.ge,
+  TokenKind.E: lambda left, right: left and right,
+  TokenKind.OU: lambda left, right: left or right,
+}
+
+UNKNOWN = object() # Value not known at compile time
+
+class Optimizer(NodeVisitor):
+  # Rewrites the program in place and returns it. Statement visitors return
+  # the list of statements that replace the visited one.
+  def __init__(self, program: Program, level: int = OPTIMIZE_FULL):
+    self.program = program
+    self.level = level
+    self.folders = {
+      BinOp: self.fold_binop,
+      Not: self.fold_not,
+      Group: self.fold_group,
+      Call: self.fold_call,
+      Index: self.fold_index,
+      ListLiteral: self.fold_list,
+    }
+
+  def optimize(self) -> Program:
+    if self.level >= OPTIMIZE_BASIC:
+      self.program.body = self.optimize_block(self.program.body)
+    if self.level >= OPTIMIZE_FULL:
+      self.remove_unused_variables()
+    return self.program
+
+  def optimize_block(self, statements: List[Node]) -> List[Node]:
+    block = []
+    for statement in statements:
+      block.extend(self.visit(statement))
+    return block
+
+  # ----------------
+  # Statements
+  # ----------------
+  def generic_visit(self, node: Node) -> List[Node]:
+    return [node]
+
+  def visit_Assign(self, node: Assign) -> List[Node]:
+    node.target = self.fold(node.target)
+    node.value = self.fold(node.value)
+    return [node]
+
+  def visit_CallStatement(self, node: CallStatement) -> List[Node]:
+    node.call = self.fold(node.call)
+    return [node]
+
+  def visit_Escreva(self, node: Escreva) -> List[Node]:
+    node.value = self.fold(node.value)
+    return [node]
+
+  def visit_Se(self, node: Se) -> List[Node]:
+    node.condition = self.fold(node.condition)
+    value = constant_value(node.condition)
+    if value is not UNKNOWN:
+      return self.optimize_block(node.body if value else node.orelse)
+
+    node.body = self.optimize_block(node.body)
+    node.orelse = self.optimize_block(node.orelse)
+    return [node]
+
+  def visit_Enquanto(self, node: Enquanto) -> List[Node]:
+    node.condition = self.fold(node.condition)
+    value = constant_value(node.condition)
+    if value is not UNKNOWN and not value:
+      return []
+
+    node.body = self.optimize_block(node.body)
+    return [node]
+
+  def visit_Para(self, node: Para) -> List[Node]:
+    node.start = self.fold(node.start)
+    node.end = self.fold(node.end)
+    node.step = self.fold(node.step) if node.step is not None else None
+
+    bounds = [constant_value(part) for part in (node.start, node.end, node.step) if part is not None]
+    if all(type(value) is int for value in bounds):
+      start, end, step = bounds if len(bounds) == 3 else bounds + [1]
+      # An empty range never runs the body nor assigns the variable
+      if step != 0 and not range(start, end + 1, step):
+        return []
+
+    node.body = self.optimize_block(node.body)
+    return [node]
+
+  # ----------------
+  # Constant folding
+  # ----------------
+  def fold(self, node: Node) -> Node:
+    folder = self.folders.get(type(node))
+    return folder(node) if folder is not None else node
+
+  def fold_binop(self, node: BinOp) -> Node:
+    # The left operands are folded in a loop, from the innermost BinOp out
+    first, chain = binop_chain(node)
+    folded = self.fold(first)
+    for binop in chain:
+      binop.left = folded
+      binop.right = self.fold(binop.right)
+      folded = self.fold_operator(binop)
+    return folded
+
+  def fold_operator(self, node: BinOp) -> Node:
+    # Both operands already folded
+    function = ARITHMETIC_OPERATORS.get(node.op)
+    if function is None:
+      return node
+
+    left = constant_value(node.left)
+    right = constant_value(node.right)
+    # int op int, or string + string; mixed types raise at runtime, keep them
+    if type(left) is int and type(right) is int:
+      value = function(left, right)
+      if value.bit_length() <= MAX_FOLDED_INT_BITS:
+        return Number(node.line, node.col, str(value))
+    elif type(left) is str and type(right) is str and node.op == TokenKind.OPMAIS:
+      value = left + right
+      if len(value) <= MAX_FOLDED_STRING:
+        return String(node.line, node.col, repr(value))
+    return node
+
+  def fold_not(self, node: Not) -> Node:
+    node.operand = self.fold(node.operand)
+    return node
+
+  def fold_group(self, node: Group) -> Node:
+    node.expr = self.fold(node.expr)
+    # (3) is just 3
+    return node.expr if isinstance(node.expr, (Number, String)) else node
+
+  def fold_call(self, node: Call) -> Node:
+    node.args = [self.fold(arg) for arg in node.args]
+    return node
+
+  def fold_index(self, node: Index) -> Node:
+    node.value = self.fold(node.value)
+    node.index = self.fold(node.index)
+    return node
+
+  def fold_list(self, node: ListLiteral) -> Node:
+    node.items = [self.fold(item) for item in node.items]
+    return node
+
+  # ----------------
+  # Unused variables
+  # ----------------
+  def remove_unused_variables(self):
+    declared = {name.id for declaration in self.program.declarations for name in declaration.names}
+    removed = set()
+    # Dropping `y <- x + 1` can leave x unread too: repeat until nothing changes
+    while True:
+      reads, kept_writes = set(), set()
+      for statement in iter_statements(self.program.body):
+        reads.update(statement_reads(statement))
+        target = written_name(statement)
+        if target is not None and not (isinstance(statement, Assign) and is_pure(statement.value)):
+          kept_writes.add(target) # leia, para and assignments with effects stay
+
+      unused = declared - removed - reads - kept_writes
+      if not unused:
+        break
+
+      removed |= unused
+      self.program.body = remove_assignments(self.program.body, unused)
+
+    for declaration in self.program.declarations:
+      declaration.names = [name for name in declaration.names if name.id not in removed]
+    self.program.declarations = [declaration for declaration in self.program.declarations if declaration.names]
+
+def constant_value(node: Node):
+  if isinstance(node, Number):
+    return int(node.text)
+  if isinstance(node, String):
+    return ast.literal_eval(node.text)
+  if isinstance(node, Group):
+    return constant_value(node.expr)
+  if isinstance(node, Not):
+    value = constant_value(node.operand)
+    return UNKNOWN if value is UNKNOWN else not value
+  if isinstance(node, BinOp):
+    first, chain = binop_chain(node)
+    value = constant_value(first)
+    for binop in chain:
+      value = operator_value(binop.op, value, constant_value(binop.right))
+    return value
+  return UNKNOWN
+
+def operator_value(op: int, left, right):
+  if left is UNKNOWN or right is UNKNOWN:
+    return UNKNOWN
+  function = CONDITION_OPERATORS.get(op) or ARITHMETIC_OPERATORS.get(op)
+  if function is None or (type(left) is not type(right) and op not in (TokenKind.LOGIGUAL, TokenKind.LOGDIFF)):
+    return UNKNOWN
+  try:
+    return function(left, right)
+  except TypeError:
+    return UNKNOWN
+
+def is_pure(node: Node) -> bool:
+  # No call, no indexing and no division: evaluating it cannot fail nor have effects
+  if isinstance(node, (Name, Number, String)):
+    return True
+  if isinstance(node, (Call, Index)):
+    return False
+  if isinstance(node, BinOp):
+    first, chain = binop_chain(node)
+    return is_pure(first) and all(binop.op != TokenKind.OPDIVI and is_pure(binop.right) for binop in chain)
+  return all(is_pure(child) for child in iter_child_nodes(node))
+
+def iter_statements(statements: List[Node]) -> Iterator[Node]:
+  for statement in statements:
+    yield statement
+    for field_name in ('body', 'orelse'):
+      yield from iter_statements(getattr(statement, field_name, ()))
+
+def written_name(statement: Node):
+  # v[i] <- ... reads v (and i) rather than writing a variable
+  if (isinstance(statement, Assign) and isinstance(statement.target, Name)) or isinstance(statement, Leia):
+    return statement.target.id
+  if isinstance(statement, Para):
+    return statement.var.id
+  return None
+
+def statement_reads(statement: Node) -> Set[str]:
+  # Names read by the statement itself, nested blocks excluded
+  if isinstance(statement, Assign):
+    expressions = [statement.value] if isinstance(statement.target, Name) else [statement.target, statement.value]
+  elif isinstance(statement, Para):
+    expressions = [statement.start, statement.end, statement.step]
+  elif isinstance(statement, (Se, Enquanto)):
+    expressions = [statement.condition]
+  elif isinstance(statement, Escreva):
+    expressions = [statement.value]
+  elif isinstance(statement, CallStatement):
+    expressions = [statement.call]
+  else:
+    expressions = []
+
+  reads = set()
+  for expression in expressions:
+    if expression is not None:
+      collect_reads(expression, reads)
+  return reads
+
+def collect_reads(node: Node, reads: Set[str]):
+  if isinstance(node, Name):
+    reads.add(node.id)
+  elif isinstance(node, Call):
+    for arg in node.args: # The function name is not a variable
+      collect_reads(arg, reads)
+  elif isinstance(node, BinOp):
+    first, chain = binop_chain(node)
+    collect_reads(first, reads)
+    for binop in chain:
+      collect_reads(binop.right, reads)
+  else:
+    for child in iter_child_nodes(node):
+      collect_reads(child, reads)
+
+def remove_assignments(statements: List[Node], names: Set[str]) -> List[Node]:
+  block = []
+  for statement in statements:
+    if isinstance(statement, Assign) and isinstance(statement.target, Name) and statement.target.id in names:
+      continue
+    for field_name in ('body', 'orelse'):
+      if hasattr(statement, field_name):
+        setattr(statement, field_name, remove_assignments(getattr(statement, field_name), names))
+    block.append(statement)
+  return block
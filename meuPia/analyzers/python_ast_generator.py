@@ -0,0 +1,297 @@
+import ast
+from types import CodeType
+from typing import Iterable, List, Optional, Union
+from .ast_nodes import (
+    Assign, BinOp, Call, CallStatement, Enquanto, Escreva, Group, Index, Leia, ListLiteral,
+    Name, Node, NodeVisitor, Not, Number, Para, Program, Se, String, binop_chain,
+)
+from .code_generator import (
+    builtin_aliases, called_functions, lazy_plugin_lines, plugin_import, plugin_missing_message, runtime_import,
+    runtime_names,
+)
+from .symbol_table import TYPE_INTEIRO, SymbolTable
+from .syntax_analyzer import Parser
+from .vectorizer import END, PRELUDE as VECTOR_PRELUDE, SLICES, START, ElementwiseLoop, elementwise_loops
+from ..utils.token import Token
+from ..utils.token_enum import TokenKind
+
+ARITHMETIC_AST = {
+    TokenKind.OPMAIS: ast.Add,
+    TokenKind.OPMENOS: ast.Sub,
+    TokenKind.OPMULTI: ast.Mult,
+    TokenKind.OPDIVI: ast.Div,
+}
+
+COMPARISON_AST = {
+    TokenKind.LOGIGUAL: ast.Eq,
+    TokenKind.LOGDIFF: ast.NotEq,
+    TokenKind.LOGMENOR: ast.Lt,
+    TokenKind.LOGMAIOR: ast.Gt,
+    TokenKind.LOGMENORIGUAL: ast.LtE,
+    TokenKind.LOGMAIORIGUAL: ast.GtE,
+}
+
+LOGIC_AST = {
+    TokenKind.E: ast.And,
+    TokenKind.OU: ast.Or,
+}
+
+class PythonAstGenerator(NodeVisitor):
+    # Second backend: builds the same program as CodeGenerator directly as a
+    # Python ast.Module, skipping the source text. Every statement and
+    # expression carries the line/column of its Portugol node, so tracebacks
+    # and coverage point at the .por file. compile() turns it into a code
+    # object that can be executed or marshalled right away.
+    def __init__(self, program: Union[Program, Iterable[Token]], symbols: Optional[SymbolTable] = None,
+                 vectorize: bool = False, fast_io: bool = False, lazy_plugins: bool = False,
+                 plugin_infos: Optional[dict] = None):
+        if not isinstance(program, Program):
+            program = Parser(program).parse()
+
+        self.program = program
+        self.symbols = symbols if symbols is not None else SymbolTable.from_program(program)
+        self.runtime = runtime_names(self.symbols) if fast_io else {}
+        self.lazy_plugins = lazy_plugins
+        self.plugin_infos = plugin_infos
+        self.aliases = builtin_aliases(program, self.symbols, fast_io)
+        self.vector_loops = elementwise_loops(program) if vectorize else {}
+        self.expression_builders = {
+            Name: self.build_name,
+            Number: self.build_number,
+            String: self.build_string,
+            BinOp: self.build_binop,
+            Not: self.build_not,
+            Group: self.build_group,
+            Call: self.build_call,
+            Index: self.build_index,
+            ListLiteral: self.build_list,
+        }
+
+    def generate(self) -> ast.Module:
+        program = self.program
+        body = [self.located(ast.Import(names=[ast.alias(name="sys")]), program)]
+
+        called = called_functions(program)
+        if self.lazy_plugins and program.plugins:
+            plugins = [plugin.name for plugin in program.plugins]
+            body.extend(self.parsed(lazy_plugin_lines(plugins, called, self.plugin_infos), program))
+
+        for plugin in program.plugins if not self.lazy_plugins else ():
+            import_from = ast.parse(plugin_import(plugin.name, self.plugin_infos, called)).body[0]
+            missing = [
+                ast.Expr(self.call(self.load("print"), [ast.Constant(plugin_missing_message(plugin.name))])),
+                ast.Expr(self.call(ast.Attribute(value=self.load("sys"), attr="exit", ctx=ast.Load()), [ast.Constant(1)])),
+            ]
+            handler = ast.ExceptHandler(type=self.load("ImportError"), name=None, body=missing)
+            body.append(self.located(ast.Try(body=[import_from], handlers=[handler], orelse=[], finalbody=[]), plugin))
+
+        if self.runtime:
+            body.extend(self.parsed([runtime_import(self.runtime)], program))
+        if self.vector_loops:
+            body.extend(self.parsed(VECTOR_PRELUDE, program))
+
+        # Portugol variables are locals of main(), as in the text backend
+        main = []
+        for declaration in program.declarations:
+            initial = 0 if declaration.type_name == "inteiro" else ""
+            for name in declaration.names:
+                main.append(self.located(ast.Assign(targets=[self.store(name.id)], value=ast.Constant(initial)), name))
+        for builtin, alias in self.aliases.items():
+            main.append(self.located(ast.Assign(targets=[self.store(alias)], value=self.load(builtin)), program))
+        main.extend(self.gen_block(program.body))
+
+        body.append(self.located(self.function_def("main", main), program))
+
+        call_main = [ast.Expr(self.call(self.load("main"), []))]
+        if self.runtime:
+            # Buffered output is written even when the program fails
+            flush = [ast.Expr(self.call(self.load(self.runtime["descarrega"]), []))]
+            call_main = [ast.Try(body=call_main, handlers=[], orelse=[], finalbody=flush)]
+        run_main = ast.If(
+            test=ast.Compare(left=self.load("__name__"), ops=[ast.Eq()], comparators=[ast.Constant("__main__")]),
+            body=call_main,
+            orelse=[],
+        )
+        body.append(self.located(run_main, program))
+
+        return ast.fix_missing_locations(ast.Module(body=body, type_ignores=[]))
+
+    def compile(self, filename: str = "<meupia>") -> CodeType:
+        return compile(self.generate(), filename, "exec")
+
+    def gen_block(self, statements: List[Node]) -> List[ast.stmt]:
+        # Python needs at least one statement in every block. A visitor returns
+        # a list when one Portugol statement needs several Python ones
+        block = []
+        for statement in statements:
+            python_statement = self.visit(statement)
+            if isinstance(python_statement, list):
+                block.extend(python_statement)
+            else:
+                block.append(python_statement)
+        return block or [ast.Pass()]
+
+    # ----------------
+    # Helpers
+    # ----------------
+    def located(self, python_node: ast.AST, node: Node) -> ast.AST:
+        python_node.lineno = python_node.end_lineno = node.line
+        python_node.col_offset = python_node.end_col_offset = node.col - 1
+        return python_node
+
+    def parsed(self, lines: List[str], node: Node) -> List[ast.stmt]:
+        # Fixed Python code (runtime helpers), placed at the node's position
+        statements = ast.parse("\n".join(lines)).body
+        for statement in statements:
+            for python_node in ast.walk(statement):
+                if "lineno" in python_node._attributes:
+                    self.located(python_node, node)
+        return statements
+
+    def load(self, name: str) -> ast.Name:
+        return ast.Name(id=name, ctx=ast.Load())
+
+    def store(self, name: str) -> ast.Name:
+        return ast.Name(id=name, ctx=ast.Store())
+
+    def call(self, func: ast.expr, args: List[ast.expr]) -> ast.Call:
+        return ast.Call(func=func, args=args, keywords=[])
+
+    def builtin(self, name: str) -> ast.Name:
+        return self.load(self.aliases.get(name, name))
+
+    def print_call(self, args: List[ast.expr]) -> ast.Expr:
+        return ast.Expr(self.call(self.builtin("print"), args))
+
+    def function_def(self, name: str, body: List[ast.stmt]) -> ast.FunctionDef:
+        arguments = ast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        function = ast.FunctionDef(name=name, args=arguments, body=body, decorator_list=[], returns=None)
+        if "type_params" in ast.FunctionDef._fields: # Python 3.12+
+            function.type_params = []
+        return function
+
+    # ----------------
+    # Statements
+    # ----------------
+    def visit_Assign(self, node: Assign) -> ast.stmt:
+        if isinstance(node.target, Index):
+            target = self.located(ast.Subscript(value=self.gen_expression(node.target.value),
+                                                slice=self.gen_expression(node.target.index), ctx=ast.Store()), node.target)
+        else:
+            target = self.located(self.store(node.target.id), node.target)
+        return self.located(ast.Assign(targets=[target], value=self.gen_expression(node.value)), node)
+
+    def visit_CallStatement(self, node: CallStatement) -> ast.stmt:
+        return self.located(ast.Expr(self.gen_expression(node.call)), node)
+
+    def visit_Escreva(self, node: Escreva) -> ast.stmt:
+        if self.runtime:
+            return self.located(ast.Expr(self.call(self.load(self.runtime["escreva"]), [self.gen_expression(node.value)])), node)
+        return self.located(self.print_call([self.gen_expression(node.value)]), node)
+
+    def visit_Leia(self, node: Leia) -> ast.stmt:
+        symbol = self.symbols.lookup(node.target.id)
+        is_int = symbol is not None and symbol.type_name == TYPE_INTEIRO
+        if self.runtime:
+            value = self.call(self.load(self.runtime["leia_inteiro" if is_int else "leia_texto"]), [])
+        else:
+            value = self.call(self.builtin("input"), [])
+            if is_int:
+                value = self.call(self.builtin("int"), [value])
+
+        return self.located(ast.Assign(targets=[self.store(node.target.id)], value=value), node)
+
+    def visit_Se(self, node: Se) -> ast.stmt:
+        orelse = self.gen_block(node.orelse) if node.orelse else []
+        return self.located(ast.If(test=self.gen_expression(node.condition), body=self.gen_block(node.body), orelse=orelse), node)
+
+    def visit_Enquanto(self, node: Enquanto) -> ast.stmt:
+        return self.located(ast.While(test=self.gen_expression(node.condition), body=self.gen_block(node.body), orelse=[]), node)
+
+    def visit_Para(self, node: Para) -> Union[ast.stmt, List[ast.stmt]]:
+        loop = self.vector_loops.get(id(node))
+        if loop is not None:
+            return self.gen_vector_para(node, loop)
+
+        # Range inclusivo
+        end = ast.BinOp(left=self.gen_expression(node.end), op=ast.Add(), right=ast.Constant(1))
+        step = self.gen_expression(node.step) if node.step is not None else ast.Constant(1)
+        loop = ast.For(
+            target=self.store(node.var.id),
+            iter=self.call(self.builtin("range"), [self.gen_expression(node.start), end, step]),
+            body=self.gen_block(node.body),
+            orelse=[],
+        )
+        return self.located(loop, node)
+
+    def gen_vector_para(self, node: Para, loop: ElementwiseLoop) -> List[ast.stmt]:
+        # Same statements as CodeGenerator.gen_vector_para; the bounds are
+        # built here, the rest is the vectorizer's fixed code
+        statements = self.parsed(loop.setup_lines("None", "None"), node)
+        statements[0].value = self.gen_expression(node.start)
+        statements[1].value = self.gen_expression(node.end)
+
+        branch = self.parsed([f"if {SLICES} is not None:"] + [f"    {line}" for line in loop.vector_lines()] + ["else:", "    pass"], node)[0]
+        end = ast.BinOp(left=self.load(END), op=ast.Add(), right=ast.Constant(1))
+        fallback = ast.For(
+            target=self.store(node.var.id),
+            iter=self.call(self.builtin("range"), [self.load(START), end]),
+            body=self.gen_block(node.body),
+            orelse=[],
+        )
+        branch.orelse = [self.located(fallback, node)]
+        return statements + [branch]
+
+    # ----------------
+    # Expressions
+    # ----------------
+    def gen_expression(self, node: Node) -> ast.expr:
+        builder = self.expression_builders.get(type(node))
+        if builder is None:
+            raise TypeError(f"Unexpected expression node {type(node).__name__}")
+
+        return self.located(builder(node), node)
+
+    def build_name(self, node: Name) -> ast.expr:
+        return self.load(node.id)
+
+    def build_number(self, node: Number) -> ast.expr:
+        return ast.Constant(int(node.text))
+
+    def build_string(self, node: String) -> ast.expr:
+        # The lexeme is a valid Python string literal, as in the text backend
+        return ast.Constant(ast.literal_eval(node.text))
+
+    def build_binop(self, node: BinOp) -> ast.expr:
+        # The left operands are built in a loop, from the innermost BinOp out
+        first, chain = binop_chain(node)
+        result = self.gen_expression(first)
+        for binop in chain:
+            result = self.located(self.combine_binop(binop, result, self.gen_expression(binop.right)), binop)
+        return result
+
+    def combine_binop(self, node: BinOp, left: ast.expr, right: ast.expr) -> ast.expr:
+        if node.op in ARITHMETIC_AST:
+            return ast.BinOp(left=left, op=ARITHMETIC_AST[node.op](), right=right)
+        if node.op in COMPARISON_AST:
+            return ast.Compare(left=left, ops=[COMPARISON_AST[node.op]()], comparators=[right])
+
+        # a e b e c is a single BoolOp, as Python parses it
+        op = LOGIC_AST[node.op]
+        values = left.values if isinstance(left, ast.BoolOp) and isinstance(left.op, op) else [left]
+        return ast.BoolOp(op=op(), values=values + [right])
+
+    def build_not(self, node: Not) -> ast.expr:
+        return ast.UnaryOp(op=ast.Not(), operand=self.gen_expression(node.operand))
+
+    def build_group(self, node: Group) -> ast.expr:
+        return self.gen_expression(node.expr)
+
+    def build_call(self, node: Call) -> ast.expr:
+        return self.call(self.load(node.func.id), [self.gen_expression(arg) for arg in node.args])
+
+    def build_index(self, node: Index) -> ast.expr:
+        return ast.Subscript(value=self.gen_expression(node.value), slice=self.gen_expression(node.index), ctx=ast.Load())
+
+    def build_list(self, node: ListLiteral) -> ast.expr:
+        return ast.List(elts=[self.gen_expression(item) for item in node.items], ctx=ast.Load())
@@ -1,41 +1,58 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Union
 
-from ..utils.token_enum import TokenEnum
+from .ast_nodes import Assign, Call, Index, ListLiteral, Name, Node, NodeVisitor, Program
+from .diagnostics import PHASE_SEMANTIC, Diagnostic
+from .symbol_table import SymbolTable
+from .syntax_analyzer import Parser
+from ..utils.plugin_index import PluginInfo
+from ..utils.token import Token
 
 class SemanticError(Exception):
   pass
 
-class SemanticAnalyzer:
-  def __init__(self, lexemePairs: List[Dict[str, str]]):
-    self.lexeme_pairs = lexemePairs
-    self.declared_vars = []
-    self.pos = 0
-
-  def current_token(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['token']
-    
-    return TokenEnum.END_OF_FILE.name
-  
-  def current_lexeme(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['lexeme']
-    
-    return ' '
-  
-  def current_code_index(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['code_index']
-    
-    return self.lexeme_pairs[-1].get('code_index', 'unknown')
-
-  def advance(self):
-    self.pos += 1
-
-  def check_token(self, expected: TokenEnum) -> bool:
-    return self.current_token() == expected.name
+class SemanticAnalyzer(NodeVisitor):
+  # Works on the AST built by the parser. Raw tokens (a list or a lazy iterator)
+  # are still accepted and parsed here first. validate() fills `symbols`
+  # (see symbol_table), which the code generator reuses.
+  #
+  # Recovery mode: when an `errors` list is passed, every double declaration and
+  # every undeclared variable (once per name) is appended to it as a Diagnostic
+  # instead of stopping at the first one.
+  #
+  # `plugins` maps the program's `usar` names to their PluginInfo (see
+  # utils/plugin_index). With it, calls are checked against the plugin
+  # manifests: wrong argument counts are errors, and so are unknown functions
+  # when every plugin used has a manifest (otherwise an `import *` may still
+  # define them). Without it any call is accepted.
+  def __init__(self, program: Union[Program, Iterable[Token]], errors: Optional[List[Diagnostic]] = None,
+               plugins: Optional[Dict[str, PluginInfo]] = None):
+    # None: the parser gave up on the program in recovery mode; nothing to check
+    if program is not None and not isinstance(program, Program):
+      program = Parser(program, errors=errors).parse()
+
+    self.program = program
+    self.errors = errors
+    self.symbols = SymbolTable()
+    self.undeclared_vars = set()
+    self.unknown_functions = set()
+    self.plugin_functions = None
+    self.closed_plugins = False
+    if plugins is not None:
+      self.plugin_functions = {}
+      for info in plugins.values(): # In `usar` order: later plugins win, as with import *
+        self.plugin_functions.update(info.functions or {})
+      self.closed_plugins = bool(plugins) and all(info.functions is not None for info in plugins.values())
+
+  def report(self, message: str, node: Node):
+    if self.errors is None:
+      raise SemanticError(message)
+
+    self.errors.append(Diagnostic(PHASE_SEMANTIC, message, node.line, node.col))
 
   def validate(self):
+    if self.program is None:
+      return # Nothing left to check after an unrecoverable syntax error
+
     self.get_declared_variables()
     self.validate_variable_usage()
 
@@ -43,49 +60,60 @@ class SemanticAnalyzer:
   # Validations
   # ----------------
   def get_declared_variables(self):
-    in_var_block = False
-
-    while self.pos < len(self.lexeme_pairs):
-      # Identify the start of the var block
-      if self.check_token(TokenEnum.VAR):
-        in_var_block = True
-      elif self.check_token(TokenEnum.INICIO):
-        break
-      elif in_var_block and self.check_token(TokenEnum.ID):
-        lexeme = self.current_lexeme()
-
-        if self.is_variable_declared(lexeme):
-          code_index = self.current_code_index()
-          raise SemanticError(f'Double declaration for variable "{lexeme}" at line {code_index}')
-        
-        self.declared_vars.append(self.lexeme_pairs[self.pos])
-
-      self.advance()
-
+    for declaration in self.program.declarations:
+      for name in declaration.names:
+        if self.symbols.lookup_local(name.id) is not None:
+          self.report(f'Double declaration for variable "{name.id}" at line {name.code_index}', name)
+        else:
+          self.symbols.declare_variable(name, declaration.type_name)
+
+  # Statements are visited in source order, so the first undeclared use
+  # reported is the same one a left-to-right reading finds.
   def validate_variable_usage(self):
-    self.pos = 0
-    in_code_block = False
-
-    while self.pos < len(self.lexeme_pairs):
-      # Identify the start of the code block
-      if self.check_token(TokenEnum.INICIO):
-        in_code_block = True
-      elif in_code_block and self.check_token(TokenEnum.ID):
-        lexeme = self.current_lexeme()
-
-        # Check declaration
-        is_function_call = False
-        if self.pos + 1 < len(self.lexeme_pairs):
-            if self.lexeme_pairs[self.pos + 1]['token'] == TokenEnum.PARAB.name:
-                is_function_call = True
-
-        if is_function_call:
-            pass # Allow all function calls, runtime will handle errors
-        elif not self.is_variable_declared(lexeme):
-          code_index = self.current_code_index()
-          raise SemanticError(f'Undeclared variable "{lexeme}" used at line {code_index}.')
-
-      self.advance()
-  
+    for statement in self.program.body:
+      self.visit(statement)
+
+  def visit_Name(self, node: Name):
+    if not self.is_variable_declared(node.id) and node.id not in self.undeclared_vars:
+      self.undeclared_vars.add(node.id)
+      self.report(f'Undeclared variable "{node.id}" used at line {node.code_index}.', node)
+
+  def visit_Call(self, node: Call):
+    if self.plugin_functions is not None:
+      self.check_plugin_call(node)
+    if self.symbols.lookup(node.func.id) is None:
+      self.symbols.declare_function(node.func)
+
+    for arg in node.args:
+      self.visit(arg)
+
+  def check_plugin_call(self, node: Call):
+    name = node.func.id
+    arity = self.plugin_functions.get(name)
+    if arity is None:
+      if self.closed_plugins and name not in self.unknown_functions:
+        self.unknown_functions.add(name)
+        self.report(f'Unknown function "{name}" called at line {node.code_index}.', node)
+      return
+
+    minimum, maximum = arity
+    if len(node.args) < minimum or (maximum is not None and len(node.args) > maximum):
+      expected = str(minimum) if minimum == maximum else f'{minimum} to {maximum}' if maximum is not None else f'at least {minimum}'
+      self.report(f'Function "{name}" expects {expected} argument(s), got {len(node.args)} at line {node.code_index}.', node)
+
+  def visit_Assign(self, node: Assign):
+    self.generic_visit(node)
+    if isinstance(node.value, ListLiteral):
+      self.mark_array(node.target)
+
+  def visit_Index(self, node: Index):
+    self.generic_visit(node)
+    self.mark_array(node.value)
+
+  def mark_array(self, node: Node):
+    symbol = self.symbols.lookup(node.id) if isinstance(node, Name) else None
+    if symbol is not None:
+      symbol.is_array = True
+
   def is_variable_declared(self, lexeme) -> bool:
-    return any(var['lexeme'] == lexeme for var in self.declared_vars)
+    return self.symbols.lookup(lexeme) is not None
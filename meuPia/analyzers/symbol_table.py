@@ -0,0 +1,102 @@
+from typing import Dict, Iterator, Optional
+
+from .ast_nodes import Name, Program
+
+# ----------------
+# Symbol table built by the semantic analysis and handed to the code
+# generator. Every scope is a dict, so declaring and resolving a name costs
+# O(1) however many variables the program has; lookups walk outwards through
+# the enclosing scopes. Portugol programs only have the global scope today;
+# enter_scope()/leave_scope() are there for procedures and functions.
+# ----------------
+SYMBOL_VARIABLE = 'variavel'
+SYMBOL_FUNCTION = 'funcao' # Called but not declared: a plugin (or Python) function
+
+TYPE_INTEIRO = 'inteiro'
+TYPE_CADEIA = 'cadeia'
+
+# TIPO lexemes -> type; 'string' is an alias of cadeia
+TYPE_NAMES = {
+  'inteiro': TYPE_INTEIRO,
+  'cadeia': TYPE_CADEIA,
+  'string': TYPE_CADEIA,
+}
+
+class Symbol:
+  __slots__ = ('name', 'kind', 'type_name', 'line', 'col', 'is_array')
+
+  def __init__(self, name: str, kind: str, type_name: Optional[str], line: int, col: int):
+    self.name = name
+    self.kind = kind
+    self.type_name = type_name # TYPE_*, None for functions
+    self.line = line # Declaration (or first call) position
+    self.col = col
+    self.is_array = False # Assigned a list or indexed somewhere
+
+  @property
+  def code_index(self) -> str:
+    return f'{self.line}:{self.col}'
+
+  def __repr__(self) -> str:
+    array = '[]' if self.is_array else ''
+    return f'Symbol({self.kind} {self.name}: {self.type_name}{array}, {self.code_index})'
+
+class Scope:
+  def __init__(self, parent: Optional['Scope'] = None):
+    self.parent = parent
+    self.symbols: Dict[str, Symbol] = {}
+
+  def lookup(self, name: str) -> Optional[Symbol]:
+    scope = self
+    while scope is not None:
+      symbol = scope.symbols.get(name)
+      if symbol is not None:
+        return symbol
+      scope = scope.parent
+    return None
+
+class SymbolTable:
+  def __init__(self):
+    self.globals = Scope()
+    self.scope = self.globals
+
+  @classmethod
+  def from_program(cls, program: Program) -> 'SymbolTable':
+    # Declarations only, without validation (first declaration wins); used when
+    # the code generator runs without a semantic analysis
+    table = cls()
+    for declaration in program.declarations:
+      for name in declaration.names:
+        if table.lookup_local(name.id) is None:
+          table.declare_variable(name, declaration.type_name)
+    return table
+
+  def enter_scope(self):
+    self.scope = Scope(self.scope)
+
+  def leave_scope(self):
+    self.scope = self.scope.parent
+
+  def declare_variable(self, name: Name, type_lexeme: str) -> Symbol:
+    symbol = Symbol(name.id, SYMBOL_VARIABLE, TYPE_NAMES.get(type_lexeme, type_lexeme), name.line, name.col)
+    self.scope.symbols[name.id] = symbol
+    return symbol
+
+  def declare_function(self, name: Name) -> Symbol:
+    # Functions always live in the global scope
+    symbol = Symbol(name.id, SYMBOL_FUNCTION, None, name.line, name.col)
+    self.globals.symbols[name.id] = symbol
+    return symbol
+
+  def lookup(self, name: str) -> Optional[Symbol]:
+    return self.scope.lookup(name)
+
+  def lookup_local(self, name: str) -> Optional[Symbol]:
+    return self.scope.symbols.get(name)
+
+  def variables(self) -> Iterator[Symbol]:
+    # Global variables in declaration order
+    return (symbol for symbol in self.globals.symbols.values() if symbol.kind == SYMBOL_VARIABLE)
+
+  def functions(self) -> Iterator[Symbol]:
+    return (symbol for symbol in self.globals.symbols.values() if symbol.kind == SYMBOL_FUNCTION)
@@ -1,300 +1,861 @@
-from typing import Dict, List
-
-from ..utils.token_enum import TokenEnum
+from types import GeneratorType
+from typing import Callable, Iterable, List, Optional
+
+from . import grammar
+from .diagnostics import PHASE_SYNTAX, Diagnostic
+from .ast_nodes import (
+  Assign, BinOp, Call, CallStatement, Enquanto, Escreva, Group, Index, Leia, ListLiteral,
+  Name, Node, Not, Number, Para, PluginUse, Program, Se, String, VarDeclaration,
+)
+from ..utils.token import Token
+from ..utils.token_enum import TOKEN_VALUES, TokenKind
+from ..utils.token_stream import as_token_stream
+
+# Nesting limit of the AST (blocks, parentheses, brackets, calls and operator
+# chains). It keeps the later tree walks well inside Python's recursion limit;
+# CPython's own parser stops at 200 nested parentheses too.
+DEFAULT_MAX_DEPTH = 200
+
+ARITHMETIC_OPERATORS = (TokenKind.OPMAIS, TokenKind.OPMENOS, TokenKind.OPMULTI, TokenKind.OPDIVI)
+COMPARISON_OPERATORS = (
+  TokenKind.LOGIGUAL, TokenKind.LOGDIFF,
+  TokenKind.LOGMENOR, TokenKind.LOGMENORIGUAL,
+  TokenKind.LOGMAIOR, TokenKind.LOGMAIORIGUAL,
+)
+
+# Binary operator precedence indexed by token kind (0: not an operator). All
+# operators are left-associative: * and / bind tighter than + and -, e tighter
+# than ou, which is also how the generated Python evaluates them.
+def precedence_table(levels: dict) -> List[int]:
+  table = [0] * grammar.NUM_KINDS
+  for kind, level in levels.items():
+    table[kind] = level
+  return table
+
+ARITHMETIC_PRECEDENCE = precedence_table({
+  TokenKind.OPMAIS: 1, TokenKind.OPMENOS: 1, TokenKind.OPMULTI: 2, TokenKind.OPDIVI: 2,
+})
+LOGIC_PRECEDENCE = precedence_table({TokenKind.OU: 1, TokenKind.E: 2})
+
+# Error recovery: after an error the parser skips tokens up to one of these (or
+# to an identifier starting a later line) and resumes the enclosing block.
+STATEMENT_KEYWORDS = (TokenKind.SE, TokenKind.ENQUANTO, TokenKind.PARA, TokenKind.ESCREVA, TokenKind.LEIA)
+BLOCK_END_KEYWORDS = (TokenKind.FIMSE, TokenKind.FIMENQUANTO, TokenKind.FIMPARA, TokenKind.FIMALGORITMO)
+STATEMENT_SYNC = STATEMENT_KEYWORDS + BLOCK_END_KEYWORDS + (TokenKind.SENAO,)
+CONDITION_SYNC = STATEMENT_SYNC + (TokenKind.ENTAO, TokenKind.FACA)
+
+# Grammar nonterminals an error unwinds to, with the tokens they resume at
+RECOVERY_SYNC = {
+  **{grammar.encode(block): STATEMENT_SYNC for block in grammar.BLOCKS},
+  grammar.encode('lista_declaracoes'): (TokenKind.INICIO,),
+}
+CONDITION = grammar.encode('condicao')
 
 class SyntacticError(Exception):
   pass
 
+class SyntacticLimitError(SyntacticError):
+  # max_depth/max_tokens exceeded; never recovered from
+  pass
+
 class Parser:
-  def __init__(self, lexemePairs: List[Dict[str, str]]):
-    self.lexeme_pairs = lexemePairs
-    self.pos = 0
-
-  def current_token(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['token']
-    
-    return TokenEnum.END_OF_FILE.name
-  
+  # lexemePairs may be a list or a lazy token iterator (see lexical_analyzer.iter_tokens);
+  # tokens are pulled through a two-token lookahead window. parse() validates the
+  # program and returns its AST (see ast_nodes).
+  #
+  # Statements are parsed by an LL(1) driver over the grammar declared in
+  # grammar.py: the parse stack holds integer symbols and a single table
+  # lookup picks each production; the build_<action> methods turn the values
+  # of a finished production into AST nodes.
+  #
+  # Expressions (the grammar's external nonterminals) are parsed by rules that
+  # are generators: a rule yields the sub-rule it needs and is resumed with
+  # its result. run() keeps those frames on an explicit stack, so deep
+  # programs never raise RecursionError; they fail with a SyntacticError once
+  # max_depth (or max_tokens, when set) is exceeded. Rules that need no
+  # sub-rule (leaf terms) may return their node directly.
+  #
+  # Recovery mode: when an `errors` list is passed, syntax errors are appended
+  # to it as Diagnostics; the parser resynchronizes on the next statement
+  # and keeps going. parse() returns the partial AST, or None when the program
+  # header itself could not be parsed.
+  def __init__(self, lexemePairs: Iterable[Token], max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+               max_tokens: Optional[int] = None, errors: Optional[List[Diagnostic]] = None):
+    self.tokens = as_token_stream(lexemePairs)
+    self.max_depth = max_depth
+    self.max_tokens = max_tokens
+    self.depth = 0
+    self.errors = errors
+    self.recovery_position = None
+    self.failed_symbol = None
+
+    self.actions = [getattr(self, f'build_{action}') if action else None for action in grammar.PRODUCTION_ACTIONS]
+    self.externals = {
+      grammar.encode('expressao'): self.grammar_arithmetic_expression,
+      grammar.encode('termo'): self.grammar_arithmetic_term,
+      CONDITION: self.grammar_logic_expression,
+    }
+
+  def current_token(self) -> int:
+    token = self.tokens.current()
+    if token is not None:
+      return token.kind
+
+    return TokenKind.END_OF_FILE
+
   def current_lexeme(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['lexeme']
-    
+    token = self.tokens.current()
+    if token is not None:
+      return token.lexeme
+
     return ' '
-  
+
   def current_code_index(self) -> str:
-    if self.pos < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos]['code_index']
+    token = self.tokens.current()
+    if token is not None:
+      return token.code_index
+
+    return self.tokens.last_code_index()
+
+  def current_line(self) -> Optional[int]:
+    token = self.tokens.current()
+    if token is not None:
+      return token.line
+    return None
+
+  def peek_next_token(self) -> Optional[int]:
+    token = self.tokens.peek(1)
+    if token is not None:
+      return token.kind
+    return None
+
+  def advance(self):
+    if self.max_tokens is not None and self.tokens.position >= self.max_tokens:
+      code_index = self.current_code_index()
+      raise SyntacticLimitError(f'Programa excede o limite de {self.max_tokens} tokens na linha {code_index}')
 
-    return self.lexeme_pairs[-1].get('code_index', 'unknown')
+    self.tokens.advance()
 
-  def peek_next_token(self) -> str:
-    if self.pos + 1 < len(self.lexeme_pairs):
-      return self.lexeme_pairs[self.pos + 1]['token']
-    return ''
+  def enter(self):
+    self.depth += 1
+    if self.max_depth is not None and self.depth > self.max_depth:
+      code_index = self.current_code_index()
+      raise SyntacticLimitError(f'Aninhamento excede o limite de {self.max_depth} níveis na linha {code_index}')
+
+  def leave(self, levels: int = 1):
+    self.depth -= levels
+
+  def run(self, rule: Callable):
+    frame = rule()
+    if type(frame) is not GeneratorType:
+      return frame
+
+    stack = [frame]
+    push = stack.append
+    pop = stack.pop
+    result = None
+    while stack:
+      try:
+        sub_rule = stack[-1].send(result)
+      except StopIteration as done:
+        pop()
+        result = done.value
+      else:
+        frame = sub_rule()
+        if type(frame) is GeneratorType:
+          push(frame)
+          result = None
+        else:
+          result = frame
+
+    return result
+
+  def report(self, error: SyntacticError):
+    if self.errors is None:
+      raise error
+
+    token = self.tokens.current() or self.tokens.last
+    if token is not None:
+      self.errors.append(Diagnostic(PHASE_SYNTAX, str(error), token.line, token.col))
+    else:
+      self.errors.append(Diagnostic(PHASE_SYNTAX, str(error)))
+
+  # Skips to the next token in sync_kinds or to an identifier starting a line
+  # after error_line (the usual start of an assignment or call)
+  def synchronize(self, sync_kinds: tuple, error_line: Optional[int]):
+    token = self.tokens.current()
+    while token is not None:
+      if token.kind in sync_kinds or (token.kind == TokenKind.ID and token.line != error_line):
+        return
+      self.tokens.advance()
+      token = self.tokens.current()
+
+  def expect_token(self, expected: int) -> Token:
+    token = self.tokens.current()
+    if token is not None and token.kind == expected:
+      self.advance()
+      return token
 
-  def expect_token(self, expected: TokenEnum):
-    if self.current_token() == expected.name:
-      self.pos += 1
-      return
-    
     lexeme = self.current_lexeme()
     code_index = self.current_code_index()
-    raise SyntacticError(f'Esperado "{expected.value}", encontrado "{lexeme}" na linha {code_index}')
-  
-  def check_token(self, expected: TokenEnum) -> bool:
-    return self.current_token() == expected.name
-  
-  def check_token_any(self, expected: List[TokenEnum]) -> bool:
-    return any(self.current_token() == t.name for t in expected)
-
-  def parse(self):
-    self.expect_token(TokenEnum.ALGORITMO)
-    self.expect_token(TokenEnum.STRING)
-    
-    # Optional Plugin Imports
-    while self.check_token(TokenEnum.USAR):
-        self.expect_token(TokenEnum.USAR)
-        self.expect_token(TokenEnum.STRING)
+    raise SyntacticError(f'Esperado "{TOKEN_VALUES[expected]}", encontrado "{lexeme}" na linha {code_index}')
 
-    if self.check_token(TokenEnum.VAR):
-      self.grammar_variable_block()
+  def check_token(self, expected: int) -> bool:
+    return self.current_token() == expected
 
-    self.expect_token(TokenEnum.INICIO)
+  def check_token_any(self, expected: tuple) -> bool:
+    return self.current_token() in expected
 
-    while not self.check_token_any([TokenEnum.FIMALGORITMO, TokenEnum.END_OF_FILE]):
-      self.statement()
-
-    self.expect_token(TokenEnum.FIMALGORITMO)
-
-    if self.pos < len(self.lexeme_pairs):
-      extra_lexeme = self.current_lexeme()
-      code_index = self.current_code_index()
-      raise SyntacticError(f'Código inesperado após "fimalgoritmo": "{extra_lexeme}" na linha {code_index}')
-
-  def statement(self):
-    # --- ALTERAÇÃO PRINCIPAL ---
-    if self.check_token(TokenEnum.ID):
-      # Verifica o que vem depois do ID para decidir
-      next_tok = self.peek_next_token()
-      
-      if next_tok == TokenEnum.ATR.name:
-        self.grammar_var_assignment()
-      elif next_tok == TokenEnum.PARAB.name:
-        self.grammar_function_call()
+  # ----------------
+  # LL(1) driver
+  # ----------------
+  def parse(self) -> Program:
+    self.depth = 0
+    stack = [grammar.START_SYMBOL]
+    heights = [] # len(values) when each production on the stack was expanded
+    values = []
+    table = grammar.TABLE if self.errors is None else grammar.RECOVERY_TABLE
+
+    while True:
+      try:
+        self.drive(table, stack, heights, values)
+        return values[0]
+      except SyntacticLimitError:
+        raise
+      except SyntacticError as error:
+        if self.errors is None:
+          raise
+        if not self.recover(error, stack, heights, values):
+          return None
+
+  # Runs the parse stack until it is empty. A popped symbol is a production
+  # marker (~production, negative), a token kind to match or a nonterminal to
+  # expand. Every right-hand side symbol leaves exactly one entry on `values`,
+  # so a finished production takes the values above its height.
+  def drive(self, table: List[int], stack: List[int], heights: List[int], values: list):
+    tokens = self.tokens
+    actions = self.actions
+    externals = self.externals
+    pushes = grammar.PRODUCTION_PUSH
+    nested = grammar.PRODUCTION_NESTED
+    num_kinds = grammar.NUM_KINDS
+    end_of_file = TokenKind.END_OF_FILE
+    pop = stack.pop
+    push = stack.append
+    extend = stack.extend
+    push_value = values.append
+
+    while stack:
+      symbol = pop()
+      if symbol < 0:
+        production = ~symbol
+        height = heights.pop()
+        action = actions[production]
+        if action is not None:
+          node = action(*values[height:])
+        elif len(values) > height:
+          node = values[height]
+        else:
+          node = None
+        del values[height:]
+        push_value(node)
+        if nested[production]:
+          self.depth -= 1
+        continue
+
+      token = tokens.current()
+      kind = token.kind if token is not None else end_of_file
+      if symbol < num_kinds:
+        if kind != symbol:
+          raise self.unexpected(symbol)
+        push_value(token)
+        if token is not None:
+          self.advance()
+      elif symbol in externals:
+        try:
+          push_value(self.run(externals[symbol]))
+        except SyntacticError:
+          self.failed_symbol = symbol
+          raise
       else:
-        # Fallback para erro ou atribuição mal formada
-        self.grammar_var_assignment()
-
-    elif self.check_token(TokenEnum.ESCREVA):
-      self.grammar_command_escreva()
-    elif self.check_token(TokenEnum.LEIA):
-      self.grammar_command_leia()
-    elif self.check_token(TokenEnum.SE):
-      self.grammar_command_se()
-    elif self.check_token(TokenEnum.ENQUANTO):
-      self.grammar_command_enquanto()
-    elif self.check_token(TokenEnum.PARA):
-      self.grammar_command_para()
+        production = table[(symbol - num_kinds) * num_kinds + kind]
+        if production < 0:
+          raise self.unexpected(symbol)
+        if nested[production]:
+          self.enter()
+        heights.append(len(values))
+        push(~production)
+        extend(pushes[production])
+
+  def unexpected(self, symbol: int) -> SyntacticError:
+    self.failed_symbol = symbol
+    lexeme = self.current_lexeme()
+    code_index = self.current_code_index()
+
+    if symbol == TokenKind.END_OF_FILE:
+      return SyntacticError(f'Código inesperado após "fimalgoritmo": "{lexeme}" na linha {code_index}')
+    if symbol < grammar.NUM_KINDS:
+      return SyntacticError(f'Esperado "{TOKEN_VALUES[symbol]}", encontrado "{lexeme}" na linha {code_index}')
+
+    message = grammar.NONTERMINAL_ERRORS[symbol - grammar.NUM_KINDS]
+    return SyntacticError(message.format(lexeme=lexeme, code_index=code_index))
+
+  # Reports `error` and leaves the parse stack ready to resume. A missing block
+  # end (or trailing code) is reported and taken as present and a bad
+  # condition is skipped in place; anything else unwinds to the nearest block
+  # or declaration list, dropping the unfinished statement.
+  def recover(self, error: SyntacticError, stack: List[int], heights: List[int], values: list) -> bool:
+    symbol = self.failed_symbol
+    if symbol in BLOCK_END_KEYWORDS:
+      self.report(error)
+      values.append(None)
+      return True
+
+    if symbol == TokenKind.END_OF_FILE:
+      self.report(error)
+      while not self.tokens.at_end():
+        self.tokens.advance()
+      values.append(None)
+      return True
+
+    if symbol == CONDITION:
+      error_line = self.current_line()
+      self.report(error)
+      self.synchronize(CONDITION_SYNC, error_line)
+      values.append(None)
+      return True
+
+    # The nonterminal to resume and the marker of the production it belongs to
+    resume = len(stack) - 1
+    while resume >= 0 and stack[resume] not in RECOVERY_SYNC:
+      resume -= 1
+    owner = resume - 1
+    while owner >= 0 and stack[owner] >= 0:
+      owner -= 1
+
+    if owner < 0 or grammar.PRODUCTION_LHS[~stack[owner]] == grammar.START_SYMBOL:
+      self.report(error) # Program header: nothing to resume
+      return False
+
+    # Keep the values of the symbols its production had finished and stand in
+    # None for the rest up to it, then drop everything above it
+    production = ~stack[owner]
+    size = len(grammar.PRODUCTION_PUSH[production])
+    pending = owner + 1
+    while pending < len(stack) and stack[pending] >= 0:
+      pending += 1
+    finished = size - (pending - owner - 1) - 1 # The last popped symbol is unfinished
+    wanted = size - (resume - owner)
+
+    del heights[sum(1 for entry in stack[:owner+1] if entry < 0):]
+    del values[heights[-1] + finished:]
+    values.extend([None] * (wanted - finished))
+    sync_kinds = RECOVERY_SYNC[stack[resume]]
+    del stack[resume+1:]
+    self.depth = sum(1 for entry in stack if entry < 0 and grammar.PRODUCTION_NESTED[~entry])
+
+    error_line = self.current_line()
+    if self.tokens.position == self.recovery_position:
+      # Failed again where the last recovery stopped: skip that token instead
+      # of reporting the same spot twice
+      if self.tokens.at_end():
+        return False
+      self.tokens.advance()
     else:
-      lexeme = self.current_lexeme()
-      code_index = self.current_code_index()
-      raise SyntacticError(f'Token inesperado "{lexeme}" na linha {code_index}')
+      self.report(error)
+
+    self.synchronize(sync_kinds, error_line)
+    self.recovery_position = self.tokens.position
+    return True
 
   # ----------------
-  # Gramáticas
+  # Ações (see grammar.PRODUCTIONS)
   # ----------------
-  
-  # --- NOVA GRAMÁTICA: CHAMADA DE FUNÇÃO ---
-  def grammar_function_call(self):
-    self.expect_token(TokenEnum.ID)     # Nome da função (ex: ia_treinar)
-    self.expect_token(TokenEnum.PARAB)  # (
-    
-    # Se não fechar parenteses logo, temos argumentos
-    if not self.check_token(TokenEnum.PARFE):
-        self.grammar_arithmetic_expression() # Primeiro argumento
-        
-        # Enquanto houver vírgula, temos mais argumentos
-        while self.check_token(TokenEnum.COMMA):
-            self.expect_token(TokenEnum.COMMA)
-            self.grammar_arithmetic_expression()
+  def build_lista(self) -> list:
+    return []
 
-    self.expect_token(TokenEnum.PARFE)  # )
+  def build_acrescenta(self, head: Optional[Node], tail: list) -> list:
+    if head is not None: # None: dropped by error recovery
+      tail.append(head)
+    return tail
 
-  def grammar_variable_block(self):
-    self.expect_token(TokenEnum.VAR)
+  def build_segundo(self, keyword: Token, value):
+    return value
 
-    while self.check_token(TokenEnum.ID):
-      self.expect_token(TokenEnum.ID)
+  def build_programa(self, start: Token, name: Token, plugins: list, declarations: list, inicio: Token,
+                     body: list, end: Token, end_of_file: Token) -> Program:
+    return Program(start.line, start.col, name.lexeme, plugins[::-1], declarations[::-1], body[::-1])
 
-      # IDs opcionais separados por vírgula
-      while self.check_token(TokenEnum.COMMA):
-        self.expect_token(TokenEnum.COMMA)
-        self.expect_token(TokenEnum.ID)
+  def build_plugin(self, keyword: Token, plugin: Token, tail: list) -> list:
+    tail.append(PluginUse(plugin.line, plugin.col, plugin.lexeme.strip('"')))
+    return tail
 
-      self.expect_token(TokenEnum.COLON)
-      self.expect_token(TokenEnum.TIPO)
+  def build_declaracao(self, first: Token, names: list, colon: Token, type_token: Token) -> VarDeclaration:
+    names.append(Name(first.line, first.col, first.lexeme))
+    return VarDeclaration(first.line, first.col, names[::-1], type_token.lexeme)
 
-  def grammar_var_assignment(self):
-    self.expect_token(TokenEnum.ID)
-    self.expect_token(TokenEnum.ATR)
-    self.grammar_arithmetic_expression()
+  def build_nome(self, comma: Token, token: Token, tail: list) -> list:
+    tail.append(Name(token.line, token.col, token.lexeme))
+    return tail
 
-  def grammar_command_escreva(self):
-    self.expect_token(TokenEnum.ESCREVA)
-    self.expect_token(TokenEnum.PARAB)
+  def build_comando_id(self, token: Token, rest) -> Node:
+    # rest: the assigned expression, the argument list of a call, or the
+    # (indices, expression) pair of an indexed assignment
+    name = Name(token.line, token.col, token.lexeme)
+    if isinstance(rest, list):
+      call = Call(token.line, token.col, name, rest)
+      return CallStatement(call.line, call.col, call)
+    if isinstance(rest, tuple):
+      indices, value = rest
+      target = name
+      for index in reversed(indices):
+        target = Index(token.line, token.col, target, index)
+      return Assign(token.line, token.col, target, value)
 
-    # Termos suportados por escreva
-    # Nota: Poderíamos expandir aqui para aceitar expressões completas no futuro
-    # Termos suportados por escreva
-    self.grammar_arithmetic_expression()
+    return Assign(token.line, token.col, name, rest)
 
-    self.expect_token(TokenEnum.PARFE)
+  def build_atribuicao_indexada(self, indices: list, atr: Token, value: Node) -> tuple:
+    return indices, value
 
-  def grammar_command_leia(self):
-    self.expect_token(TokenEnum.LEIA)
-    self.expect_token(TokenEnum.PARAB)
+  def build_indice(self, colchetea: Token, index: Node, colchetef: Token, tail: list) -> list:
+    tail.append(index)
+    return tail
 
-    if self.check_token(TokenEnum.ID):
-      self.expect_token(TokenEnum.ID)
-    else:
-      lexeme = self.current_lexeme()
-      code_index = self.current_code_index()
-      raise SyntacticError(f'Esperado variável no comando leia, encontrado "{lexeme}" na linha {code_index}')
+  def build_chamada(self, parab: Token, args: list, parfe: Token) -> list:
+    return args[::-1]
 
-    self.expect_token(TokenEnum.PARFE)
-  
-  def grammar_command_se(self):
-    self.expect_token(TokenEnum.SE)
-    self.grammar_logic_expression()
-
-    self.expect_token(TokenEnum.ENTAO)
-    while not self.check_token_any([TokenEnum.SENAO, TokenEnum.FIMSE]):
-      self.statement()
-    
-    if self.check_token(TokenEnum.SENAO):
-      self.expect_token(TokenEnum.SENAO)
-      while not self.check_token(TokenEnum.FIMSE):
-        self.statement()
-
-    self.expect_token(TokenEnum.FIMSE)
-
-  def grammar_command_enquanto(self):
-    self.expect_token(TokenEnum.ENQUANTO)
-    self.grammar_logic_expression()
-    
-    if self.check_token(TokenEnum.FACA):
-        self.expect_token(TokenEnum.FACA)
-    
-    while not self.check_token(TokenEnum.FIMENQUANTO):
-      self.statement()
-
-    self.expect_token(TokenEnum.FIMENQUANTO)
-
-  def grammar_command_para(self):
-    self.expect_token(TokenEnum.PARA)
-    self.expect_token(TokenEnum.ID)
-    
-    # Sintaxe: PARA id DE inicio ATE fim [FACA]
-    self.expect_token(TokenEnum.DE)
-    self.grammar_arithmetic_term() # Inicio (valor ou id)
-    
-    self.expect_token(TokenEnum.ATE)
-    self.grammar_arithmetic_term() # Fim definition
-    
-    # Passo opcional
-    if self.check_token(TokenEnum.PASSO):
-      self.expect_token(TokenEnum.PASSO)
-      self.grammar_arithmetic_term() # Passo value
+  def build_argumento(self, comma: Token, value: Node, tail: list) -> list:
+    tail.append(value)
+    return tail
+
+  def build_escreva(self, keyword: Token, parab: Token, value: Node, parfe: Token) -> Escreva:
+    return Escreva(keyword.line, keyword.col, value)
+
+  def build_leia(self, keyword: Token, parab: Token, target: Token, parfe: Token) -> Leia:
+    return Leia(keyword.line, keyword.col, Name(target.line, target.col, target.lexeme))
+
+  def build_se(self, keyword: Token, condition: Node, entao: Token, body: list, orelse: list, end: Token) -> Se:
+    return Se(keyword.line, keyword.col, condition, body[::-1], orelse[::-1])
+
+  def build_enquanto(self, keyword: Token, condition: Node, faca: Token, body: list, end: Token) -> Enquanto:
+    return Enquanto(keyword.line, keyword.col, condition, body[::-1])
 
-    if self.check_token(TokenEnum.FACA):
-        self.expect_token(TokenEnum.FACA)
+  def build_para(self, keyword: Token, var: Token, de: Token, start: Node, ate: Token, end: Node,
+                 step: Optional[Node], faca: Token, body: list, fim: Token) -> Para:
+    # After a recovered error in the header, var (like start and end) may be None
+    name = Name(var.line, var.col, var.lexeme) if var is not None else None
+    return Para(keyword.line, keyword.col, name, start, end, step, body[::-1])
 
-    while not self.check_token(TokenEnum.FIMPARA):
-      self.statement()
+  # ----------------
+  # Expressões
+  # ----------------
+  def grammar_function_call(self) -> Call:
+    name = self.expect_token(TokenKind.ID)     # Nome da função (ex: ia_treinar)
+    self.enter()
+    self.expect_token(TokenKind.PARAB)  # (
 
-    self.expect_token(TokenEnum.FIMPARA)
+    # Se não fechar parenteses logo, temos argumentos
+    args = []
+    if not self.check_token(TokenKind.PARFE):
+        args.append((yield self.grammar_arithmetic_expression)) # Primeiro argumento
+
+        # Enquanto houver vírgula, temos mais argumentos
+        while self.check_token(TokenKind.COMMA):
+            self.expect_token(TokenKind.COMMA)
+            args.append((yield self.grammar_arithmetic_expression))
+
+    self.expect_token(TokenKind.PARFE)  # )
+    self.leave()
+    return Call(name.line, name.col, Name(name.line, name.col, name.lexeme), args)
 
   #
   # Fundamental
   #
-  def grammar_arithmetic_expression(self):
-    self.grammar_arithmetic_term()
-    
-    while self.check_token_any([TokenEnum.OPMAIS, TokenEnum.OPMENOS, TokenEnum.OPMULTI, TokenEnum.OPDIVI]):
-      self.pos += 1
-      self.grammar_arithmetic_term()
-
-  def grammar_arithmetic_term(self):
-    if self.check_token(TokenEnum.ID):
-      if self.peek_next_token() == TokenEnum.PARAB.name:
-        self.grammar_function_call()
+  # A number, string or plain variable not followed by any of `operators` is the
+  # common case; it is consumed here so the rule needs no frame of its own.
+  def single_token_term(self, operators: tuple = ()) -> Optional[Node]:
+    token = self.tokens.current()
+    if token is None:
+      return None
+
+    next_kind = self.peek_next_token()
+    if next_kind in operators:
+      return None
+
+    if token.kind == TokenKind.NUMINT:
+      node = Number(token.line, token.col, token.lexeme)
+    elif token.kind == TokenKind.STRING:
+      node = String(token.line, token.col, token.lexeme)
+    elif token.kind == TokenKind.ID and next_kind != TokenKind.PARAB and next_kind != TokenKind.COLCHETEA:
+      node = Name(token.line, token.col, token.lexeme)
+    else:
+      return None
+
+    self.advance()
+    return node
+
+  def grammar_arithmetic_expression(self) -> Node:
+    node = self.single_token_term(ARITHMETIC_OPERATORS)
+    if node is not None:
+      return node
+
+    return self.grammar_binary_expression(self.grammar_arithmetic_term, ARITHMETIC_PRECEDENCE)
+
+  # "operand (op operand)*" by operator precedence, building the same
+  # left-associative BinOp trees as one rule per precedence level would. Each
+  # precedence level the expression climbs to counts as one nesting level
+  # until an operator of lower precedence closes it; more operators of the
+  # same level do not, since the tree walks follow a left-deep chain in a loop.
+  def grammar_binary_expression(self, operand_rule: Callable, precedence: List[int]) -> Node:
+    operands = [(yield operand_rule)]
+    operators = []
+    chains = [0, 0, 0] # 1 for each precedence level open
+
+    while True:
+      token = self.tokens.current()
+      level = precedence[token.kind] if token is not None else 0
+      if not level:
+        break
+
+      while operators and precedence[operators[-1]] >= level:
+        self.reduce_binary(operands, operators)
+      for higher in range(level + 1, len(chains)):
+        self.leave(chains[higher])
+        chains[higher] = 0
+
+      operators.append(token.kind)
+      self.advance()
+      if not chains[level]:
+        self.enter()
+        chains[level] = 1
+      operands.append((yield operand_rule))
+
+    while operators:
+      self.reduce_binary(operands, operators)
+    self.leave(sum(chains))
+    return operands[0]
+
+  def reduce_binary(self, operands: List[Node], operators: List[int]):
+    right = operands.pop()
+    left = operands.pop()
+    operands.append(BinOp(left.line, left.col, left, operators.pop(), right))
+
+  def grammar_arithmetic_term(self) -> Node:
+    node = self.single_token_term()
+    if node is not None:
+      return node
+
+    return self.grammar_compound_term()
+
+  def grammar_compound_term(self) -> Node:
+    kind = self.current_token()
+    if kind == TokenKind.ID:
+      if self.peek_next_token() == TokenKind.PARAB:
+        return (yield self.grammar_function_call)
       else:
-        self.expect_token(TokenEnum.ID)
-        while self.check_token(TokenEnum.COLCHETEA):
-            self.expect_token(TokenEnum.COLCHETEA)
-            self.grammar_arithmetic_expression()
-            self.expect_token(TokenEnum.COLCHETEF)
-    elif self.check_token(TokenEnum.NUMINT):
-      self.expect_token(TokenEnum.NUMINT)
-    elif self.check_token(TokenEnum.STRING):
-      self.expect_token(TokenEnum.STRING)
-    elif self.check_token(TokenEnum.COLCHETEA):
-      self.expect_token(TokenEnum.COLCHETEA)
+        token = self.expect_token(TokenKind.ID)
+        value = Name(token.line, token.col, token.lexeme)
+        chain = 0
+        while self.check_token(TokenKind.COLCHETEA):
+            self.enter()
+            chain += 1
+            self.expect_token(TokenKind.COLCHETEA)
+            index = (yield self.grammar_arithmetic_expression)
+            self.expect_token(TokenKind.COLCHETEF)
+            value = Index(token.line, token.col, value, index)
+        self.leave(chain)
+        return value
+    elif kind == TokenKind.NUMINT:
+      token = self.expect_token(TokenKind.NUMINT)
+      return Number(token.line, token.col, token.lexeme)
+    elif kind == TokenKind.STRING:
+      token = self.expect_token(TokenKind.STRING)
+      return String(token.line, token.col, token.lexeme)
+    elif kind == TokenKind.COLCHETEA:
+      self.enter()
+      token = self.expect_token(TokenKind.COLCHETEA)
       # Recursive list support
-      if not self.check_token(TokenEnum.COLCHETEF):
-          self.grammar_arithmetic_expression()
-          while self.check_token(TokenEnum.COMMA):
-              self.expect_token(TokenEnum.COMMA)
-              self.grammar_arithmetic_expression()
-      self.expect_token(TokenEnum.COLCHETEF)
-    elif self.check_token(TokenEnum.PARAB):
-      self.expect_token(TokenEnum.PARAB)
-      self.grammar_arithmetic_expression()
-      self.expect_token(TokenEnum.PARFE)
+      items = []
+      if not self.check_token(TokenKind.COLCHETEF):
+          items.append((yield self.grammar_arithmetic_expression))
+          while self.check_token(TokenKind.COMMA):
+              self.expect_token(TokenKind.COMMA)
+              items.append((yield self.grammar_arithmetic_expression))
+      self.expect_token(TokenKind.COLCHETEF)
+      self.leave()
+      return ListLiteral(token.line, token.col, items)
+    elif kind == TokenKind.PARAB:
+      self.enter()
+      token = self.expect_token(TokenKind.PARAB)
+      expr = (yield self.grammar_arithmetic_expression)
+      self.expect_token(TokenKind.PARFE)
+      self.leave()
+      return Group(token.line, token.col, expr)
     else:
       code_index = self.current_code_index()
       # Aqui entra um ponto de melhoria futuro: Suporte a listas [1,2] exigiria alteração no TokenEnum primeiro
       raise SyntacticError(f'Esperado identificador ou valor na expressão, linha {code_index}')
 
-  def grammar_logic_expression(self):
-    self.grammar_logic_comparison()
-    while self.check_token_any([TokenEnum.E, TokenEnum.OU]):
-      self.pos += 1
-      self.grammar_logic_comparison()
-
-  def grammar_logic_comparison(self):
-    if self.check_token(TokenEnum.NAO):
-      self.expect_token(TokenEnum.NAO)
-      self.grammar_logic_comparison()
-    elif self.check_token(TokenEnum.PARAB):
-      self.expect_token(TokenEnum.PARAB)
-      self.grammar_logic_expression()
-      self.expect_token(TokenEnum.PARFE)
+  def grammar_logic_expression(self) -> Node:
+    return self.grammar_binary_expression(self.grammar_logic_comparison, LOGIC_PRECEDENCE)
+
+  def grammar_logic_comparison(self) -> Node:
+    kind = self.current_token()
+    if kind == TokenKind.NAO:
+      self.enter()
+      token = self.expect_token(TokenKind.NAO)
+      operand = (yield self.grammar_logic_comparison)
+      self.leave()
+      return Not(token.line, token.col, operand)
+    elif kind == TokenKind.PARAB:
+      self.enter()
+      token = self.expect_token(TokenKind.PARAB)
+      expr = (yield self.grammar_logic_expression)
+      self.expect_token(TokenKind.PARFE)
+      self.leave()
+      return Group(token.line, token.col, expr)
     else:
-      self.grammar_logic_operand()
-      if self.check_token_any([
-        TokenEnum.LOGIGUAL, TokenEnum.LOGDIFF,
-        TokenEnum.LOGMENOR, TokenEnum.LOGMENORIGUAL,
-        TokenEnum.LOGMAIOR, TokenEnum.LOGMAIORIGUAL
-      ]):
-        self.pos += 1
-        self.grammar_logic_operand()
+      left = (yield self.grammar_logic_operand)
+      if self.check_token_any(COMPARISON_OPERATORS):
+        op = self.current_token()
+        self.advance()
+        right = (yield self.grammar_logic_operand)
+        return BinOp(left.line, left.col, left, op, right)
       else:
         code_index = self.current_code_index()
         raise SyntacticError(f'Faltando operador de comparação na linha {code_index}')
 
-  def grammar_logic_operand(self):
-    if self.check_token(TokenEnum.ID):
-      self.expect_token(TokenEnum.ID)
-    elif self.check_token(TokenEnum.NUMINT):
-      self.expect_token(TokenEnum.NUMINT)
-    elif self.check_token(TokenEnum.STRING):
-      self.expect_token(TokenEnum.STRING)
-    elif self.check_token(TokenEnum.PARAB):
-      self.expect_token(TokenEnum.PARAB)
-      self.grammar_logic_expression()
-      self.expect_token(TokenEnum.PARFE)
+  def grammar_logic_operand(self) -> Node:
+    kind = self.current_token()
+    if kind == TokenKind.ID:
+      token = self.expect_token(TokenKind.ID)
+      return Name(token.line, token.col, token.lexeme)
+    elif kind == TokenKind.NUMINT:
+      token = self.expect_token(TokenKind.NUMINT)
+      return Number(token.line, token.col, token.lexeme)
+    elif kind == TokenKind.STRING:
+      token = self.expect_token(TokenKind.STRING)
+      return String(token.line, token.col, token.lexeme)
+    elif kind == TokenKind.PARAB:
+      self.enter()
+      token = self.expect_token(TokenKind.PARAB)
+      expr = (yield self.grammar_logic_expression)
+      self.expect_token(TokenKind.PARFE)
+      self.leave()
+      return Group(token.line, token.col, expr)
     else:
       code_index = self.current_code_index()
-      raise SyntacticError(f'Operando lógico inválido na linha {code_index}')
\ No newline at end of file
+      raise SyntacticError(f'Operando lógico inválido na linha {code_index}')
+
+class RecursiveDescentParser(Parser):
+  # The hand-written statement rules the grammar table replaced, run as plain
+  # recursive descent: one Python frame per rule, no nesting limit and no error
+  # recovery. Kept as the reference for benchmarks/bench_parser.py and for the
+  # parity tests against the LL(1) driver.
+  def __init__(self, lexemePairs: Iterable[Token], max_tokens: Optional[int] = None):
+    super().__init__(lexemePairs, max_depth=None, max_tokens=max_tokens)
+
+  def run(self, rule: Callable):
+    frame = rule()
+    if type(frame) is not GeneratorType:
+      return frame
+
+    result = None
+    while True:
+      try:
+        sub_rule = frame.send(result)
+      except StopIteration as done:
+        return done.value
+
+      result = self.run(sub_rule)
+
+  def parse(self) -> Program:
+    self.depth = 0
+    return self.run(self.grammar_program)
+
+  def grammar_program(self):
+    start = self.expect_token(TokenKind.ALGORITMO)
+    name = self.expect_token(TokenKind.STRING)
+
+    # Optional Plugin Imports
+    plugins = []
+    while self.check_token(TokenKind.USAR):
+        self.expect_token(TokenKind.USAR)
+        plugin = self.expect_token(TokenKind.STRING)
+        plugins.append(PluginUse(plugin.line, plugin.col, plugin.lexeme.strip('"')))
+
+    declarations = []
+    if self.check_token(TokenKind.VAR):
+      declarations = self.grammar_variable_block()
+
+    self.expect_token(TokenKind.INICIO)
+
+    body = yield from self.grammar_block((TokenKind.FIMALGORITMO, TokenKind.END_OF_FILE))
+
+    self.expect_token(TokenKind.FIMALGORITMO)
+
+    if not self.tokens.at_end():
+      extra_lexeme = self.current_lexeme()
+      code_index = self.current_code_index()
+      raise SyntacticError(f'Código inesperado após "fimalgoritmo": "{extra_lexeme}" na linha {code_index}')
+
+    return Program(start.line, start.col, name.lexeme, plugins, declarations, body)
+
+  def grammar_block(self, terminators: tuple):
+    body = []
+    while not self.check_token_any(terminators):
+      body.append((yield self.statement))
+    return body
+
+  def statement(self) -> Node:
+    # --- ALTERAÇÃO PRINCIPAL ---
+    if self.check_token(TokenKind.ID):
+      # Verifica o que vem depois do ID para decidir
+      next_tok = self.peek_next_token()
+
+      if next_tok in (TokenKind.ATR, TokenKind.COLCHETEA):
+        return (yield self.grammar_var_assignment)
+      elif next_tok == TokenKind.PARAB:
+        call = (yield self.grammar_function_call)
+        return CallStatement(call.line, call.col, call)
+      else:
+        # Fallback para erro ou atribuição mal formada
+        return (yield self.grammar_var_assignment)
+
+    elif self.check_token(TokenKind.ESCREVA):
+      return (yield self.grammar_command_escreva)
+    elif self.check_token(TokenKind.LEIA):
+      return self.grammar_command_leia()
+    elif self.check_token(TokenKind.SE):
+      return (yield self.grammar_command_se)
+    elif self.check_token(TokenKind.ENQUANTO):
+      return (yield self.grammar_command_enquanto)
+    elif self.check_token(TokenKind.PARA):
+      return (yield self.grammar_command_para)
+    else:
+      lexeme = self.current_lexeme()
+      code_index = self.current_code_index()
+      raise SyntacticError(f'Token inesperado "{lexeme}" na linha {code_index}')
+
+  # ----------------
+  # Gramáticas
+  # ----------------
+  def grammar_variable_block(self) -> List[VarDeclaration]:
+    self.expect_token(TokenKind.VAR)
+
+    declarations = []
+    while self.check_token(TokenKind.ID):
+      declarations.append(self.grammar_variable_declaration())
+
+    return declarations
+
+  def grammar_variable_declaration(self) -> VarDeclaration:
+    first = self.expect_token(TokenKind.ID)
+    names = [Name(first.line, first.col, first.lexeme)]
+
+    # IDs opcionais separados por vírgula
+    while self.check_token(TokenKind.COMMA):
+      self.expect_token(TokenKind.COMMA)
+      token = self.expect_token(TokenKind.ID)
+      names.append(Name(token.line, token.col, token.lexeme))
+
+    self.expect_token(TokenKind.COLON)
+    type_token = self.expect_token(TokenKind.TIPO)
+    return VarDeclaration(first.line, first.col, names, type_token.lexeme)
+
+  def grammar_var_assignment(self) -> Assign:
+    token = self.expect_token(TokenKind.ID)
+    target = Name(token.line, token.col, token.lexeme)
+    # v[i][j] <- ...
+    while self.check_token(TokenKind.COLCHETEA):
+      self.expect_token(TokenKind.COLCHETEA)
+      index = (yield self.grammar_arithmetic_expression)
+      self.expect_token(TokenKind.COLCHETEF)
+      target = Index(token.line, token.col, target, index)
+    self.expect_token(TokenKind.ATR)
+    value = (yield self.grammar_arithmetic_expression)
+    return Assign(token.line, token.col, target, value)
+
+  def grammar_command_escreva(self) -> Escreva:
+    keyword = self.expect_token(TokenKind.ESCREVA)
+    self.expect_token(TokenKind.PARAB)
+
+    # Termos suportados por escreva
+    # Nota: Poderíamos expandir aqui para aceitar expressões completas no futuro
+    # Termos suportados por escreva
+    value = (yield self.grammar_arithmetic_expression)
+
+    self.expect_token(TokenKind.PARFE)
+    return Escreva(keyword.line, keyword.col, value)
+
+  def grammar_command_leia(self) -> Leia:
+    keyword = self.expect_token(TokenKind.LEIA)
+    self.expect_token(TokenKind.PARAB)
+
+    if self.check_token(TokenKind.ID):
+      target = self.expect_token(TokenKind.ID)
+    else:
+      lexeme = self.current_lexeme()
+      code_index = self.current_code_index()
+      raise SyntacticError(f'Esperado variável no comando leia, encontrado "{lexeme}" na linha {code_index}')
+
+    self.expect_token(TokenKind.PARFE)
+    return Leia(keyword.line, keyword.col, Name(target.line, target.col, target.lexeme))
+
+  def grammar_command_se(self) -> Se:
+    self.enter()
+    keyword = self.expect_token(TokenKind.SE)
+    condition = (yield self.grammar_logic_expression)
+
+    self.expect_token(TokenKind.ENTAO)
+    body = yield from self.grammar_block((TokenKind.SENAO, TokenKind.FIMSE))
+
+    orelse = []
+    if self.check_token(TokenKind.SENAO):
+      self.expect_token(TokenKind.SENAO)
+      orelse = yield from self.grammar_block((TokenKind.FIMSE,))
+
+    self.expect_token(TokenKind.FIMSE)
+    self.leave()
+    return Se(keyword.line, keyword.col, condition, body, orelse)
+
+  def grammar_command_enquanto(self) -> Enquanto:
+    self.enter()
+    keyword = self.expect_token(TokenKind.ENQUANTO)
+    condition = (yield self.grammar_logic_expression)
+
+    if self.check_token(TokenKind.FACA):
+        self.expect_token(TokenKind.FACA)
+
+    body = yield from self.grammar_block((TokenKind.FIMENQUANTO,))
+
+    self.expect_token(TokenKind.FIMENQUANTO)
+    self.leave()
+    return Enquanto(keyword.line, keyword.col, condition, body)
+
+  def grammar_command_para(self) -> Para:
+    self.enter()
+    keyword = self.expect_token(TokenKind.PARA)
+    var = self.expect_token(TokenKind.ID)
+
+    # Sintaxe: PARA id DE inicio ATE fim [FACA]
+    self.expect_token(TokenKind.DE)
+    start = (yield self.grammar_arithmetic_term) # Inicio (valor ou id)
+
+    self.expect_token(TokenKind.ATE)
+    end = (yield self.grammar_arithmetic_term) # Fim definition
+
+    # Passo opcional
+    step = None
+    if self.check_token(TokenKind.PASSO):
+      self.expect_token(TokenKind.PASSO)
+      step = (yield self.grammar_arithmetic_term) # Passo value
+
+    if self.check_token(TokenKind.FACA):
+        self.expect_token(TokenKind.FACA)
+
+    body = yield from self.grammar_block((TokenKind.FIMPARA,))
+
+    self.expect_token(TokenKind.FIMPARA)
+    self.leave()
+    return Para(keyword.line, keyword.col, Name(var.line, var.col, var.lexeme), start, end, step, body)
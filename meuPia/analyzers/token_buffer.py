@@ -0,0 +1,109 @@
+from typing import Dict, List, NamedTuple
+
+from .lexical_analyzer import ENGINE_TABLE, LexicalError, scan_line
+from ..utils.token import Token
+
+class TokenEdit(NamedTuple):
+  # Token range affected by an edit: tokens[start:old_end] of the previous
+  # stream were replaced by tokens[start:new_end] of the current one.
+  start: int
+  old_end: int
+  new_end: int
+
+def split_source_lines(text: str) -> List[str]:
+  # Same line breaking as file.readlines(): split on '\n' only, keeping it
+  lines = [line + '\n' for line in text.split('\n')]
+  last = lines.pop()
+  if last != '\n':
+    lines.append(last[:-1])
+  return lines
+
+class TokenBuffer:
+  # Keeps the tokens of every source line separately. scan_line has no state
+  # across lines, so an edit only needs to re-scan the lines it touches; the
+  # other lines' tokens are reused.
+  #
+  # An edit costs the size of the edited lines, not of the file. Lines moved
+  # by an edit keep their tokens, still numbered with their old line, until
+  # tokens() asks for them: they are then replaced by renumbered copies, so
+  # tokens handed out earlier never change. offsets holds the token count
+  # before each line, for the lines up to the first edited one; the rest is
+  # summed again on demand.
+  def __init__(self, text: str = '', engine: str = ENGINE_TABLE):
+    self.engine = engine
+    self.lines: List[str] = []
+    self.line_tokens: List[List[Token]] = []
+    self.offsets: List[int] = [0] # offsets[i]: tokens before line i + 1
+    self.errors: Dict[int, str] = {} # line number -> LexicalError message
+    self.set_text(text)
+
+  @classmethod
+  def from_file(cls, file_path: str, engine: str = ENGINE_TABLE) -> 'TokenBuffer':
+    with open(file_path, 'r', encoding='utf-8') as file:
+      return cls(file.read(), engine)
+
+  def set_text(self, text: str):
+    self.lines = split_source_lines(text)
+    self.errors = {}
+    self.line_tokens = [self.scan(line, i+1) for i, line in enumerate(self.lines)]
+    self.offsets = [0]
+
+  def text(self) -> str:
+    return ''.join(self.lines)
+
+  def tokens(self) -> List[Token]:
+    result = []
+    for i, tokens in enumerate(self.line_tokens):
+      if tokens and tokens[0].line != i + 1:
+        tokens = [Token(token.kind, token.lexeme, i + 1, token.col) for token in tokens]
+        self.line_tokens[i] = tokens
+      result.extend(tokens)
+    return result
+
+  def token_index(self, line_number: int) -> int:
+    # Index in tokens() of the first token at or after the given line
+    offsets = self.offsets
+    for tokens in self.line_tokens[len(offsets) - 1:line_number - 1]:
+      offsets.append(offsets[-1] + len(tokens))
+    return offsets[line_number - 1]
+
+  def scan(self, line: str, line_number: int) -> List[Token]:
+    try:
+      return scan_line(line, line_number, self.engine)[1]
+    except LexicalError as e:
+      self.errors[line_number] = str(e)
+      return []
+
+  def edit(self, start_line: int, start_col: int, end_line: int, end_col: int, new_text: str) -> TokenEdit:
+    # Replaces the text between (start_line, start_col) and (end_line, end_col),
+    # both 1-based like code_index, with the end position exclusive.
+    if not (1 <= start_line <= end_line <= len(self.lines) + 1):
+      raise IndexError(f'Edit range {start_line}-{end_line} outside of {len(self.lines)} lines')
+
+    first = start_line - 1
+    last = min(end_line, len(self.lines)) # Line len(lines) + 1 is the empty line after a trailing '\n'
+    start_text = self.lines[first] if first < len(self.lines) else ''
+    end_text = self.lines[end_line - 1] if end_line <= len(self.lines) else ''
+
+    new_lines = split_source_lines(start_text[:start_col - 1] + new_text + end_text[end_col - 1:])
+    delta = len(new_lines) - (last - first)
+
+    token_start = self.token_index(start_line)
+    old_end = token_start + sum(len(tokens) for tokens in self.line_tokens[first:last])
+
+    # Errors of the replaced lines are dropped, the following ones move with their lines
+    errors = {}
+    for line_number, message in self.errors.items():
+      if line_number <= first:
+        errors[line_number] = message
+      elif line_number > last:
+        errors[line_number + delta] = message
+    self.errors = errors
+
+    new_tokens = [self.scan(line, start_line + i) for i, line in enumerate(new_lines)]
+    self.lines[first:last] = new_lines
+    self.line_tokens[first:last] = new_tokens
+    del self.offsets[start_line:] # Offsets of the edited line and before are unchanged
+
+    new_end = token_start + sum(len(tokens) for tokens in new_tokens)
+    return TokenEdit(token_start, old_end, new_end)
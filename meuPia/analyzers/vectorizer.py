@@ -0,0 +1,266 @@
+from typing import Dict, List, Optional
+
+from .ast_nodes import Assign, BinOp, Group, Index, Name, Node, Number, Para, Program, binop_chain, iter_child_nodes
+from ..utils.token_enum import TokenKind
+
+# ----------------
+# Opt-in code generation for elementwise para loops:
+#
+#     para i de 0 ate n faca
+#         v[i] <- a[i] * k + b[i]
+#     fim_para
+#
+# A loop qualifies when its step is 1 and its body only assigns v[i] from
+# integers, scalars not written in the loop, the counter itself and other
+# lists read at [i], combined with + - *. Each statement then becomes one
+# NumPy expression over the slice [inicio, fim], written back with tolist().
+#
+# The generated _vetor() helper falls back to the scalar loop (emitted next
+# to the vector one) whenever the NumPy result could differ from Python:
+# NumPy is not installed, the range is empty or starts below 0, a list is
+# shorter than fim (the loop would raise IndexError half-way), two names are
+# the same list, a slice is not all ints or all floats (nested lists,
+# strings, bools, mixed) or does not fit in int64, or a scalar is not a
+# number that fits in int64. `/` is never vectorized, since NumPy does not
+# raise on division by zero.
+#
+# NumPy int64 arithmetic wraps around silently where Python ints grow, so
+# each loop also carries a bound on its results (ElementwiseLoop.bound_lambda):
+# from the largest absolute value of every slice, scalar and the counter it
+# computes, through + - *, a bound for every statement, and _vetor() falls back
+# unless all of them stay below 2 ** 63.
+# ----------------
+VECTOR_OPERATORS = {
+    TokenKind.OPMAIS: "+",
+    TokenKind.OPMENOS: "-",
+    TokenKind.OPMULTI: "*",
+}
+
+# Names in the generated code
+PREFIX = "_vet_"
+START = f"{PREFIX}ini"
+END = f"{PREFIX}fim"
+SLICES = f"{PREFIX}fatias"
+
+# Module-level code added once to programs with a vectorized loop
+PRELUDE = [
+    "try:",
+    "    import numpy as _np",
+    "except ImportError:",
+    "    _np = None",
+    "",
+    "def _vet_mul(*fatores):",
+    "    # Limite de um produto; também limita cada fator, mesmo multiplicado por 0",
+    "    limite = 1",
+    "    for fator in fatores:",
+    "        limite *= max(fator, 1)",
+    "    return limite",
+    "",
+    "def _vetor(ini, fim, listas, escalares, limites):",
+    "    # Fatias ini..fim das listas como arrays NumPy, ou None para usar o laço escalar.",
+    "    # limites(*maximos) dá um limite do valor absoluto de cada resultado",
+    "    if _np is None or type(ini) is not int or type(fim) is not int or not 0 <= ini <= fim:",
+    "        return None",
+    "    if len({id(lista) for lista in listas}) != len(listas):",
+    "        return None",
+    "    for escalar in escalares:",
+    "        if type(escalar) is float:",
+    "            continue",
+    "        if type(escalar) is not int or not -2 ** 63 <= escalar < 2 ** 63:",
+    "            return None",
+    "    fatias = []",
+    "    for lista in listas:",
+    "        if type(lista) is not list or fim >= len(lista):",
+    "            return None",
+    "        parte = lista[ini:fim + 1]",
+    "        # Só ints ou só floats: misturados, o NumPy converteria os ints",
+    "        if set(map(type, parte)) not in ({int}, {float}):",
+    "            return None",
+    "        fatia = _np.asarray(parte)",
+    "        if fatia.dtype.kind not in 'if':",
+    "            return None",
+    "        fatias.append(fatia)",
+    "    maximos = [max(-int(fatia.min()), int(fatia.max())) if fatia.dtype.kind == 'i' else float(_np.abs(fatia).max())",
+    "               for fatia in fatias]",
+    "    maximos += [abs(escalar) for escalar in escalares] + [max(abs(ini), abs(fim))]",
+    "    # Em int64 o NumPy dá a volta sem avisar, onde o Python cresceria o int",
+    "    if not max(limites(*maximos)) < 2 ** 63:",
+    "        return None",
+    "    return fatias",
+    "",
+]
+
+class ElementwiseLoop:
+    # A para loop that passed match_elementwise(): what the vector version
+    # reads, writes and needs checked at runtime
+    def __init__(self, node: Para, statements: List[Assign], lists: List[str], written: List[str], scalars: List[str]):
+        self.node = node
+        self.statements = statements
+        self.lists = lists # Every list read or written, in first-use order
+        self.written = written
+        self.scalars = scalars
+
+    def setup_lines(self, start: str, end: str) -> List[str]:
+        # The bounds are evaluated once, as range() does in the scalar loop
+        lists = ", ".join(self.lists)
+        scalars = ", ".join(self.scalars)
+        return [
+            f"{START} = {start}",
+            f"{END} = {end}",
+            f"{SLICES} = _vetor({START}, {END}, [{lists}], [{scalars}], {self.bound_lambda()})",
+        ]
+
+    def bound_lambda(self) -> str:
+        # Takes the largest absolute value of each list, scalar and the counter
+        # (named like their arrays) and returns a bound for each statement's
+        # result. A written list is bounded by its new value from then on
+        names = [array_name(name) for name in self.lists + self.scalars + [self.node.var.id]]
+        bounds = [f"({array_name(statement.target.value.id)} := {self.bound(statement.value)})"
+                  for statement in self.statements]
+        return f"lambda {', '.join(names)}: [{', '.join(bounds)}]"
+
+    def bound(self, node: Node) -> str:
+        if isinstance(node, Number):
+            # The optimizer folds (0 - 4) into a negative literal
+            return str(abs(int(node.text)))
+        if isinstance(node, Group):
+            return self.bound(node.expr)
+        if isinstance(node, Index):
+            return array_name(node.value.id)
+        if isinstance(node, Name):
+            return array_name(node.id)
+
+        # A chain is walked in a loop and bounded by one sum or one _vet_mul()
+        # per run of operators, not by a call nested per operator
+        first, chain = binop_chain(node)
+        terms, product = [self.bound(first)], None
+        for binop in chain:
+            is_product = binop.op == TokenKind.OPMULTI
+            if product is not None and is_product != product:
+                terms = [bound_text(terms, product)]
+            product = is_product
+            terms.append(self.bound(binop.right))
+        return bound_text(terms, product)
+
+    def vector_lines(self) -> List[str]:
+        if len(self.lists) == 1:
+            lines = [f"{array_name(self.lists[0])} = {SLICES}[0]"]
+        else:
+            lines = [f"{', '.join(array_name(name) for name in self.lists)} = {SLICES}"]
+        for statement in self.statements:
+            target = statement.target.value.id
+            value = self.expression(statement.value)
+            if not uses_arrays(statement.value, self.node.var.id):
+                # A constant or scalar fills the whole slice
+                value = f"_np.broadcast_to({value}, {array_name(target)}.shape)"
+            lines.append(f"{array_name(target)} = {value}")
+
+        for name in self.written:
+            lines.append(f"{name}[{START}:{END} + 1] = {array_name(name)}.tolist()")
+        # The scalar loop leaves the counter at its last value
+        lines.append(f"{self.node.var.id} = {END}")
+        return lines
+
+    def fallback_range(self) -> str:
+        return f"{START}, {END} + 1"
+
+    def expression(self, node: Node) -> str:
+        if isinstance(node, Number):
+            return node.text
+        if isinstance(node, Group):
+            return self.expression(node.expr)
+        if isinstance(node, Index):
+            return array_name(node.value.id)
+        if isinstance(node, Name):
+            if node.id == self.node.var.id:
+                return f"_np.arange({START}, {END} + 1)"
+            return node.id
+
+        # Flat as written: (a+b-c), with parentheses only around a sum that is
+        # multiplied, so long chains do not nest a level per operator
+        first, chain = binop_chain(node)
+        text, previous = self.expression(first), None
+        for binop in chain:
+            if binop.op == TokenKind.OPMULTI and previous in (TokenKind.OPMAIS, TokenKind.OPMENOS):
+                text = f"({text})"
+            text = f"{text}{VECTOR_OPERATORS[binop.op]}{self.expression(binop.right)}"
+            previous = binop.op
+        return f"({text})"
+
+def array_name(name: str) -> str:
+    return f"{PREFIX}{name}"
+
+def bound_text(terms: List[str], product: bool) -> str:
+    return f"_vet_mul({', '.join(terms)})" if product else f"({' + '.join(terms)})"
+
+def uses_arrays(node: Node, counter: str) -> bool:
+    if isinstance(node, Index) or (isinstance(node, Name) and node.id == counter):
+        return True
+    if isinstance(node, BinOp):
+        first, chain = binop_chain(node)
+        return uses_arrays(first, counter) or any(uses_arrays(binop.right, counter) for binop in chain)
+    return any(uses_arrays(child, counter) for child in iter_child_nodes(node))
+
+def match_elementwise(node: Para) -> Optional[ElementwiseLoop]:
+    if node.var is None or not node.body:
+        return None
+    if node.step is not None and not (isinstance(node.step, Number) and node.step.text == "1"):
+        return None
+
+    counter = node.var.id
+    lists, written, scalars = [], [], []
+    for statement in node.body:
+        if not isinstance(statement, Assign) or not is_element(statement.target, counter):
+            return None
+        if not collect_operands(statement.value, counter, lists, scalars):
+            return None
+        target = statement.target.value.id
+        if target not in lists:
+            lists.append(target)
+        if target not in written:
+            written.append(target)
+
+    # The counter and the lists must not double as scalars
+    if counter in lists or any(name in lists for name in scalars):
+        return None
+    return ElementwiseLoop(node, node.body, lists, written, scalars)
+
+def is_element(node: Node, counter: str) -> bool:
+    # lista[contador]
+    return (isinstance(node, Index) and isinstance(node.value, Name) and isinstance(node.index, Name)
+            and node.index.id == counter)
+
+def collect_operands(node: Node, counter: str, lists: List[str], scalars: List[str]) -> bool:
+    if isinstance(node, Number):
+        return True
+    if isinstance(node, Group):
+        return collect_operands(node.expr, counter, lists, scalars)
+    if isinstance(node, Name):
+        if node.id != counter and node.id not in scalars:
+            scalars.append(node.id)
+        return True
+    if is_element(node, counter):
+        if node.value.id not in lists:
+            lists.append(node.value.id)
+        return True
+    if isinstance(node, BinOp):
+        # Left operands in a loop, as long chains would otherwise recurse per operator
+        first, chain = binop_chain(node)
+        return (all(binop.op in VECTOR_OPERATORS for binop in chain)
+                and collect_operands(first, counter, lists, scalars)
+                and all(collect_operands(binop.right, counter, lists, scalars) for binop in chain))
+    return False
+
+def elementwise_loops(program: Program) -> Dict[int, ElementwiseLoop]:
+    # id(Para node) -> plan, for every loop of the program that qualifies
+    loops = {}
+    pending = list(program.body)
+    while pending:
+        statement = pending.pop()
+        if isinstance(statement, Para):
+            loop = match_elementwise(statement)
+            if loop is not None:
+                loops[id(statement)] = loop
+        pending.extend(getattr(statement, "body", ()))
+        pending.extend(getattr(statement, "orelse", ()))
+    return loops
@@ -0,0 +1,170 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+from . import compiler
+from .analyzers import lexical_analyzer
+from .analyzers.optimizer import OPTIMIZE_LEVELS, OPTIMIZE_NONE
+
+# Batch mode: compiles every .por of directories or globs on a process pool,
+# one compiler.main() call per file, and writes a JSON report. Workers import
+# the analyzers once and compile many files; a file that breaks the compiler
+# (or its worker process) is reported as a failure without stopping the rest.
+# Workers share the compile cache directory, so starter programs handed in
+# unchanged by many students are compiled once.
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'erro' # The program has lexical, syntax or semantic errors
+STATUS_FAILURE = 'falha' # The compiler itself failed on the file
+
+REPORT_FILE_NAME = 'relatorio.json'
+BATCH_BACKENDS = (compiler.BACKEND_TEXT, compiler.BACKEND_BYTECODE)
+
+def collect_files(patterns: List[str]) -> List[str]:
+    # Directories are searched recursively for .por files; anything else is a
+    # glob (** included). Sorted, without duplicates
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(pattern, '**', '*.por'), recursive=True))
+        else:
+            files.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(files)
+
+def output_dirs(files: List[str], output_path: str) -> List[str]:
+    # The inputs' folders are recreated under output_path, so equal names in
+    # different folders do not overwrite each other
+    folders = [os.path.dirname(os.path.abspath(path)) for path in files]
+    if not folders:
+        return []
+    root = os.path.commonpath(folders)
+    return [os.path.normpath(os.path.join(output_path, os.path.relpath(folder, root))) for folder in folders]
+
+def compile_file(input_file: str, output_path: str, options: dict) -> dict:
+    # Runs in a worker. The compiler's progress messages are not shown
+    start = time.perf_counter()
+    log = io.StringIO()
+    cached = False
+    try:
+        with contextlib.redirect_stdout(log):
+            result = compiler.main(input_file, output_path, recover=True, **options)
+        status = STATUS_OK if result.success else STATUS_ERROR
+        cached = result.cached
+        output_file = result.output_file
+        diagnostics = [diagnostic.to_dict() for diagnostic in result.diagnostics]
+        # compiler.main reports its own crashes as diagnostics without a phase
+        if not result.success and any(diagnostic['phase'] is None for diagnostic in diagnostics):
+            status = STATUS_FAILURE
+    except Exception as error:
+        status, output_file = STATUS_FAILURE, None
+        diagnostics = [{'phase': None, 'message': f'{type(error).__name__}: {error}', 'line': None, 'col': None}]
+
+    return {
+        'arquivo': input_file,
+        'status': status,
+        'saida': output_file,
+        'diagnosticos': diagnostics,
+        'cache': cached,
+        'segundos': time.perf_counter() - start,
+    }
+
+def failed_file(input_file: str, error: BaseException) -> dict:
+    # The worker process died (or the job could not reach it)
+    return {
+        'arquivo': input_file,
+        'status': STATUS_FAILURE,
+        'saida': None,
+        'diagnosticos': [{'phase': None, 'message': f'{type(error).__name__}: {error}', 'line': None, 'col': None}],
+        'cache': False,
+        'segundos': None,
+    }
+
+def compile_batch(files: List[str], output_path: str = 'output', workers: Optional[int] = None,
+                  options: Optional[dict] = None) -> dict:
+    # Report with one entry per file, in `files` order. One worker compiles in
+    # this process, skipping the pool start-up
+    options = options or {}
+    folders = output_dirs(files, output_path)
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = [compile_file(path, folder, options) for path, folder in zip(files, folders)]
+    else:
+        results = [None] * len(files)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(compile_file, path, folder, options): position
+                       for position, (path, folder) in enumerate(zip(files, folders))}
+            for future in as_completed(futures):
+                position = futures[future]
+                try:
+                    results[position] = future.result()
+                except Exception as error:
+                    results[position] = failed_file(files[position], error)
+
+    elapsed = time.perf_counter() - start
+    return {
+        'arquivos': len(files),
+        STATUS_OK: sum(result['status'] == STATUS_OK for result in results),
+        STATUS_ERROR: sum(result['status'] == STATUS_ERROR for result in results),
+        STATUS_FAILURE: sum(result['status'] == STATUS_FAILURE for result in results),
+        'cache_acertos': sum(result['cache'] for result in results),
+        'processos': workers or os.cpu_count(),
+        'segundos': elapsed,
+        'arquivos_por_segundo': len(files) / elapsed if elapsed > 0 else None,
+        'resultados': results,
+    }
+
+def write_report(report: dict, report_path: str):
+    folder = os.path.dirname(report_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(prog="meupia-lote", description="meuPiá - Compila muitos arquivos .por em paralelo")
+    parser.add_argument("entradas", nargs="+", help="Pastas (busca .por recursivamente) ou padrões glob, ex.: 'turma/**/*.por'")
+    parser.add_argument("-s", "--saida", default="output", help="Pasta de saída; as subpastas das entradas são mantidas")
+    parser.add_argument("-p", "--processos", type=int, default=None, help="Número de processos (padrão: um por CPU)")
+    parser.add_argument("--relatorio", default=None, help=f"Relatório JSON (padrão: <saida>/{REPORT_FILE_NAME})")
+    parser.add_argument("--gerador", choices=BATCH_BACKENDS, default=compiler.BACKEND_TEXT,
+                        help="texto (.py) ou bytecode (.pyc)")
+    parser.add_argument("--artefatos", choices=lexical_analyzer.ARTIFACT_FORMATS, default=lexical_analyzer.ARTIFACTS_NONE,
+                        help="Artefatos do léxico por arquivo (padrão: nenhum)")
+    parser.add_argument("-O", "--otimizar", type=int, choices=OPTIMIZE_LEVELS, default=OPTIMIZE_NONE,
+                        help="Nível do otimizador, como no meupia")
+    compiler.add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.entradas)
+    if not files:
+        parser.error("nenhum arquivo .por encontrado")
+
+    options = {'backend': args.gerador, 'artifacts': args.artefatos, 'optimize': args.otimizar,
+               'cache': compiler.cache_from_args(args)}
+    report = compile_batch(files, args.saida, args.processos, options)
+    report_path = args.relatorio or os.path.join(args.saida, REPORT_FILE_NAME)
+    write_report(report, report_path)
+
+    for result in report['resultados']:
+        if result['status'] != STATUS_OK:
+            print(f"[{result['status'].upper()}] {result['arquivo']}")
+            for diagnostic in result['diagnosticos']:
+                print(f"\t{diagnostic['message']}")
+
+    rate = report['arquivos_por_segundo']
+    print(f"{report['arquivos']} arquivo(s) em {report['segundos']:.2f} s "
+          f"({rate:.1f} arquivos/s, {report['processos']} processo(s)): "
+          f"{report[STATUS_OK]} ok, {report[STATUS_ERROR]} com erro, {report[STATUS_FAILURE]} falha(s), "
+          f"{report['cache_acertos']} do cache")
+    print(f"Relatório: {report_path}")
+
+
+if __name__ == "__main__":
+    cli()
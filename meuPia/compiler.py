@@ -1,12 +1,97 @@
+import argparse
+import importlib.util
+import marshal
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+from types import CodeType
+from typing import List, NamedTuple, Optional
+from . import __version__
 from .analyzers import lexical_analyzer
 from .analyzers import syntax_analyzer
 from .analyzers import semantic_analyzer
+from .analyzers.optimizer import OPTIMIZE_LEVELS, OPTIMIZE_NONE, Optimizer
 from .analyzers.code_generator import CodeGenerator
+from .analyzers.python_ast_generator import PythonAstGenerator
+from .analyzers.micropython_generator import MicroPythonGenerator, code_size
+from .analyzers.diagnostics import PHASE_LEXICAL, PHASE_SEMANTIC, PHASE_SYNTAX, Diagnostic
+from .utils.cache import DEFAULT_MAX_AGE, DEFAULT_MAX_BYTES, ContentCache, content_key
+from .utils.file_helper import LineIndex
+from .utils.plugin_index import PluginIndex, PluginManifestError
+from .utils.profiler import DEFAULT_TOP, LineProfiler
+from .utils.token_stream import TokenStream
 
 INPUT_FILE_NAME = 'input/missao_ia.por'
 
-def main(input_file: str = None, output_path: str = None):
+# Backends: Python source text (.py), a code object compiled straight from the
+# Python AST and written as .pyc, or the code object alone, in memory
+BACKEND_TEXT = 'texto'
+BACKEND_BYTECODE = 'bytecode'
+BACKEND_MEMORY = 'memoria'
+BACKENDS = (BACKEND_TEXT, BACKEND_BYTECODE, BACKEND_MEMORY)
+
+# Interpreter the generated code runs on. MicroPython code is always text,
+# copied to the board as a .py (or a .mpy made from it)
+TARGET_CPYTHON = 'cpython'
+TARGET_MICROPYTHON = 'micropython'
+TARGETS = (TARGET_CPYTHON, TARGET_MICROPYTHON)
+
+ERROR_PHASES = {
+    lexical_analyzer.LexicalError: PHASE_LEXICAL,
+    syntax_analyzer.SyntacticError: PHASE_SYNTAX,
+    semantic_analyzer.SemanticError: PHASE_SEMANTIC,
+    PluginManifestError: PHASE_SEMANTIC,
+}
+
+# `usar "nome"` lines, found in the raw source to key the bytecode cache
+# before anything is parsed
+USAR_PATTERN = re.compile(rb'usar\s*"([^"]*)"')
+
+class CompileResult(NamedTuple):
+    output_file: Optional[str] # Generated .py/.pyc, None when compilation failed or in memory
+    diagnostics: List[Diagnostic]
+    code: Optional[CodeType] = None # Compiled program (bytecode and memory backends)
+    source_map: Optional[List[Optional[int]]] = None # Portugol line of each .py line (text backend)
+    source: Optional[str] = None # Generated Python code (text backend)
+    cached: bool = False # Loaded from the compile cache, no phase ran
+
+    @property
+    def success(self) -> bool:
+        return self.output_file is not None or self.code is not None
+
+def main(input_file: str = None, output_path: str = None, streaming: bool = False,
+         artifacts: str = lexical_analyzer.ARTIFACTS_JSON, parallel: bool = False, workers: int = None,
+         max_depth: int = syntax_analyzer.DEFAULT_MAX_DEPTH, max_tokens: int = None,
+         recover: bool = False, backend: str = BACKEND_TEXT, cache: Optional[ContentCache] = None,
+         optimize: int = OPTIMIZE_NONE, vectorize: bool = False, target: str = TARGET_CPYTHON,
+         native: bool = False, fast_io: bool = False, lazy_plugins: bool = False,
+         plugin_index: Optional[PluginIndex] = None) -> CompileResult:
+    # Streaming mode feeds the parser lazily instead of holding the whole token
+    # list, and skips the lexer .tem artifacts.
+    # Recovery mode runs every phase to the end and reports all lexical, syntax
+    # and semantic errors at once; code is only generated when there are none.
+    # The bytecode and memory backends return the compiled code object, ready
+    # for exec(), without writing or re-parsing any Python source.
+    # With a `cache`, an unchanged source compiled with the same options
+    # (see code_cache_key) skips every phase, lexer artifacts included: the
+    # cached code or Python text is written out again, or its diagnostics
+    # reported again. Errors outside the compiler phases are never cached.
+    # `optimize` is the optimizer level (see analyzers/optimizer), applied to
+    # the tree between the semantic analysis and code generation.
+    # `vectorize` turns elementwise para loops into NumPy operations when
+    # NumPy is installed at runtime (see analyzers/vectorizer).
+    # The micropython target writes a .py for the boards (see
+    # analyzers/micropython_generator), with main() native when `native`.
+    # `fast_io` makes leia and escreva use the buffered meuPia.runtime.
+    # `lazy_plugins` imports plugins on the first call of their functions.
+    # `plugin_index` finds the plugins' modules and manifests (see
+    # utils/plugin_index); by default one kept in `cache`.
+    line_index = None
+    stream = None
+    cache_key = None
+    errors = [] if recover else None
     try:
         if input_file is None:
             input_file = INPUT_FILE_NAME
@@ -18,51 +103,357 @@ def main(input_file: str = None, output_path: str = None):
         if not os.path.exists(full_path):
             raise FileNotFoundError(f"Arquivo {full_path} não encontrado.")
 
+        if plugin_index is None:
+            plugin_index = PluginIndex(cache)
+
+        if cache is not None:
+            cache_key = code_cache_key(full_path, optimize, vectorize, fast_io, lazy_plugins, plugin_index,
+                                       text=backend == BACKEND_TEXT, target=target, native=native,
+                                       recover=recover, streaming=streaming, max_depth=max_depth,
+                                       max_tokens=max_tokens)
+            entry = load_cached_entry(cache, cache_key)
+            if entry is not None:
+                return cached_result(entry, full_path, output_path, backend, recover)
+
         # Lexer
         # Pass output path to compile if needed, or handle it inside lexical_analyzer 
         # For now we just pass filename_only as before, but lexical_analyzer needs refactor too.
         # We will assume lexical_analyzer.compile will be updated to accept output_dir.
-        lexeme_pairs = lexical_analyzer.compile(full_path, output_path=output_path)
+        if streaming:
+            line_index = LineIndex(full_path)
+            stream = TokenStream(lexical_analyzer.iter_tokens(full_path, line_index=line_index, errors=errors))
+            tokens = stream
+        else:
+            tokens = lexical_analyzer.compile(full_path, output_path=output_path, artifacts=artifacts,
+                                              parallel=parallel, workers=workers, errors=errors)
 
         # Parser
-        parser = syntax_analyzer.Parser(lexeme_pairs)
-        parser.parse()
-        print('✅ Syntax is valid.')
+        # The AST is built once and shared by the later phases
+        parser = syntax_analyzer.Parser(tokens, max_depth=max_depth, max_tokens=max_tokens, errors=errors)
+        program = parser.parse()
+        stream = None
+        if not errors:
+            print('✅ Syntax is valid.')
 
         # Semantic Analyzer
-        semantic = semantic_analyzer.SemanticAnalyzer(lexeme_pairs)
+        # Calls are checked against the manifests of the plugins in use
+        plugin_infos = plugin_index.plugins(plugin.name for plugin in program.plugins) if program is not None else {}
+        semantic = semantic_analyzer.SemanticAnalyzer(program, errors=errors, plugins=plugin_infos)
         semantic.validate()
+
+        if errors:
+            # Phases run one after the other (interleaved when streaming); report in source order
+            errors.sort(key=lambda diagnostic: (diagnostic.line or 0, diagnostic.col or 0))
+            print_diagnostics(errors, line_index)
+            return store_result(cache, cache_key, CompileResult(None, errors))
         print('✅ Semantic is valid.')
 
+        if optimize != OPTIMIZE_NONE:
+            program = Optimizer(program, optimize).optimize()
+
+        if target == TARGET_MICROPYTHON:
+            return store_result(cache, cache_key, micropython_result(program, semantic.symbols, full_path,
+                                                                     output_path, native, plugin_infos, errors or []))
+
+        if backend != BACKEND_TEXT:
+            print('Compiling Python bytecode...')
+            code = PythonAstGenerator(program, semantic.symbols, vectorize, fast_io, lazy_plugins,
+                                      plugin_infos).compile(os.path.abspath(full_path))
+            return store_result(cache, cache_key, bytecode_result(code, full_path, output_path, backend, errors or []))
+
         # Code Generator (NEW)
         print('Generating Python code...')
-        generator = CodeGenerator(lexeme_pairs)
+        generator = CodeGenerator(program, semantic.symbols, vectorize, fast_io, lazy_plugins, plugin_infos)
         python_code = generator.generate()
         
         # Save Output
-        if output_path:
-            os.makedirs(output_path, exist_ok=True)
-            out_dir = output_path
-        else:
-            out_dir = 'output'
-            os.makedirs(out_dir, exist_ok=True)
-
-        base_name = os.path.splitext(os.path.basename(full_path))[0]
-        final_output_path = os.path.join(out_dir, f'{base_name}.py')
+        final_output_path = output_file_path(full_path, output_path, '.py')
         
         with open(final_output_path, 'w', encoding='utf-8') as f:
             f.write(python_code)
             
         print(f'✅ Code generated successfully at {final_output_path}')
         print('[COMPILED SUCCESSFULLY]')
+        return store_result(cache, cache_key, CompileResult(final_output_path, errors or [],
+                                                            source_map=generator.source_map, source=python_code))
 
     except Exception as e:
         print(f'[COMPILATION ERROR]:\n\t{e}')
+        # Source lines are only shown for errors raised while tokens were still being read
+        if line_index is not None and stream is not None:
+            print_error_line(stream, line_index)
 
+        # Errors collected before a fatal one (e.g. a parser limit) are kept
+        phase = next((phase for error_type, phase in ERROR_PHASES.items() if isinstance(e, error_type)), None)
+        return store_result(cache, cache_key, CompileResult(None, (errors or []) + [Diagnostic(phase, str(e))]))
 
-if __name__ == "__main__":
-    import sys
-    if len(sys.argv) > 1:
-        main(sys.argv[1])
+
+def output_file_path(input_file, output_path, extension):
+    out_dir = output_path or 'output'
+    os.makedirs(out_dir, exist_ok=True)
+
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(out_dir, f'{base_name}{extension}')
+
+
+def micropython_result(program, symbols, input_file, output_path, native, plugin_infos, diagnostics):
+    print('Generating MicroPython code...')
+    generator = MicroPythonGenerator(program, symbols, native, plugin_infos)
+    python_code = generator.generate()
+
+    final_output_path = output_file_path(input_file, output_path, '.py')
+    with open(final_output_path, 'w', encoding='utf-8') as f:
+        f.write(python_code)
+
+    print(f'✅ Code generated successfully at {final_output_path}')
+    size = mpy_size(final_output_path)
+    if size is None:
+        print(f'Estimated code size: {code_size(python_code)} bytes (.py)')
     else:
-        main()
\ No newline at end of file
+        print(f'Estimated code size: {code_size(python_code)} bytes (.py), {size} bytes (.mpy)')
+    print('[COMPILED SUCCESSFULLY]')
+    return CompileResult(final_output_path, diagnostics, source_map=generator.source_map, source=python_code)
+
+
+def mpy_size(python_file):
+    # Size of the precompiled .mpy, when mpy-cross is installed
+    mpy_cross = shutil.which('mpy-cross')
+    if mpy_cross is None:
+        return None
+
+    with tempfile.TemporaryDirectory() as directory:
+        mpy_file = os.path.join(directory, 'programa.mpy')
+        completed = subprocess.run([mpy_cross, '-o', mpy_file, python_file], capture_output=True)
+        if completed.returncode != 0 or not os.path.exists(mpy_file):
+            return None
+        return os.path.getsize(mpy_file)
+
+
+def bytecode_result(code, input_file, output_path, backend, diagnostics=None):
+    if backend == BACKEND_MEMORY:
+        print('[COMPILED SUCCESSFULLY]')
+        return CompileResult(None, diagnostics or [], code)
+
+    final_output_path = output_file_path(input_file, output_path, '.pyc')
+    write_bytecode(code, input_file, final_output_path)
+    print(f'✅ Bytecode generated successfully at {final_output_path}')
+    print('[COMPILED SUCCESSFULLY]')
+    return CompileResult(final_output_path, diagnostics or [], code)
+
+
+def code_cache_key(input_file, optimize=OPTIMIZE_NONE, vectorize=False, fast_io=False, lazy_plugins=False,
+                   plugin_index=None, text=False, target=TARGET_CPYTHON, native=False, recover=False,
+                   streaming=False, max_depth=syntax_analyzer.DEFAULT_MAX_DEPTH, max_tokens=None):
+    # Anything that changes the compiled code or the diagnostics is part of
+    # the key: the source, the compiler and interpreter (marshal format)
+    # versions, the modules and manifests of the plugins used, the code
+    # generation options, the parser limits and error modes, and the path
+    # baked into the code object for tracebacks. `text`: Python source
+    # instead of a code object
+    with open(input_file, 'rb') as f:
+        source = f.read()
+    plugin_index = plugin_index if plugin_index is not None else PluginIndex()
+    names = sorted({name.decode('utf-8', 'replace') for name in USAR_PATTERN.findall(source)})
+    plugins = repr([tuple(info) for info in plugin_index.plugins(names).values()])
+    return content_key(source, __version__, importlib.util.MAGIC_NUMBER, plugins, str(optimize),
+                       str(vectorize), str(fast_io), str(lazy_plugins), os.path.abspath(input_file),
+                       str(text), target, str(native), str(recover), str(streaming), str(max_depth),
+                       str(max_tokens))
+
+
+def store_result(cache, key, result):
+    # Entries are marshalled dicts: the code object or Python text (None for
+    # both when the source has errors), the source map and the diagnostics
+    if key is not None and all(diagnostic.phase is not None for diagnostic in result.diagnostics):
+        cache.put(key, marshal.dumps({
+            'codigo': result.code,
+            'texto': result.source,
+            'mapa': result.source_map,
+            'diagnosticos': [tuple(diagnostic) for diagnostic in result.diagnostics],
+        }))
+    return result
+
+
+def load_cached_entry(cache, key):
+    data = cache.get(key)
+    if data is None:
+        return None
+    try:
+        entry = marshal.loads(data)
+        entry['diagnosticos'] = [Diagnostic(*diagnostic) for diagnostic in entry['diagnosticos']]
+    except (EOFError, ValueError, TypeError, KeyError):
+        return None # Truncated or foreign entry: compile again
+    if entry.get('codigo') is not None and not isinstance(entry['codigo'], CodeType):
+        return None
+    return entry
+
+
+def cached_result(entry, input_file, output_path, backend, recover):
+    diagnostics = entry['diagnosticos']
+    if entry['codigo'] is not None:
+        print('✅ Bytecode loaded from cache.')
+        result = bytecode_result(entry['codigo'], input_file, output_path, backend, diagnostics)
+        return result._replace(cached=True)
+
+    if entry['texto'] is None:
+        print('Diagnostics loaded from cache.')
+        if recover:
+            print_diagnostics(diagnostics)
+        else:
+            print(f'[COMPILATION ERROR]:\n\t{diagnostics[-1].message}')
+        return CompileResult(None, diagnostics, cached=True)
+
+    print('✅ Python code loaded from cache.')
+    final_output_path = output_file_path(input_file, output_path, '.py')
+    with open(final_output_path, 'w', encoding='utf-8') as f:
+        f.write(entry['texto'])
+    print(f'✅ Code generated successfully at {final_output_path}')
+    print('[COMPILED SUCCESSFULLY]')
+    return CompileResult(final_output_path, diagnostics, source_map=entry['mapa'], source=entry['texto'],
+                         cached=True)
+
+
+def write_bytecode(code, source_path, pyc_path):
+    # Same layout as the interpreter's own .pyc files (timestamp-based), so
+    # `python programa.pyc` runs it directly
+    source = os.stat(source_path)
+    with open(pyc_path, 'wb') as f:
+        f.write(importlib.util.MAGIC_NUMBER)
+        f.write((0).to_bytes(4, 'little'))
+        f.write((int(source.st_mtime) & 0xFFFFFFFF).to_bytes(4, 'little'))
+        f.write((source.st_size & 0xFFFFFFFF).to_bytes(4, 'little'))
+        f.write(marshal.dumps(code))
+
+
+def program_globals(input_file):
+    return {'__name__': '__main__', '__file__': os.path.abspath(input_file), '__builtins__': __builtins__}
+
+
+def run_code(code, input_file):
+    exec(code, program_globals(input_file))
+
+
+def profile_result(result, input_file, top=DEFAULT_TOP):
+    # Runs the compiled program under the line profiler and prints the time
+    # spent on each Portugol line, even when the program stops with an error
+    if result.code is not None:
+        code = result.code # Built from the AST: lines are already Portugol lines
+    else:
+        with open(result.output_file, encoding='utf-8') as f:
+            code = compile(f.read(), os.path.abspath(result.output_file), 'exec')
+
+    profiler = LineProfiler(code.co_filename, result.source_map if result.code is None else None)
+    try:
+        profiler.run(code, program_globals(input_file))
+    finally:
+        with open(input_file, encoding='utf-8') as f:
+            source_lines = f.read().splitlines()
+        print(profiler.report(source_lines, top))
+
+
+def print_diagnostics(diagnostics, line_index=None):
+    print(f'[COMPILATION ERROR]: {len(diagnostics)} erro(s)')
+    for diagnostic in diagnostics:
+        print(f'\t{diagnostic.message}')
+        if line_index is not None and diagnostic.line is not None:
+            text = line_index.line_text(diagnostic.line)
+            if text is not None:
+                print(f'\t{diagnostic.line} | {text}')
+
+
+def print_error_line(stream, line_index):
+    # The failing line is the current token's line, or the last line read when
+    # the lexer itself failed before producing a token for it.
+    line_number = len(line_index)
+    token = stream.current() if stream is not None else None
+    if token is not None:
+        line_number = token.line
+
+    text = line_index.line_text(line_number)
+    if text is not None:
+        print(f'\t{line_number} | {text}')
+
+
+def add_cache_arguments(parser):
+    # Shared with meupia-lote, so both keep the cache under the same limits
+    parser.add_argument("--pasta-cache", default=None,
+                        help="Pasta do cache de compilação (padrão: $MEUPIA_CACHE ou ~/.cache/meupia)")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Tamanho máximo do cache; as entradas menos usadas saem primeiro")
+    parser.add_argument("--cache-max-dias", type=int, default=DEFAULT_MAX_AGE // (24 * 60 * 60),
+                        help="Remove do cache as entradas sem uso há mais dias que isso")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Compila tudo de novo, sem ler nem gravar o cache")
+
+
+def cache_from_args(args):
+    if args.sem_cache:
+        return None
+    return ContentCache(args.pasta_cache, args.cache_max_mb * 1024 * 1024, args.cache_max_dias * 24 * 60 * 60)
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(prog="meupia", description="meuPiá - Compilador de Portugol para Python")
+    parser.add_argument("arquivo", nargs="?", default=INPUT_FILE_NAME, help="Arquivo .por a compilar")
+    parser.add_argument("-s", "--saida", default=None, help="Pasta de saída (padrão: output/)")
+    parser.add_argument("--fluxo", action="store_true",
+                        help="Lê os tokens sob demanda, sem manter o arquivo inteiro em memória")
+    parser.add_argument("--artefatos", choices=lexical_analyzer.ARTIFACT_FORMATS, default=lexical_analyzer.ARTIFACTS_JSON,
+                        help="Formato dos artefatos do léxico: json (legível), binario (.tkn) ou nenhum")
+    parser.add_argument("--paralelo", action="store_true",
+                        help="Divide arquivos grandes em blocos de linhas analisados em vários processos")
+    parser.add_argument("--processos", type=int, default=None, help="Número de processos do léxico paralelo")
+    parser.add_argument("--max-aninhamento", type=int, default=syntax_analyzer.DEFAULT_MAX_DEPTH,
+                        help="Profundidade máxima de blocos e expressões aninhados")
+    parser.add_argument("--max-tokens", type=int, default=None, help="Rejeita programas com mais tokens que isso")
+    parser.add_argument("--recuperar", action="store_true",
+                        help="Continua após erros e lista todos os erros léxicos, sintáticos e semânticos")
+    parser.add_argument("--gerador", choices=BACKENDS, default=BACKEND_TEXT,
+                        help="texto (.py legível), bytecode (.pyc compilado direto da AST) ou memoria (sem arquivo)")
+    parser.add_argument("--executar", action="store_true",
+                        help="Executa o programa compilado em memória, sem gravar nem reler o .py")
+    add_cache_arguments(parser)
+    parser.add_argument("-O", "--otimizar", type=int, choices=OPTIMIZE_LEVELS, default=OPTIMIZE_NONE,
+                        help="0: sem otimização, 1: dobra constantes e remove ramos mortos, 2: também remove variáveis não lidas")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Executa o programa e mostra execuções e tempo de cada linha do .por")
+    parser.add_argument("--perfil-top", type=int, default=DEFAULT_TOP,
+                        help="Quantas linhas mais lentas o resumo do perfil lista")
+    parser.add_argument("--alvo", choices=TARGETS, default=TARGET_CPYTHON,
+                        help="cpython (padrão) ou micropython, para placas ESP32/Pico")
+    parser.add_argument("--nativo", action="store_true",
+                        help="Com --alvo micropython, compila o main() com @micropython.native")
+    parser.add_argument("--io-rapido", action="store_true",
+                        help="leia e escreva com entrada e saída em buffer (meuPia.runtime), para entradas grandes")
+    parser.add_argument("--plugins-sob-demanda", action="store_true",
+                        help="Importa cada plugin só na primeira chamada de uma das suas funções")
+    parser.add_argument("--vetorizar", action="store_true",
+                        help="Troca laços para elemento a elemento sobre listas por operações NumPy, se o NumPy estiver instalado")
+    args = parser.parse_args(argv)
+    if args.alvo == TARGET_MICROPYTHON and (args.gerador != BACKEND_TEXT or args.executar or args.perfil
+                                            or args.vetorizar or args.io_rapido or args.plugins_sob_demanda):
+        parser.error("--alvo micropython só gera texto: não combina com --gerador, --executar, --perfil, --vetorizar, "
+                     "--io-rapido ou --plugins-sob-demanda")
+
+    backend = args.gerador
+    if args.executar and backend == BACKEND_TEXT:
+        backend = BACKEND_MEMORY
+
+    cache = cache_from_args(args)
+    result = main(args.arquivo, args.saida, streaming=args.fluxo, artifacts=args.artefatos,
+                  parallel=args.paralelo, workers=args.processos, max_depth=args.max_aninhamento,
+                  max_tokens=args.max_tokens, recover=args.recuperar, backend=backend, cache=cache,
+                  optimize=args.otimizar, vectorize=args.vetorizar,
+                  target=args.alvo, native=args.nativo, fast_io=args.io_rapido,
+                  lazy_plugins=args.plugins_sob_demanda)
+    if cache is not None:
+        print(f'Cache: {cache.hits} acerto(s), {cache.misses} falta(s)')
+
+    if args.perfil and result.success:
+        profile_result(result, args.arquivo, args.perfil_top)
+    elif args.executar and result.code is not None:
+        run_code(result.code, args.arquivo)
+
+
+if __name__ == "__main__":
+    cli()
\ No newline at end of file
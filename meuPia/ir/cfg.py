@@ -0,0 +1,588 @@
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..analyzers.ast_nodes import (
+  Assign, BinOp, Call, CallStatement, Enquanto, Escreva, Group, Index, Leia, ListLiteral,
+  Name, Node, NodeVisitor, Not, Number, Para, Program, Se, String, binop_chain,
+)
+from ..analyzers.symbol_table import TYPE_NAMES
+from ..utils.token_enum import TokenKind
+
+# ----------------
+# Control-flow graph IR. A program lowers to basic blocks of three-address
+# instructions (at most one operator each, operands are constants, Portugol
+# variables or compiler temporaries) ending in an explicit terminator: a jump,
+# a two-way branch or the return from the program. Conditions are lowered to
+# branches, so `e`/`ou` short-circuit through the graph and every path the
+# program can take is an edge. Dataflow analyses live in ir/dataflow.py, the
+# Python emitter in ir/python_emitter.py.
+# ----------------
+
+# ----------------
+# Operands
+# ----------------
+@dataclass(frozen=True)
+class Const:
+  value: Union[int, str, bool]
+
+  def __str__(self) -> str:
+    return repr(self.value)
+
+@dataclass(frozen=True)
+class Var:
+  name: str # Portugol variable
+
+  def __str__(self) -> str:
+    return self.name
+
+@dataclass(frozen=True)
+class Temp:
+  index: int # Compiler temporary
+
+  def __str__(self) -> str:
+    return f'_t{self.index}'
+
+Operand = Union[Const, Var, Temp]
+Location = Union[Var, Temp]
+
+# ----------------
+# Instructions. defs()/uses() are what the dataflow analyses see.
+# ----------------
+@dataclass
+class Instruction:
+  line: int # Portugol line the instruction comes from
+
+  def defs(self) -> Tuple[Location, ...]:
+    return ()
+
+  def uses(self) -> Tuple[Operand, ...]:
+    return ()
+
+  @property
+  def pure(self) -> bool:
+    # No effect besides its destination and it cannot fail
+    return False
+
+@dataclass
+class Move(Instruction):
+  dest: Location
+  source: Operand
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return (self.source,)
+
+  @property
+  def pure(self):
+    return True
+
+  def __str__(self) -> str:
+    return f'{self.dest} = {self.source}'
+
+@dataclass
+class BinaryOp(Instruction):
+  dest: Location
+  op: int # TokenKind: arithmetic or comparison
+  left: Operand
+  right: Operand
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return (self.left, self.right)
+
+  @property
+  def pure(self):
+    # Division may raise; + and comparisons on mixed types too, but the
+    # semantic analysis has no types to rule that out, so they count as pure
+    return self.op != TokenKind.OPDIVI
+
+  def __str__(self) -> str:
+    return f'{self.dest} = {self.left} {OPERATOR_NAMES[self.op]} {self.right}'
+
+@dataclass
+class NotOp(Instruction):
+  dest: Location
+  operand: Operand
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return (self.operand,)
+
+  @property
+  def pure(self):
+    return True
+
+  def __str__(self) -> str:
+    return f'{self.dest} = nao {self.operand}'
+
+@dataclass
+class CallOp(Instruction):
+  dest: Optional[Location] # None for a call statement
+  func: str
+  args: List[Operand]
+
+  def defs(self):
+    return (self.dest,) if self.dest is not None else ()
+
+  def uses(self):
+    return tuple(self.args)
+
+  def __str__(self) -> str:
+    call = f'{self.func}({", ".join(str(arg) for arg in self.args)})'
+    return f'{self.dest} = {call}' if self.dest is not None else call
+
+@dataclass
+class IndexOp(Instruction):
+  dest: Location
+  value: Operand
+  index: Operand
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return (self.value, self.index)
+
+  def __str__(self) -> str:
+    return f'{self.dest} = {self.value}[{self.index}]'
+
+@dataclass
+class StoreIndex(Instruction):
+  # container[index] = value; changes the list, defines no location
+  container: Operand
+  index: Operand
+  value: Operand
+
+  def uses(self):
+    return (self.container, self.index, self.value)
+
+  def __str__(self) -> str:
+    return f'{self.container}[{self.index}] = {self.value}'
+
+@dataclass
+class BuildList(Instruction):
+  dest: Location
+  items: List[Operand]
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return tuple(self.items)
+
+  @property
+  def pure(self):
+    return True
+
+  def __str__(self) -> str:
+    return f'{self.dest} = [{", ".join(str(item) for item in self.items)}]'
+
+@dataclass
+class RangeTest(Instruction):
+  # True while a para counter still has values left: bool(range(counter, end, step))
+  dest: Location
+  counter: Operand
+  end: Operand
+  step: Operand
+
+  def defs(self):
+    return (self.dest,)
+
+  def uses(self):
+    return (self.counter, self.end, self.step)
+
+  def __str__(self) -> str:
+    return f'{self.dest} = range({self.counter}, {self.end}, {self.step}) nao vazio'
+
+@dataclass
+class Print(Instruction):
+  value: Operand
+
+  def uses(self):
+    return (self.value,)
+
+  def __str__(self) -> str:
+    return f'escreva {self.value}'
+
+@dataclass
+class Read(Instruction):
+  dest: Var
+  type_name: Optional[str] # TYPE_*, decides the int() conversion
+
+  def defs(self):
+    return (self.dest,)
+
+  def __str__(self) -> str:
+    return f'leia {self.dest}: {self.type_name}'
+
+# ----------------
+# Terminators
+# ----------------
+@dataclass
+class Jump:
+  target: int
+
+  def successors(self) -> Tuple[int, ...]:
+    return (self.target,)
+
+  def uses(self) -> Tuple[Operand, ...]:
+    return ()
+
+  def __str__(self) -> str:
+    return f'vai B{self.target}'
+
+@dataclass
+class Branch:
+  condition: Operand
+  if_true: int
+  if_false: int
+
+  def successors(self) -> Tuple[int, ...]:
+    return (self.if_true, self.if_false)
+
+  def uses(self) -> Tuple[Operand, ...]:
+    return (self.condition,)
+
+  def __str__(self) -> str:
+    return f'se {self.condition} vai B{self.if_true} senao B{self.if_false}'
+
+@dataclass
+class Return:
+  def successors(self) -> Tuple[int, ...]:
+    return ()
+
+  def uses(self) -> Tuple[Operand, ...]:
+    return ()
+
+  def __str__(self) -> str:
+    return 'fim'
+
+Terminator = Union[Jump, Branch, Return]
+
+OPERATOR_NAMES = {
+  TokenKind.OPMAIS: '+',
+  TokenKind.OPMENOS: '-',
+  TokenKind.OPMULTI: '*',
+  TokenKind.OPDIVI: '/',
+  TokenKind.LOGIGUAL: '=',
+  TokenKind.LOGDIFF: '<>',
+  TokenKind.LOGMENOR: '<',
+  TokenKind.LOGMAIOR: '>',
+  TokenKind.LOGMENORIGUAL: '<=',
+  TokenKind.LOGMAIORIGUAL: '>=',
+}
+
+# ----------------
+# Graph
+# ----------------
+@dataclass
+class BasicBlock:
+  index: int
+  instructions: List[Instruction] = field(default_factory=list)
+  terminator: Optional[Terminator] = None
+
+  @property
+  def successors(self) -> Tuple[int, ...]:
+    return self.terminator.successors() if self.terminator is not None else ()
+
+@dataclass
+class ControlFlowGraph:
+  name: str # Program name, quotes included
+  plugins: List[str]
+  variables: Dict[str, str] # Declared variables -> TYPE_*, in declaration order
+  blocks: List[BasicBlock] = field(default_factory=list)
+  temp_count: int = 0
+
+  entry = 0
+
+  def new_block(self) -> BasicBlock:
+    block = BasicBlock(len(self.blocks))
+    self.blocks.append(block)
+    return block
+
+  def new_temp(self) -> Temp:
+    temp = Temp(self.temp_count)
+    self.temp_count += 1
+    return temp
+
+  def predecessors(self) -> List[List[int]]:
+    predecessors = [[] for _ in self.blocks]
+    for block in self.blocks:
+      for successor in block.successors:
+        predecessors[successor].append(block.index)
+    return predecessors
+
+  def reachable(self) -> List[int]:
+    # Reverse postorder from the entry: forward analyses converge fastest in it
+    seen = set()
+    order = []
+    stack = [(self.entry, iter(self.blocks[self.entry].successors))]
+    seen.add(self.entry)
+    while stack:
+      index, successors = stack[-1]
+      successor = next(successors, None)
+      if successor is None:
+        stack.pop()
+        order.append(index)
+      elif successor not in seen:
+        seen.add(successor)
+        stack.append((successor, iter(self.blocks[successor].successors)))
+    order.reverse()
+    return order
+
+  def dump(self) -> str:
+    lines = []
+    for block in self.blocks:
+      lines.append(f'B{block.index}:')
+      lines.extend(f'  {instruction}' for instruction in block.instructions)
+      lines.append(f'  {block.terminator}')
+    return '\n'.join(lines)
+
+# ----------------
+# Lowering from the AST
+# ----------------
+class Lowering(NodeVisitor):
+  # Statements append to `self.block`, the block control is in; control
+  # statements close it and continue in a new one.
+  def __init__(self, program: Program):
+    variables = {}
+    for declaration in program.declarations:
+      for name in declaration.names:
+        variables.setdefault(name.id, TYPE_NAMES.get(declaration.type_name, declaration.type_name))
+
+    self.program = program
+    self.cfg = ControlFlowGraph(program.name, [plugin.name for plugin in program.plugins], variables)
+    self.block = self.cfg.new_block()
+    self.value_lowerers = {
+      Name: self.lower_name,
+      Number: self.lower_number,
+      String: self.lower_string,
+      BinOp: self.lower_binop,
+      Not: self.lower_logic_value,
+      Group: self.lower_group,
+      Call: self.lower_call,
+      Index: self.lower_index,
+      ListLiteral: self.lower_list,
+    }
+
+  def lower(self) -> ControlFlowGraph:
+    self.lower_block(self.program.body)
+    self.close(Return())
+    return self.cfg
+
+  def lower_block(self, statements: List[Node]):
+    for statement in statements:
+      self.visit(statement)
+
+  def emit(self, instruction: Instruction):
+    self.block.instructions.append(instruction)
+
+  def close(self, terminator: Terminator):
+    self.block.terminator = terminator
+
+  def start(self, block: BasicBlock):
+    self.block = block
+
+  # ----------------
+  # Statements
+  # ----------------
+  def visit_Assign(self, node: Assign):
+    value = self.lower_value(node.value)
+    if isinstance(node.target, Index):
+      # Python order: the value, then the container, then the index
+      container = self.lower_value(node.target.value)
+      index = self.lower_value(node.target.index)
+      self.emit(StoreIndex(node.line, container, index, value))
+    else:
+      self.emit(Move(node.line, Var(node.target.id), value))
+
+  def visit_CallStatement(self, node: CallStatement):
+    args = [self.lower_value(arg) for arg in node.call.args]
+    self.emit(CallOp(node.line, None, node.call.func.id, args))
+
+  def visit_Escreva(self, node: Escreva):
+    self.emit(Print(node.line, self.lower_value(node.value)))
+
+  def visit_Leia(self, node: Leia):
+    self.emit(Read(node.line, Var(node.target.id), self.cfg.variables.get(node.target.id)))
+
+  def visit_Se(self, node: Se):
+    body = self.cfg.new_block()
+    orelse = self.cfg.new_block() if node.orelse else None
+    after = self.cfg.new_block()
+
+    self.lower_condition(node.condition, body.index, (orelse or after).index)
+    self.start(body)
+    self.lower_block(node.body)
+    self.close(Jump(after.index))
+
+    if orelse is not None:
+      self.start(orelse)
+      self.lower_block(node.orelse)
+      self.close(Jump(after.index))
+
+    self.start(after)
+
+  def visit_Enquanto(self, node: Enquanto):
+    header = self.cfg.new_block()
+    body = self.cfg.new_block()
+    after = self.cfg.new_block()
+
+    self.close(Jump(header.index))
+    self.start(header)
+    self.lower_condition(node.condition, body.index, after.index)
+    self.start(body)
+    self.lower_block(node.body)
+    self.close(Jump(header.index))
+    self.start(after)
+
+  def visit_Para(self, node: Para):
+    # for var in range(start, end + 1, step): the bounds are evaluated once and
+    # the variable is set from a hidden counter, so assigning it in the body
+    # does not change the iteration
+    counter = self.cfg.new_temp()
+    end = self.cfg.new_temp()
+    self.emit(Move(node.line, counter, self.lower_value(node.start)))
+    self.emit(BinaryOp(node.line, end, TokenKind.OPMAIS, self.lower_value(node.end), Const(1)))
+    step = self.lower_value(node.step) if node.step is not None else Const(1)
+    if type(step) is Var:
+      step_copy = self.cfg.new_temp()
+      self.emit(Move(node.line, step_copy, step))
+      step = step_copy
+
+    header = self.cfg.new_block()
+    body = self.cfg.new_block()
+    after = self.cfg.new_block()
+    self.close(Jump(header.index))
+
+    self.start(header)
+    test = self.cfg.new_temp()
+    if type(step) is Const and type(step.value) is int and step.value != 0:
+      comparison = TokenKind.LOGMENOR if step.value > 0 else TokenKind.LOGMAIOR
+      self.emit(BinaryOp(node.line, test, comparison, counter, end))
+    else:
+      self.emit(RangeTest(node.line, test, counter, end, step))
+    self.close(Branch(test, body.index, after.index))
+
+    self.start(body)
+    self.emit(Move(node.line, Var(node.var.id), counter))
+    self.lower_block(node.body)
+    self.emit(BinaryOp(node.line, counter, TokenKind.OPMAIS, counter, step))
+    self.close(Jump(header.index))
+    self.start(after)
+
+  # ----------------
+  # Conditions: lowered to branches
+  # ----------------
+  def lower_condition(self, node: Node, if_true: int, if_false: int):
+    if isinstance(node, Group):
+      self.lower_condition(node.expr, if_true, if_false)
+    elif isinstance(node, Not):
+      self.lower_condition(node.operand, if_false, if_true)
+    elif isinstance(node, BinOp) and node.op in (TokenKind.E, TokenKind.OU):
+      # The right operand only runs when the left one did not decide. A chain
+      # (a e b e c) is walked down its left operands in a loop
+      pending = []
+      while isinstance(node, BinOp) and node.op in (TokenKind.E, TokenKind.OU):
+        right = self.cfg.new_block()
+        pending.append((right, node.right, if_true, if_false))
+        if node.op == TokenKind.E:
+          if_true = right.index
+        else:
+          if_false = right.index
+        node = node.left
+      self.lower_condition(node, if_true, if_false)
+      for right, operand, if_true, if_false in reversed(pending):
+        self.start(right)
+        self.lower_condition(operand, if_true, if_false)
+    else:
+      self.close(Branch(self.lower_value(node), if_true, if_false))
+
+  # ----------------
+  # Values: every operator gets its own temporary
+  # ----------------
+  def lower_value(self, node: Node) -> Operand:
+    lowerer = self.value_lowerers.get(type(node))
+    if lowerer is None:
+      raise TypeError(f'Unexpected expression node {type(node).__name__}')
+
+    return lowerer(node)
+
+  def lower_name(self, node: Name) -> Operand:
+    return Var(node.id)
+
+  def lower_number(self, node: Number) -> Operand:
+    return Const(int(node.text))
+
+  def lower_string(self, node: String) -> Operand:
+    return Const(ast.literal_eval(node.text))
+
+  def lower_binop(self, node: BinOp) -> Operand:
+    # The left operands are lowered in a loop, from the innermost BinOp out;
+    # below the outermost e/ou, the branches take over
+    first, chain = binop_chain(node)
+    logic = [index for index, binop in enumerate(chain) if binop.op in (TokenKind.E, TokenKind.OU)]
+    if logic:
+      value = self.lower_logic_value(chain[logic[-1]])
+      chain = chain[logic[-1] + 1:]
+    else:
+      value = self.lower_value(first)
+
+    for binop in chain:
+      right = self.lower_value(binop.right)
+      dest = self.cfg.new_temp()
+      self.emit(BinaryOp(binop.line, dest, binop.op, value, right))
+      value = dest
+    return value
+
+  def lower_logic_value(self, node: Node) -> Operand:
+    # e/ou/nao used as a value: branch, then join with True or False
+    if isinstance(node, Not):
+      operand = self.lower_value(node.operand)
+      dest = self.cfg.new_temp()
+      self.emit(NotOp(node.line, dest, operand))
+      return dest
+
+    dest = self.cfg.new_temp()
+    if_true = self.cfg.new_block()
+    if_false = self.cfg.new_block()
+    after = self.cfg.new_block()
+    self.lower_condition(node, if_true.index, if_false.index)
+    for block, value in ((if_true, True), (if_false, False)):
+      self.start(block)
+      self.emit(Move(node.line, dest, Const(value)))
+      self.close(Jump(after.index))
+    self.start(after)
+    return dest
+
+  def lower_group(self, node: Group) -> Operand:
+    return self.lower_value(node.expr)
+
+  def lower_call(self, node: Call) -> Operand:
+    args = [self.lower_value(arg) for arg in node.args]
+    dest = self.cfg.new_temp()
+    self.emit(CallOp(node.line, dest, node.func.id, args))
+    return dest
+
+  def lower_index(self, node: Index) -> Operand:
+    value = self.lower_value(node.value)
+    index = self.lower_value(node.index)
+    dest = self.cfg.new_temp()
+    self.emit(IndexOp(node.line, dest, value, index))
+    return dest
+
+  def lower_list(self, node: ListLiteral) -> Operand:
+    items = [self.lower_value(item) for item in node.items]
+    dest = self.cfg.new_temp()
+    self.emit(BuildList(node.line, dest, items))
+    return dest
+
+def lower(program: Program) -> ControlFlowGraph:
+  return Lowering(program).lower()
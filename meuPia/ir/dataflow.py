@@ -0,0 +1,105 @@
+from typing import FrozenSet, List, NamedTuple, Set, Tuple
+
+from .cfg import Const, ControlFlowGraph, Location, Var
+
+# ----------------
+# Iterative dataflow analyses over the CFG. Results are lists indexed by
+# block; sets hold Var and Temp locations (constants are never live).
+# ----------------
+class Definition(NamedTuple):
+  location: Location
+  block: int
+  position: int # Instruction index inside the block; -1: the declaration's initial value
+
+def liveness(cfg: ControlFlowGraph) -> Tuple[List[FrozenSet[Location]], List[FrozenSet[Location]]]:
+  # (live_in, live_out) per block. Nothing is live after the program returns:
+  # variables are locals of main()
+  uses, defs = [], []
+  for block in cfg.blocks:
+    used, defined = set(), set()
+    if block.terminator is not None:
+      used.update(location for location in block.terminator.uses() if not isinstance(location, Const))
+    # Backwards, so a use after a definition in the same block is not exposed
+    for instruction in reversed(block.instructions):
+      for location in instruction.defs():
+        used.discard(location)
+        defined.add(location)
+      used.update(location for location in instruction.uses() if not isinstance(location, Const))
+    uses.append(frozenset(used))
+    defs.append(frozenset(defined))
+
+  live_in = [frozenset()] * len(cfg.blocks)
+  live_out = [frozenset()] * len(cfg.blocks)
+  order = list(reversed(cfg.reachable())) # Postorder: successors first
+  changed = True
+  while changed:
+    changed = False
+    for index in order:
+      out = frozenset().union(*(live_in[successor] for successor in cfg.blocks[index].successors))
+      new_in = uses[index] | (out - defs[index])
+      if out != live_out[index] or new_in != live_in[index]:
+        live_out[index] = out
+        live_in[index] = new_in
+        changed = True
+  return live_in, live_out
+
+def reaching_definitions(cfg: ControlFlowGraph) -> Tuple[List[FrozenSet[Definition]], List[FrozenSet[Definition]]]:
+  # (reach_in, reach_out) per block. Every declared variable starts with one
+  # definition, its initial value, reaching the entry
+  generated, killed_locations = [], []
+  for block in cfg.blocks:
+    last = {}
+    for position, instruction in enumerate(block.instructions):
+      for location in instruction.defs():
+        last[location] = Definition(location, block.index, position)
+    generated.append(frozenset(last.values()))
+    killed_locations.append(frozenset(last))
+
+  initial = frozenset(Definition(Var(name), cfg.entry, -1) for name in cfg.variables)
+  predecessors = cfg.predecessors()
+  reach_in = [frozenset()] * len(cfg.blocks)
+  reach_out = [frozenset()] * len(cfg.blocks)
+  order = cfg.reachable()
+  changed = True
+  while changed:
+    changed = False
+    for index in order:
+      incoming = frozenset().union(*(reach_out[predecessor] for predecessor in predecessors[index]))
+      if index == cfg.entry:
+        incoming |= initial
+      kills = killed_locations[index]
+      out = generated[index] | frozenset(definition for definition in incoming if definition.location not in kills)
+      if incoming != reach_in[index] or out != reach_out[index]:
+        reach_in[index] = incoming
+        reach_out[index] = out
+        changed = True
+  return reach_in, reach_out
+
+def remove_dead_stores(cfg: ControlFlowGraph) -> int:
+  # Drops pure instructions whose result is never read afterwards; repeats,
+  # since dropping one can make the instructions feeding it dead too.
+  # Returns how many were removed
+  removed = 0
+  while True:
+    _, live_out = liveness(cfg)
+    removed_now = 0
+    for index in cfg.reachable():
+      block = cfg.blocks[index]
+      live: Set[Location] = set(live_out[index])
+      live.update(location for location in block.terminator.uses() if not isinstance(location, Const))
+      kept = []
+      for instruction in reversed(block.instructions):
+        defs = instruction.defs()
+        if instruction.pure and defs and not any(location in live for location in defs):
+          removed_now += 1
+          continue
+        for location in defs:
+          live.discard(location)
+        live.update(location for location in instruction.uses() if not isinstance(location, Const))
+        kept.append(instruction)
+      kept.reverse()
+      block.instructions = kept
+
+    removed += removed_now
+    if not removed_now:
+      return removed
@@ -0,0 +1,154 @@
+from typing import List
+
+from ..analyzers.code_generator import OPERATOR_TEXT, plugin_import, plugin_missing_message
+from ..analyzers.symbol_table import TYPE_INTEIRO
+from .cfg import (
+    BasicBlock, BinaryOp, Branch, BuildList, CallOp, ControlFlowGraph, IndexOp, Instruction, Jump,
+    Move, NotOp, Operand, Print, RangeTest, Read, Return, StoreIndex,
+)
+
+# Current block of the dispatch loop in the generated main()
+STATE = "_bloco"
+
+class PythonEmitter:
+    # Emits Python from the CFG, for any graph the lowering or a later pass
+    # produces. main() runs the blocks as a state machine:
+    #
+    #     _bloco = 0
+    #     while True:
+    #         if _bloco == 0:
+    #             ...
+    #             _bloco = 2
+    #         if _bloco == 2:
+    #             ...
+    #
+    # Blocks are laid out in reverse postorder, so a forward jump falls into
+    # the next `if` in the same pass; only back edges go round the loop again.
+    # Every Portugol variable is a local of main() initialized up front.
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        self.python_code = []
+        self.indent_level = 0
+        self.instruction_emitters = {
+            Move: self.emit_move,
+            BinaryOp: self.emit_binary,
+            NotOp: self.emit_not,
+            CallOp: self.emit_call,
+            IndexOp: self.emit_index,
+            StoreIndex: self.emit_store_index,
+            BuildList: self.emit_list,
+            RangeTest: self.emit_range_test,
+            Print: self.emit_print,
+            Read: self.emit_read,
+        }
+
+    def add_line(self, line):
+        indent = "    " * self.indent_level
+        self.python_code.append(f"{indent}{line}")
+
+    def generate(self) -> str:
+        self.add_line("# -*- coding: utf-8 -*-")
+        self.add_line("import sys")
+        for plugin in self.cfg.plugins:
+            self.add_line("try:")
+            self.add_line(f"    {plugin_import(plugin)}")
+            self.add_line("except ImportError:")
+            self.add_line(f"    print(\"{plugin_missing_message(plugin)}\")")
+            self.add_line("    sys.exit(1)")
+        self.add_line("")
+
+        self.add_line("def main():")
+        self.indent_level += 1
+        for name, type_name in self.cfg.variables.items():
+            self.add_line(f"{name} = {0 if type_name == TYPE_INTEIRO else repr('')}")
+        self.gen_blocks()
+        self.indent_level -= 1
+
+        self.add_line("")
+        self.add_line("if __name__ == '__main__':")
+        self.add_line("    main()")
+        return "\n".join(self.python_code)
+
+    def gen_blocks(self):
+        order = self.cfg.reachable()
+        position = {index: place for place, index in enumerate(order)}
+
+        self.add_line(f"{STATE} = {self.cfg.entry}")
+        self.add_line("while True:")
+        self.indent_level += 1
+        for place, index in enumerate(order):
+            block = self.cfg.blocks[index]
+            self.add_line(f"if {STATE} == {index}:")
+            self.indent_level += 1
+            for instruction in block.instructions:
+                self.emit_instruction(instruction)
+            self.gen_terminator(block, place, position)
+            self.indent_level -= 1
+        self.indent_level -= 1
+
+    def gen_terminator(self, block: BasicBlock, place: int, position: dict):
+        terminator = block.terminator
+        if isinstance(terminator, Return):
+            self.add_line("return")
+            return
+
+        if isinstance(terminator, Jump):
+            self.add_line(f"{STATE} = {terminator.target}")
+            targets = [terminator.target]
+        elif isinstance(terminator, Branch):
+            self.add_line(f"{STATE} = {terminator.if_true} if {self.operand(terminator.condition)} else {terminator.if_false}")
+            targets = [terminator.if_true, terminator.if_false]
+        else:
+            raise TypeError(f"Unexpected terminator {type(terminator).__name__}")
+
+        # Blocks laid out before this one are only reached from the loop top
+        if any(position[target] <= place for target in targets):
+            self.add_line("continue")
+
+    # ----------------
+    # Instructions
+    # ----------------
+    def operand(self, operand: Operand) -> str:
+        return str(operand)
+
+    def operands(self, operands: List[Operand]) -> str:
+        return ", ".join(self.operand(operand) for operand in operands)
+
+    def emit_instruction(self, instruction: Instruction):
+        self.instruction_emitters[type(instruction)](instruction)
+
+    def emit_move(self, instruction: Move):
+        self.add_line(f"{instruction.dest} = {self.operand(instruction.source)}")
+
+    def emit_binary(self, instruction: BinaryOp):
+        left = self.operand(instruction.left)
+        right = self.operand(instruction.right)
+        self.add_line(f"{instruction.dest} = {left}{OPERATOR_TEXT[instruction.op]}{right}")
+
+    def emit_not(self, instruction: NotOp):
+        self.add_line(f"{instruction.dest} = not {self.operand(instruction.operand)}")
+
+    def emit_call(self, instruction: CallOp):
+        call = f"{instruction.func}({self.operands(instruction.args)})"
+        self.add_line(f"{instruction.dest} = {call}" if instruction.dest is not None else call)
+
+    def emit_index(self, instruction: IndexOp):
+        self.add_line(f"{instruction.dest} = {self.operand(instruction.value)}[{self.operand(instruction.index)}]")
+
+    def emit_store_index(self, instruction: StoreIndex):
+        container = self.operand(instruction.container)
+        self.add_line(f"{container}[{self.operand(instruction.index)}] = {self.operand(instruction.value)}")
+
+    def emit_list(self, instruction: BuildList):
+        self.add_line(f"{instruction.dest} = [{self.operands(instruction.items)}]")
+
+    def emit_range_test(self, instruction: RangeTest):
+        bounds = self.operands([instruction.counter, instruction.end, instruction.step])
+        self.add_line(f"{instruction.dest} = bool(range({bounds}))")
+
+    def emit_print(self, instruction: Print):
+        self.add_line(f"print({self.operand(instruction.value)})")
+
+    def emit_read(self, instruction: Read):
+        value = "int(input())" if instruction.type_name == TYPE_INTEIRO else "input()"
+        self.add_line(f"{instruction.dest} = {value}")
@@ -0,0 +1,106 @@
+import re
+import sys
+
+# ----------------
+# Runtime imported by programs compiled with --io-rapido: leia and escreva
+# without one input()/print() call per value.
+#
+# Input is read from sys.stdin.buffer in bulk, all of it on the first leia,
+# and split with regular expressions. An inteiro takes the next whitespace-separated token, so
+# several numbers may share a line; a cadeia takes the rest of the current
+# line, like input(). Output accumulates in a list that is written when it
+# grows past OUTPUT_LIMIT, when a leia needs more input and when the program
+# ends (descarrega(), called by the generated code).
+#
+# When stdin is a terminal the input is read one line at a time instead, so
+# prompts written with escreva show up before each leia waits.
+# ----------------
+OUTPUT_LIMIT = 1 << 16 # Characters buffered before a write
+
+TOKEN = re.compile(rb"[ \t\r\n]*([^ \t\r\n]+)")
+LINE_END = re.compile(rb"[ \t\r]*\n?")
+
+class Reader:
+    def __init__(self, stream, interactive: bool):
+        self.stream = stream
+        self.interactive = interactive
+        self.data = b""
+        self.position = 0
+        self.at_eof = False
+
+    def fill(self) -> bool:
+        # Appends more input; False at end of file
+        if self.at_eof:
+            return False
+        descarrega()
+
+        source = getattr(self.stream, "buffer", self.stream)
+        chunk = source.readline() if self.interactive else source.read()
+        if isinstance(chunk, str): # Text stream without a buffer (tests, IDEs)
+            chunk = chunk.encode("utf-8")
+        if not chunk or not self.interactive:
+            self.at_eof = True
+        self.data = self.data[self.position:] + chunk
+        self.position = 0
+        return bool(chunk)
+
+    def token(self) -> bytes:
+        while True:
+            match = TOKEN.match(self.data, self.position)
+            # A token touching the end of the data may go on in the next chunk
+            if match is not None and (match.end() < len(self.data) or self.at_eof):
+                # After the last token of a line, the next cadeia starts on the
+                # next line, as after int(input())
+                self.position = LINE_END.match(self.data, match.end()).end()
+                return match.group(1)
+            if not self.fill() and match is None:
+                raise EOFError("EOF when reading a line")
+
+    def line(self) -> str:
+        while True:
+            end = self.data.find(b"\n", self.position)
+            if end >= 0 or self.at_eof:
+                break
+            self.fill()
+
+        if end < 0:
+            if self.position >= len(self.data):
+                raise EOFError("EOF when reading a line")
+            end = len(self.data)
+        text = self.data[self.position:end]
+        self.position = end + 1
+        return text.rstrip(b"\r").decode("utf-8")
+
+_output = []
+_output_size = 0
+_reader = None
+
+def reader() -> Reader:
+    # One reader per stdin object, so a replaced sys.stdin starts afresh
+    global _reader
+    if _reader is None or _reader.stream is not sys.stdin:
+        _reader = Reader(sys.stdin, sys.stdin.isatty())
+    return _reader
+
+def escreva(value):
+    # Same text as print(value)
+    global _output_size
+    text = f"{value}\n"
+    _output.append(text)
+    _output_size += len(text)
+    if _output_size > OUTPUT_LIMIT:
+        descarrega()
+
+def descarrega():
+    global _output_size
+    if _output:
+        sys.stdout.write("".join(_output))
+        _output.clear()
+        _output_size = 0
+    sys.stdout.flush()
+
+def leia_inteiro() -> int:
+    return int(reader().token())
+
+def leia_texto() -> str:
+    return reader().line()
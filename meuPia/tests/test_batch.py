@@ -0,0 +1,90 @@
+import json
+import os
+from meuPia import batch
+from meuPia.analyzers.diagnostics import PHASE_SEMANTIC
+
+VALID_PROGRAM = """algoritmo "Ok"
+var x: inteiro
+inicio
+x <- 1
+escreva(x)
+fimalgoritmo"""
+
+INVALID_PROGRAM = """algoritmo "Erro"
+var x: inteiro
+inicio
+y <- 1
+fimalgoritmo"""
+
+def write_class(root):
+    # Two students with the same file names, plus a file that is not Portugol
+    for student, source in (("ana", VALID_PROGRAM), ("bia", INVALID_PROGRAM)):
+        folder = root / "turma" / student
+        folder.mkdir(parents=True)
+        (folder / "prova.por").write_text(source, encoding="utf-8")
+    (root / "turma" / "leiame.txt").write_text("nada", encoding="utf-8")
+    return root / "turma"
+
+def test_collect_files_directories_and_globs(tmp_path):
+    turma = write_class(tmp_path)
+    expected = [str(turma / "ana" / "prova.por"), str(turma / "bia" / "prova.por")]
+
+    assert batch.collect_files([str(turma)]) == expected
+    assert batch.collect_files([str(turma / "**" / "*.por"), str(turma / "ana")]) == expected
+    assert batch.collect_files([str(tmp_path / "vazio" / "*.por")]) == []
+
+def test_compile_batch_isolates_failures(tmp_path):
+    turma = write_class(tmp_path)
+    files = batch.collect_files([str(turma)]) + [str(turma / "faltando.por")]
+    output = tmp_path / "saida"
+
+    report = batch.compile_batch(files, str(output), workers=2, options={'artifacts': 'nenhum'})
+
+    assert (report['arquivos'], report['ok'], report['erro'], report['falha']) == (3, 1, 1, 1)
+    assert [result['arquivo'] for result in report['resultados']] == files
+    ok, error, failure = report['resultados']
+
+    # Equal names in different folders do not overwrite each other
+    assert ok['saida'] == os.path.normpath(str(output / "ana" / "prova.py"))
+    assert os.path.isfile(ok['saida'])
+    assert not os.path.exists(output / "bia" / "prova.py")
+
+    assert error['saida'] is None
+    assert error['diagnosticos'][0]['phase'] == PHASE_SEMANTIC
+    assert 'y' in error['diagnosticos'][0]['message']
+    assert failure['diagnosticos'][0]['phase'] is None
+
+def test_cli_writes_report(tmp_path, capsys):
+    turma = write_class(tmp_path)
+    output = tmp_path / "saida"
+
+    arguments = [str(turma), "--saida", str(output), "--processos", "1", "--gerador", "bytecode",
+                 "--pasta-cache", str(tmp_path / "cache")]
+    batch.cli(arguments)
+
+    report = json.loads((output / batch.REPORT_FILE_NAME).read_text(encoding="utf-8"))
+    assert [result['status'] for result in report['resultados']] == ['ok', 'erro']
+    assert report['resultados'][0]['saida'].endswith("prova.pyc")
+    assert report['arquivos_por_segundo'] > 0
+    assert report['cache_acertos'] == 0
+    assert "arquivos/s" in capsys.readouterr().out
+
+    # Second run: both files, the one with errors included, come from the cache
+    batch.cli(arguments)
+    report = json.loads((output / batch.REPORT_FILE_NAME).read_text(encoding="utf-8"))
+    assert report['cache_acertos'] == 2
+    assert [result['status'] for result in report['resultados']] == ['ok', 'erro']
+
+def test_cli_cache_limits_match_meupia(tmp_path, monkeypatch):
+    # meupia-lote builds its cache from the same options as meupia
+    turma = write_class(tmp_path)
+    used = {}
+    original = batch.compile_batch
+    def compile_batch(files, output_path, workers, options):
+        used.update(options)
+        return original(files, output_path, 1, options)
+    monkeypatch.setattr(batch, "compile_batch", compile_batch)
+
+    batch.cli([str(turma), "--saida", str(tmp_path / "saida"), "--pasta-cache", str(tmp_path / "cache"),
+               "--cache-max-mb", "2", "--cache-max-dias", "1"])
+    assert (used['cache'].max_bytes, used['cache'].max_age) == (2 * 1024 * 1024, 24 * 60 * 60)
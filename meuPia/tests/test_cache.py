@@ -0,0 +1,121 @@
+import os
+from meuPia import compiler
+from meuPia.utils.cache import ContentCache, content_key
+
+PROGRAM = """algoritmo "Cache"
+var x: inteiro
+inicio
+x <- 6 * 7
+escreva(x)
+fimalgoritmo
+"""
+
+def test_cache_roundtrip_and_key(tmp_path):
+    cache = ContentCache(str(tmp_path))
+    key = content_key("programa", "0.1.0")
+
+    assert cache.get(key) is None
+    cache.put(key, b"dados")
+    assert cache.get(key) == b"dados"
+    # Part boundaries are part of the key
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ContentCache(str(tmp_path), max_bytes=35, max_age=None)
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, b"0123456789")
+        os.utime(cache.path(key), (index, index))
+
+    # Reading "a" makes it the most recent; "b" is the oldest now
+    cache.get("a")
+    cache.put("d", b"0123456789")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"0123456789"
+    assert cache.get("d") == b"0123456789"
+
+def test_compiler_reuses_cached_code(tmp_path, capsys):
+    source = tmp_path / "cache.por"
+    source.write_text(PROGRAM, encoding="utf-8")
+    cache = ContentCache(str(tmp_path / "cache"))
+
+    first = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum",
+                          backend=compiler.BACKEND_MEMORY, cache=cache)
+    second = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum",
+                           backend=compiler.BACKEND_MEMORY, cache=cache)
+
+    assert first.success and second.success and second.cached
+    assert "loaded from cache" in capsys.readouterr().out
+    compiler.run_code(second.code, str(source))
+    assert capsys.readouterr().out == "42\n"
+
+    # Any change to the source is a miss
+    source.write_text(PROGRAM.replace("6 * 7", "6 * 8"), encoding="utf-8")
+    third = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum",
+                          backend=compiler.BACKEND_MEMORY, cache=cache)
+    assert not third.cached
+
+def test_cache_expires_old_entries(tmp_path):
+    cache = ContentCache(str(tmp_path), max_age=60)
+    cache.put("velha", b"dados")
+    os.utime(cache.path("velha"), (0, 0))
+    cache.put("nova", b"dados")
+
+    assert cache.get("velha") is None
+    assert cache.get("nova") == b"dados"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_text_backend_hit_skips_every_phase(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "cache.por"
+    source.write_text(PROGRAM, encoding="utf-8")
+    cache = ContentCache(str(tmp_path / "cache"))
+
+    first = compiler.main(str(source), str(tmp_path / "out"), cache=cache)
+    os.unlink(first.output_file)
+
+    def no_phase(*args, **kwargs):
+        raise AssertionError("phase ran on a cache hit")
+    monkeypatch.setattr(compiler.lexical_analyzer, "compile", no_phase)
+    second = compiler.main(str(source), str(tmp_path / "out"), cache=cache)
+
+    assert not first.cached and second.cached
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.output_file == first.output_file
+    with open(second.output_file, encoding="utf-8") as f:
+        assert f.read() == first.source
+    assert second.source_map == first.source_map
+
+    # Other options are another entry
+    third = compiler.main(str(source), str(tmp_path / "out"), cache=cache, optimize=2, artifacts="nenhum")
+    assert not third.cached
+
+def test_cache_keeps_diagnostics(tmp_path, capsys):
+    source = tmp_path / "erro.por"
+    source.write_text(PROGRAM.replace("x <- 6 * 7", "y <- 1\nz <- 2"), encoding="utf-8")
+    cache = ContentCache(str(tmp_path / "cache"))
+
+    first = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum", recover=True, cache=cache)
+    second = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum", recover=True, cache=cache)
+    assert second.cached and not second.success
+    assert second.diagnostics == first.diagnostics and len(first.diagnostics) == 2
+    assert "2 erro(s)" in capsys.readouterr().out.split("from cache")[-1]
+
+    # Errors outside the compiler phases are not cached
+    missing = compiler.main(str(tmp_path / "faltando.por"), str(tmp_path / "out"), cache=cache)
+    assert missing.diagnostics[0].phase is None
+    assert len(os.listdir(cache.directory)) == 1
+
+def test_cli_without_cache(tmp_path, capsys):
+    source = tmp_path / "cache.por"
+    source.write_text(PROGRAM, encoding="utf-8")
+    arguments = [str(source), "--saida", str(tmp_path / "out"), "--artefatos", "nenhum",
+                 "--pasta-cache", str(tmp_path / "cache")]
+
+    compiler.cli(arguments)
+    compiler.cli(arguments)
+    assert "Cache: 1 acerto(s), 0 falta(s)" in capsys.readouterr().out
+
+    compiler.cli(arguments + ["--sem-cache"])
+    output = capsys.readouterr().out
+    assert "Cache:" not in output and "[COMPILED SUCCESSFULLY]" in output
@@ -1,5 +1,11 @@
+import ast
+import contextlib
+import io
 import pytest
+import sys
+from meuPia import compiler
 from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.python_ast_generator import PythonAstGenerator
 from meuPia.analyzers.syntax_analyzer import Parser
 from meuPia.analyzers.lexical_analyzer import scan_line
 
@@ -70,7 +76,22 @@ def test_gen_loop_para():
     output = compile_snippet(code)
     # Range é inclusive no portugol, entao 1 ate 10 vira range(1, 10 + 1, 1)
     assert "for i in range(1, 10 + 1, 1):" in output
-    assert "    print(i)" in output
+    # print is bound to a local of main() once, outside the loop
+    assert "    _print = print" in output
+    assert "        _print(i)" in output
+
+def test_gen_variables_are_initialized_locals():
+    code = """algoritmo "Locals"
+    var x: inteiro
+    s: string
+    inicio
+    x <- x + 1
+    fimalgoritmo"""
+
+    output = compile_snippet(code)
+    assert "def main():\n    x = 0\n    s = ''\n    x = x+1" in output
+    # Nothing is aliased without loops
+    assert "_print" not in output
 
 def test_gen_function_call_ia():
     code = """algoritmo "IA"
@@ -121,8 +142,71 @@ def test_gen_boolean_logic():
     fimalgoritmo"""
     
     output = compile_snippet(code)
-    # Check translation of operators
-    assert "if (x>0) and (y<10) or ( not (z>0)):" in output
+    # Check translation of operators; redundant parentheses are dropped
+    assert "if x>0 and y<10 or not z>0:" in output
+
+def test_gen_minimal_parentheses():
+    code = """algoritmo "Parens"
+    var a, b, c, x: inteiro
+    inicio
+    x <- ((a + b)) * (c - a) - (a - (b - c)) / (a * b)
+    x <- (a - b) - c + (a * b)
+    se nao (a > b e b > c) ou (a < b ou b < c) e a = c entao
+    fim_se
+    fimalgoritmo"""
+
+    output = compile_snippet(code)
+    assert "x = (a+b)*(c-a)-(a-(b-c))/(a*b)" in output
+    assert "x = a-b-c+a*b" in output
+    assert "if not (a>b and b>c) or (a<b or b<c) and a==c:" in output
+
+AST_PROGRAM = """algoritmo "Ast"
+var i, total: inteiro
+nome: string
+inicio
+total <- 0
+para i de 1 ate 4 faca
+    se nao (i = 2) e (i < 4 ou total > 100) entao
+        total <- total + i * (i - 1)
+    senao
+        escreva("pulou")
+    fim_se
+fim_para
+enquanto total > 10 faca
+    total <- total - 3
+fimenquanto
+nome <- "fim"
+escreva(total)
+escreva(nome)
+fimalgoritmo"""
+
+def lex_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return all_lexemes
+
+def test_gen_python_ast_matches_text_backend():
+    lexemes = lex_snippet(AST_PROGRAM)
+    tree = PythonAstGenerator(lexemes).generate()
+    expected = ast.parse(CodeGenerator(lexemes).generate())
+
+    assert ast.dump(tree) == ast.dump(expected)
+
+def test_gen_python_ast_runs_in_memory():
+    code = PythonAstGenerator(lex_snippet(AST_PROGRAM)).compile()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {'__name__': '__main__'})
+
+    assert output.getvalue().split() == ["pulou", "pulou", "6", "fim"]
+
+def test_gen_python_ast_keeps_portugol_lines():
+    tree = PythonAstGenerator(lex_snippet(AST_PROGRAM)).generate()
+    main = next(node for node in tree.body if isinstance(node, ast.FunctionDef))
+
+    # Variables at their declarations, the print alias at the program header
+    assert [statement.lineno for statement in main.body] == [2, 2, 3, 1, 5, 6, 13, 16, 17, 18]
 
 def test_gen_plugin_import():
     code = """algoritmo "Plugin"
@@ -156,3 +240,80 @@ def test_gen_plugin_import_ia():
     # Check that mapping is respected
     assert "from meupia_ia.plugin_ia import *" in output
     assert "except ImportError:" in output
+
+LAZY_PROGRAM = """algoritmo "Lazy"
+usar "lazyteste"
+var x: inteiro
+inicio
+leia(x)
+se x > 0 entao
+    escreva(lazy_dobro(x))
+fim_se
+fimalgoritmo"""
+
+@pytest.fixture
+def lazy_plugin(tmp_path, monkeypatch):
+    # A plugin that records when it is imported
+    (tmp_path / "meupia_lazyteste.py").write_text("import sys\nsys.lazy_imported = True\n\ndef lazy_dobro(x):\n    return 2 * x\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "meupia_lazyteste", raising=False)
+    monkeypatch.setattr(sys, "lazy_imported", False, raising=False)
+
+def run_with_input(code, text, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(text))
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {'__name__': '__main__'})
+    return output.getvalue()
+
+def test_gen_lazy_plugin_imports_on_first_call(lazy_plugin, monkeypatch):
+    code = CodeGenerator(lex_snippet(LAZY_PROGRAM), lazy_plugins=True).generate()
+    assert "from meupia_lazyteste import *" not in code
+    assert "lazy_dobro = _plugin_function('lazy_dobro')" in code
+
+    assert run_with_input(code, "0\n", monkeypatch) == ""
+    assert sys.lazy_imported is False
+    assert run_with_input(code, "21\n", monkeypatch) == "42\n"
+    assert sys.lazy_imported is True
+
+def test_gen_lazy_plugin_missing(monkeypatch):
+    code = CodeGenerator(lex_snippet(LAZY_PROGRAM.replace("lazyteste", "inexistente")), lazy_plugins=True).generate()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), pytest.raises(SystemExit):
+        exec(code, {'__name__': '__main__'})
+
+    assert "mpgp instale inexistente" in output.getvalue()
+
+def test_gen_lazy_plugin_python_ast_matches_text_backend():
+    lexemes = lex_snippet(LAZY_PROGRAM)
+    tree = PythonAstGenerator(lexemes, lazy_plugins=True).generate()
+    expected = ast.parse(CodeGenerator(lexemes, lazy_plugins=True).generate())
+
+    assert ast.dump(tree) == ast.dump(expected)
+
+CHAIN_PROGRAM = """algoritmo "Cadeia"
+var x, y: inteiro
+inicio
+x <- 1
+y <- """ + " + ".join(["x * 2 - 1"] * 250) + """
+se """ + " e ".join(["y > x"] * 250) + """ entao
+    escreva(y)
+fim_se
+fimalgoritmo"""
+
+@pytest.mark.parametrize("optimize", [0, 2])
+def test_gen_long_operator_chains(tmp_path, optimize):
+    # 250 operands are within the default nesting limit, and neither the
+    # analysis nor the backends recurse once per operator
+    source = tmp_path / "cadeia.por"
+    source.write_text(CHAIN_PROGRAM, encoding="utf-8")
+
+    for backend in (compiler.BACKEND_TEXT, compiler.BACKEND_MEMORY):
+        result = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum", backend=backend,
+                               optimize=optimize)
+        assert result.success, result.diagnostics
+        code = result.code if result.code is not None else compile(result.source, "cadeia.py", "exec")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exec(code, {'__name__': '__main__'})
+        assert output.getvalue() == "250\n"
@@ -0,0 +1,103 @@
+import contextlib
+import io
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.syntax_analyzer import Parser
+from meuPia.ir.cfg import Branch, Move, Print, Return, Var, lower
+from meuPia.ir.dataflow import liveness, reaching_definitions, remove_dead_stores
+from meuPia.ir.python_emitter import PythonEmitter
+
+LOOP_PROGRAM = """algoritmo "Laco"
+var i, n, total, lixo: inteiro
+inicio
+n <- 4
+total <- 0
+lixo <- n * 3
+para i de 1 ate n faca
+    se i = 2 ou nao (i < 4) entao
+        total <- total + i
+    senao
+        escreva(i)
+    fim_se
+fim_para
+enquanto total > 2 faca
+    total <- total - 2
+fimenquanto
+escreva(total)
+fimalgoritmo"""
+
+def parse_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return Parser(all_lexemes).parse()
+
+def run_python(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(code, '<ir>', 'exec'), {'__name__': '__main__'})
+    return output.getvalue()
+
+def test_ir_lowers_conditions_to_branches():
+    cfg = lower(parse_snippet(LOOP_PROGRAM))
+
+    terminators = [block.terminator for block in cfg.blocks]
+    assert all(terminator is not None for terminator in terminators)
+    assert sum(isinstance(terminator, Return) for terminator in terminators) == 1
+    # para header, `ou` (two branches) and enquanto header
+    assert sum(isinstance(terminator, Branch) for terminator in terminators) == 4
+    # Each edge points at a block of the graph
+    assert all(0 <= successor < len(cfg.blocks) for block in cfg.blocks for successor in block.successors)
+
+def test_ir_emitter_matches_code_generator():
+    program = parse_snippet(LOOP_PROGRAM)
+    expected = run_python(CodeGenerator(parse_snippet(LOOP_PROGRAM)).generate())
+
+    assert run_python(PythonEmitter(lower(program)).generate()) == expected == "1\n3\n2\n"
+
+def test_ir_liveness_and_reaching_definitions():
+    cfg = lower(parse_snippet(LOOP_PROGRAM))
+    live_in, live_out = liveness(cfg)
+    reach_in, _ = reaching_definitions(cfg)
+
+    # total is read by the loops, lixo never is
+    assert Var("total") in live_out[cfg.entry]
+    assert Var("lixo") not in live_out[cfg.entry]
+    assert not live_in[cfg.entry] - {Var("i"), Var("n"), Var("total"), Var("lixo")}
+
+    # The enquanto header is reached both by `total <- 0` and by the loop body
+    header = next(block for block in cfg.blocks
+                  if isinstance(block.terminator, Branch) and "total" in str(block.instructions))
+    total_definitions = {definition for definition in reach_in[header.index] if definition.location == Var("total")}
+    assert len(total_definitions) >= 2
+
+def test_ir_removes_dead_stores():
+    cfg = lower(parse_snippet(LOOP_PROGRAM))
+    assert remove_dead_stores(cfg) >= 2 # lixo <- n * 3 and its temporary
+
+    stores = [instruction.dest for block in cfg.blocks for instruction in block.instructions
+              if isinstance(instruction, Move)]
+    assert Var("lixo") not in stores
+    assert any(isinstance(instruction, Print) for block in cfg.blocks for instruction in block.instructions)
+    assert run_python(PythonEmitter(cfg).generate()) == "1\n3\n2\n"
+
+def test_ir_lowers_long_chains():
+    # Flat chains are lowered in a loop, not one Python call per operator
+    program = "\n".join([
+        'algoritmo "Cadeia"',
+        'var x, y: inteiro',
+        'inicio',
+        'x <- 1',
+        'y <- ' + ' + '.join(['x * 2 - 1'] * 250),
+        'se ' + ' e '.join(['y > x'] * 250) + ' entao',
+        '    escreva(y)',
+        'fim_se',
+        'enquanto ' + ' ou '.join(['y < x'] * 250) + ' ou x < 3 faca',
+        '    x <- x + 1',
+        'fimenquanto',
+        'escreva(x)',
+        'fimalgoritmo',
+    ])
+    expected = run_python(CodeGenerator(parse_snippet(program)).generate())
+
+    assert run_python(PythonEmitter(lower(parse_snippet(program))).generate()) == expected == "250\n3\n"
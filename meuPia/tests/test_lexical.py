@@ -1,6 +1,8 @@
 import pytest
-from meuPia.analyzers.lexical_analyzer import scan_line, LexicalError
-from meuPia.utils.token_enum import TokenEnum
+from meuPia.analyzers.lexical_analyzer import scan_line, iter_tokens, scan_lines_parallel, LexicalError, ENGINE_TABLE, ENGINE_MATCHERS
+from meuPia.utils.file_helper import LineIndex
+from meuPia.utils.token import Token
+from meuPia.utils.token_enum import TokenEnum, TokenKind
 
 def test_scan_keywords():
     line = "para de ate faca se senao"
@@ -80,3 +82,99 @@ def test_scan_operators():
 def test_invalid_char():
     with pytest.raises(LexicalError):
         scan_line("var $ x", 1)
+
+@pytest.mark.parametrize("line", [
+    'algoritmo "Teste" // comentario',
+    'var idade1, idade2: inteiro',
+    'media <- (a + b + c) / 3',
+    'se x >= 10 e y <> 2 ou nao (z <= 1) entao',
+    'SE Senão FIM_SE Até Então',
+    'se_x e_y fim_se_z fim_sex _tmp __',
+    'para i de 1 ate 10 passo 2 faca',
+    'x <- 12_ 3abc',
+    'escreva("aspas \\" escapadas", "")',
+    'v[i] <- a[i] * k + b[i]\n',
+    '\tcadeia string até não faça\n',
+    'x <- 23EE + 1',
+    'se_x <- 1a_b2 + ½y ; 12_ "fim',
+])
+def test_table_engine_matches_matchers(line):
+    def scan(engine):
+        try:
+            return scan_line(line, 7, engine)
+        except LexicalError as e:
+            return str(e)
+
+    def recover(engine):
+        errors = []
+        return scan_line(line, 7, engine, errors), [(error.message, error.line, error.col) for error in errors]
+
+    assert scan(ENGINE_TABLE) == scan(ENGINE_MATCHERS)
+    # In recovery mode a bad word is one error, and none of it becomes a token
+    assert recover(ENGINE_TABLE) == recover(ENGINE_MATCHERS)
+
+@pytest.mark.parametrize("line", ['x <- 3abc', 'escreva("aberta', 'x ½', 'a ; b'])
+def test_table_engine_errors_match_matchers(line):
+    with pytest.raises(LexicalError) as table_error:
+        scan_line(line, 3, ENGINE_TABLE)
+    with pytest.raises(LexicalError) as matchers_error:
+        scan_line(line, 3, ENGINE_MATCHERS)
+
+    assert str(table_error.value) == str(matchers_error.value)
+
+def test_iter_tokens_streams_file(tmp_path):
+    source = tmp_path / "prog.por"
+    source.write_text('algoritmo "S"\nvar x: inteiro\ninicio\n  x <- 1\nfimalgoritmo\n', encoding='utf-8')
+
+    line_index = LineIndex(str(source))
+    tokens = iter_tokens(str(source), line_index=line_index)
+
+    first = next(tokens)
+    assert first['token'] == TokenEnum.ALGORITMO.name
+    assert len(line_index) == 1  # Only the first line has been read so far
+
+    rest = list(tokens)
+    assert rest[-1]['code_index'] == '5:1'
+    assert line_index.line_text(4) == '  x <- 1'
+
+def test_compact_tokens():
+    _, tokens = scan_line('contador <- contador + 1', 4)
+
+    assert tokens[0].kind == TokenKind.ID
+    assert (tokens[0].line, tokens[0].col) == (4, 1)
+    assert tokens[0].lexeme is tokens[2].lexeme  # Interned lexemes
+    assert tokens[3].to_dict() == {'token': 'OPMAIS', 'lexeme': '+', 'code_index': '4:22'}
+    assert tokens[3] == {'token': 'OPMAIS', 'lexeme': '+', 'code_index': '4:22'}
+    assert Token.from_dict(tokens[3].to_dict()) == tokens[3]
+
+def test_parallel_scan_matches_sequential():
+    lines = ['algoritmo "P"\n', 'var x: inteiro\n', 'inicio\n'] + ['  x <- x + 1 // soma\n'] * 50 + ['fimalgoritmo\n']
+    (new_lines, tokens) = scan_lines_parallel(lines, workers=2, chunk_lines=7)
+
+    expected = [scan_line(line, i+1) for i, line in enumerate(lines)]
+    assert new_lines == [new_line for (new_line, _) in expected]
+    assert tokens == [token for (_, line_tokens) in expected for token in line_tokens]
+
+def test_parallel_scan_reports_first_error():
+    lines = ['x <- 1\n'] * 10 + ['x <- $\n'] + ['x <- 1\n'] * 10 + ['y <- ;\n']
+    with pytest.raises(LexicalError) as excinfo:
+        scan_lines_parallel(lines, workers=2, chunk_lines=4)
+    assert 'line 11:6' in str(excinfo.value)
+
+@pytest.mark.parametrize('engine', [ENGINE_TABLE, ENGINE_MATCHERS])
+def test_lexical_recovery_collects_errors(engine):
+    errors = []
+    (_, tokens) = scan_line('x <- 1 $ 2 # "fim', 1, engine, errors)
+
+    assert [token.lexeme for token in tokens] == ['x', '<-', '1', '2']
+    assert [(error.phase, error.line, error.col) for error in errors] == [
+        ('lexico', 1, 8), ('lexico', 1, 12), ('lexico', 1, 14)
+    ]
+    assert errors[0].message == 'Unknown char "$" at line 1:8'
+    assert errors[2].message.startswith('Unterminated string')
+
+    # A bad word is reported once and skipped whole
+    errors = []
+    (_, tokens) = scan_line('x <- 23EE + 1', 1, engine, errors)
+    assert [token.lexeme for token in tokens] == ['x', '<-', '+', '1']
+    assert [error.message for error in errors] == ['Unknown char "2" at line 1:6']
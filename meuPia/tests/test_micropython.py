@@ -0,0 +1,74 @@
+import ast
+import contextlib
+import io
+import shutil
+import subprocess
+import pytest
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.micropython_generator import MicroPythonGenerator, constant_variables
+from meuPia.analyzers.syntax_analyzer import Parser
+
+MICRO_PROGRAM = """algoritmo "Pisca"
+var i, n, atraso, total, tarde: inteiro
+nome: cadeia
+inicio
+escreva(tarde)
+n <- 10
+atraso <- 250
+tarde <- 5
+total <- 0
+para i de 1 ate n faca
+    total <- total + atraso * i
+    escreva(total)
+fim_para
+nome <- "fim"
+escreva(nome)
+fimalgoritmo"""
+
+def parse_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return Parser(all_lexemes).parse()
+
+def run_python(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(code, '<micro>', 'exec'), {'__name__': '__main__'})
+    return output.getvalue()
+
+def test_micropython_constants():
+    # tarde is read before its assignment, total and i change
+    assert list(constant_variables(parse_snippet(MICRO_PROGRAM))) == ["n", "atraso"]
+
+def test_micropython_skips_cpython_boilerplate():
+    code = MicroPythonGenerator(parse_snippet(MICRO_PROGRAM)).generate()
+    ast.parse(code)
+
+    lines = code.split('\n')
+    assert "import sys" not in lines
+    assert "if __name__ == '__main__':" not in lines
+    assert lines[-1] == "main()"
+    assert "_atraso = const(250)" in lines
+    assert "        total = total+_atraso*i" in lines
+    # The constant's assignment and local are gone
+    assert "    atraso = 0" not in lines
+    assert "    n = 10" not in lines
+    assert "@micropython.native" not in lines
+
+def test_micropython_plugins_and_native():
+    code = MicroPythonGenerator(parse_snippet(MICRO_PROGRAM.replace('var', 'usar "maker"\nvar', 1)), native=True).generate()
+    ast.parse(code)
+
+    assert code.startswith("from meupia_maker.plugin_iot import *\n")
+    assert "except ImportError:" not in code
+    assert "@micropython.native\ndef main():" in code
+
+@pytest.mark.skipif(shutil.which("micropython") is None, reason="MicroPython Unix port not installed")
+def test_micropython_runs_like_cpython():
+    expected = run_python(CodeGenerator(parse_snippet(MICRO_PROGRAM)).generate())
+    for native in (False, True):
+        code = MicroPythonGenerator(parse_snippet(MICRO_PROGRAM), native=native).generate()
+        completed = subprocess.run(["micropython", "-c", code], capture_output=True, text=True)
+        assert completed.stdout == expected
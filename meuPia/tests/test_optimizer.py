@@ -0,0 +1,94 @@
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.optimizer import OPTIMIZE_BASIC, OPTIMIZE_FULL, OPTIMIZE_NONE, Optimizer
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer
+from meuPia.analyzers.syntax_analyzer import Parser
+
+def optimize_snippet(portugol_code, level):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+
+    program = Parser(all_lexemes).parse()
+    semantic = SemanticAnalyzer(program)
+    semantic.validate()
+    program = Optimizer(program, level).optimize()
+    return CodeGenerator(program, semantic.symbols).generate()
+
+def test_optimizer_folds_constants():
+    code = """algoritmo "Fold"
+    var x: inteiro
+    s: string
+    inicio
+    x <- 2 * 3 + (4 - 1) * x
+    s <- "meu" + "Pia"
+    escreva(x / (2 * 2))
+    fimalgoritmo"""
+
+    output = optimize_snippet(code, OPTIMIZE_BASIC)
+    assert "x = 6+3*x" in output
+    assert "s = 'meuPia'" in output
+    # Division is never folded
+    assert "print(x/4)" in output
+
+def test_optimizer_drops_dead_branches():
+    code = """algoritmo "Dead"
+    var x, i: inteiro
+    inicio
+    se 1 = 1 entao
+        x <- 1
+    senao
+        x <- 2
+    fim_se
+    se nao ("a" <> "a") e 2 > 3 entao
+        escreva("nunca")
+    fim_se
+    enquanto 0 > 1 faca
+        escreva("nunca")
+    fimenquanto
+    para i de 5 ate 1 faca
+        escreva("nunca")
+    fim_para
+    se x > 0 entao
+        escreva(x)
+    fim_se
+    fimalgoritmo"""
+
+    output = optimize_snippet(code, OPTIMIZE_BASIC)
+    assert "x = 1" in output
+    assert "x = 2" not in output
+    assert "nunca" not in output
+    assert "if x>0:" in output
+
+def test_optimizer_removes_unused_variables():
+    code = """algoritmo "Unused"
+    var x, y, z, n: inteiro
+    inicio
+    leia(n)
+    x <- n + 1
+    y <- x * 2
+    z <- f(n)
+    escreva(n)
+    fimalgoritmo"""
+
+    basic = optimize_snippet(code, OPTIMIZE_BASIC)
+    assert "y = x*2" in basic
+
+    output = optimize_snippet(code, OPTIMIZE_FULL)
+    # y is never read, and once it is gone neither is x
+    assert "y = " not in output
+    assert "x = " not in output
+    # Calls may have effects: z stays
+    assert "z = f(n)" in output
+    assert "n = int(input())" in output
+
+def test_optimizer_level_zero_keeps_program():
+    code = """algoritmo "Zero"
+    var x: inteiro
+    inicio
+    se 1 = 1 entao
+        x <- 2 * 3
+    fim_se
+    fimalgoritmo"""
+
+    assert "x = 2*3" in optimize_snippet(code, OPTIMIZE_NONE)
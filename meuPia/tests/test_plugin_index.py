@@ -0,0 +1,115 @@
+import json
+import sys
+import pytest
+from meuPia import compiler
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.diagnostics import PHASE_SEMANTIC
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer, SemanticError
+from meuPia.utils.cache import ContentCache
+from meuPia.utils.plugin_index import PluginIndex, PluginInfo, PluginManifestError
+
+PROGRAM = """algoritmo "Manifesto"
+usar "teste"
+var x: inteiro
+inicio
+x <- tst_dobro(21)
+escreva(x)
+tst_log("pronto", x)
+fimalgoritmo
+"""
+
+MANIFEST = {"modulo": "meupia_pacote_teste.funcoes", "funcoes": {"tst_dobro": 1, "tst_log": [1, None], "tst_nunca": 0}}
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    # An installed plugin: its package, manifest and entry point
+    package = tmp_path / "site" / "meupia_pacote_teste"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "funcoes.py").write_text(
+        "def tst_dobro(x):\n    return 2 * x\n\n"
+        "def tst_log(*args):\n    print(*args)\n\n"
+        "def tst_nunca():\n    pass\n\n"
+        "def _interno():\n    pass\n"
+    )
+    (package / "meupia_plugin.json").write_text(json.dumps(MANIFEST))
+    dist_info = tmp_path / "site" / "meupia_pacote_teste-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: meupia-pacote-teste\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text("[meupia.plugins]\nteste = meupia_pacote_teste.funcoes\n")
+
+    monkeypatch.syspath_prepend(str(tmp_path / "site"))
+    for module in ("meupia_pacote_teste", "meupia_pacote_teste.funcoes"):
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    return package
+
+def lex(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return all_lexemes
+
+def test_index_reads_entry_point_and_manifest(plugin):
+    info = PluginIndex().lookup("teste")
+
+    assert info.module == "meupia_pacote_teste.funcoes"
+    assert info.functions == {"tst_dobro": (1, 1), "tst_log": (1, None), "tst_nunca": (0, 0)}
+    # Nothing of the plugin ran
+    assert "meupia_pacote_teste" not in sys.modules
+
+    # Bundled defaults and unknown plugins keep the import *
+    assert PluginIndex().lookup("ia") == PluginInfo("ia", "meupia_ia.plugin_ia")
+    assert PluginIndex().lookup("nada").import_line(["f"]) == "from meupia_nada import *"
+
+def test_index_is_kept_in_the_cache(plugin, tmp_path):
+    cache = ContentCache(str(tmp_path / "cache"))
+    first = PluginIndex(cache).lookup("teste")
+
+    index = PluginIndex(cache)
+    assert index.lookup("teste") == first
+    assert index.entry_points is None # Answered by the stored index
+
+    manifest = plugin / "meupia_plugin.json"
+    manifest.write_text(json.dumps({"funcoes": {"tst_dobro": 1}}) + "\n")
+    index = PluginIndex(cache)
+    assert index.lookup("teste").functions == {"tst_dobro": (1, 1)}
+    assert index.entry_points is not None
+
+    manifest.write_text('{"funcoes": {"tst_dobro": -1}}')
+    with pytest.raises(PluginManifestError):
+        PluginIndex(cache).lookup("teste")
+
+def test_semantic_checks_calls_against_manifests(plugin):
+    plugins = PluginIndex().plugins(["teste"])
+    SemanticAnalyzer(lex(PROGRAM), plugins=plugins).validate()
+
+    with pytest.raises(SemanticError, match='Unknown function "tst_dobre" called at line 5:6'):
+        SemanticAnalyzer(lex(PROGRAM.replace("tst_dobro", "tst_dobre")), plugins=plugins).validate()
+
+    errors = []
+    code = PROGRAM.replace("tst_dobro(21)", "tst_dobro(21, 1)").replace('tst_log("pronto", x)', "tst_log()")
+    SemanticAnalyzer(lex(code), errors=errors, plugins=plugins).validate()
+    assert [error.message for error in errors] == [
+        'Function "tst_dobro" expects 1 argument(s), got 2 at line 5:6.',
+        'Function "tst_log" expects at least 1 argument(s), got 0 at line 7:1.',
+    ]
+
+    # A plugin without manifest may define any name through its import *
+    plugins["outro"] = PluginInfo("outro", "meupia_outro")
+    SemanticAnalyzer(lex(PROGRAM.replace("tst_dobro", "tst_dobre")), plugins=plugins).validate()
+
+def test_generator_imports_called_functions(plugin, capsys):
+    code = CodeGenerator(lex(PROGRAM), plugin_infos=PluginIndex().plugins(["teste"])).generate()
+
+    assert "    from meupia_pacote_teste.funcoes import tst_dobro, tst_log" in code.split("\n")
+    exec(compile(code, "<manifesto>", "exec"), {"__name__": "__main__"})
+    assert capsys.readouterr().out == "42\npronto 42\n"
+
+def test_compiler_rejects_unknown_plugin_function(plugin, tmp_path):
+    source = tmp_path / "manifesto.por"
+    source.write_text(PROGRAM.replace("tst_log", "tst_lgo"), encoding="utf-8")
+
+    result = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum", recover=True)
+    assert not result.success
+    assert [(error.phase, error.line) for error in result.diagnostics] == [(PHASE_SEMANTIC, 7)]
@@ -0,0 +1,65 @@
+import contextlib
+import io
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.python_ast_generator import PythonAstGenerator
+from meuPia.analyzers.syntax_analyzer import Parser
+from meuPia.utils.profiler import LineProfiler
+
+PROFILE_PROGRAM = """algoritmo "Perfil"
+var i, j, total: inteiro
+inicio
+total <- 0
+para i de 1 ate 3 faca
+    para j de 1 ate 4 faca
+        total <- total + i * j
+    fim_para
+fim_para
+escreva(total)
+fimalgoritmo"""
+
+def parse_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return Parser(all_lexemes).parse()
+
+def profile(code, source_map=None):
+    profiler = LineProfiler(code.co_filename, source_map)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        profiler.run(code, {'__name__': '__main__'})
+    assert output.getvalue() == "60\n"
+    return profiler
+
+def test_profiler_source_map_points_at_portugol_lines():
+    generator = CodeGenerator(parse_snippet(PROFILE_PROGRAM))
+    python_lines = generator.generate().split('\n')
+
+    assert len(generator.source_map) == len(python_lines)
+    mapped = {line.strip(): generator.source_map[number] for number, line in enumerate(python_lines)}
+    assert mapped["total = total+i*j"] == 7
+    assert mapped["for j in _range(1, 4 + 1, 1):"] == 6
+    assert mapped["j = 0"] == 2
+    assert mapped["import sys"] is None
+
+def test_profiler_counts_portugol_lines():
+    generator = CodeGenerator(parse_snippet(PROFILE_PROGRAM))
+    code = compile(generator.generate(), '<perfil>', 'exec')
+    stats = {entry.line: entry.hits for entry in profile(code, generator.source_map).stats()}
+
+    # A for line runs once more than its body, to leave the loop
+    assert stats[5] == 4
+    assert stats[6] == 3 * 5
+    assert stats[7] == 12
+    assert stats[10] == 1
+
+def test_profiler_matches_between_backends():
+    generator = CodeGenerator(parse_snippet(PROFILE_PROGRAM))
+    text = profile(compile(generator.generate(), '<perfil>', 'exec'), generator.source_map)
+    tree = profile(PythonAstGenerator(parse_snippet(PROFILE_PROGRAM)).compile('<perfil>'))
+
+    assert [entry[:2] for entry in text.stats()] == [entry[:2] for entry in tree.stats()]
+    report = tree.report(PROFILE_PROGRAM.split('\n'), top=1)
+    assert "[PERFIL] 1 linha(s) mais lenta(s)" in report
+    assert "total <- total + i * j" in report
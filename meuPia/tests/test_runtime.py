@@ -0,0 +1,89 @@
+import ast
+import contextlib
+import io
+import sys
+import pytest
+from meuPia import runtime
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.python_ast_generator import PythonAstGenerator
+
+IO_PROGRAM = """algoritmo "Soma"
+var n, i, x, total: inteiro
+nome: cadeia
+inicio
+leia(n)
+total <- 0
+para i de 1 ate n faca
+    leia(x)
+    total <- total + x
+    escreva(total)
+fim_para
+leia(nome)
+escreva(nome)
+fimalgoritmo"""
+
+class Terminal(io.BytesIO):
+    # stdin of an interactive session: records what was written before each line read
+    def __init__(self, data, output):
+        super().__init__(data)
+        self.output = output
+        self.seen = []
+
+    def isatty(self):
+        return True
+
+    def readline(self, *args):
+        self.seen.append(self.output.getvalue())
+        return super().readline(*args)
+
+def lex_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return all_lexemes
+
+def run_python(code, stdin, monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {'__name__': '__main__'})
+    return output.getvalue()
+
+def stdin_bytes(data):
+    return io.TextIOWrapper(io.BytesIO(data))
+
+def test_runtime_matches_input_and_print(monkeypatch):
+    data = b"3\n10\n20\r\n30\nAna Maria\n"
+    expected = run_python(CodeGenerator(lex_snippet(IO_PROGRAM)).generate(), stdin_bytes(data), monkeypatch)
+    code = CodeGenerator(lex_snippet(IO_PROGRAM), fast_io=True).generate()
+
+    assert "from meuPia.runtime import descarrega as _descarrega" in code
+    assert "        x = _leia_inteiro()" in code
+    assert "print(" not in code and "input(" not in code
+    assert run_python(code, stdin_bytes(data), monkeypatch) == expected == "10\n30\n60\nAna Maria\n"
+
+def test_runtime_reads_numbers_sharing_a_line(monkeypatch):
+    code = CodeGenerator(lex_snippet(IO_PROGRAM), fast_io=True).generate()
+    assert run_python(code, stdin_bytes(b"3 10  20\n30\n Ana\n"), monkeypatch) == "10\n30\n60\n Ana\n"
+
+    with pytest.raises(EOFError):
+        run_python(code, stdin_bytes(b"3 10 20"), monkeypatch)
+
+def test_runtime_python_ast_matches_text_backend():
+    tree = PythonAstGenerator(lex_snippet(IO_PROGRAM), fast_io=True).generate()
+    expected = ast.parse(CodeGenerator(lex_snippet(IO_PROGRAM), fast_io=True).generate())
+
+    assert ast.dump(tree) == ast.dump(expected)
+
+def test_runtime_flushes_before_reading_a_terminal(monkeypatch):
+    output = io.StringIO()
+    terminal = Terminal(b"2\n5\n7\nfim\n", output)
+    monkeypatch.setattr(sys, 'stdin', terminal)
+    with contextlib.redirect_stdout(output):
+        exec(CodeGenerator(lex_snippet(IO_PROGRAM), fast_io=True).generate(), {'__name__': '__main__'})
+
+    # One line per leia, each after the previous escreva was written
+    assert terminal.seen == ["", "", "5\n", "5\n12\n"]
+    assert output.getvalue() == "5\n12\nfim\n"
+    assert not runtime._output
@@ -1,4 +1,6 @@
 import pytest
+from meuPia import compiler
+from meuPia.analyzers.diagnostics import PHASE_SYNTAX
 from meuPia.analyzers.semantic_analyzer import SemanticAnalyzer, SemanticError
 from meuPia.analyzers.lexical_analyzer import scan_line
 
@@ -61,3 +63,68 @@ def test_semantic_bypass_function_call():
     lexemes = mock_lexemes(code)
     semantic = SemanticAnalyzer(lexemes)
     semantic.validate() # Should pass
+
+def test_semantic_calls_without_plugins_are_not_checked():
+    # No `usar`: nothing to check calls against, as before plugin manifests
+    code = [
+        'algoritmo "Func"',
+        'inicio',
+        '   ia_definir_dados()',
+        'fimalgoritmo'
+    ]
+    semantic = SemanticAnalyzer(mock_lexemes(code), plugins={})
+    semantic.validate() # Should pass
+    assert not semantic.closed_plugins
+
+def test_semantic_recovery_collects_errors():
+    code = [
+        'algoritmo "Many"',
+        'var x, x: inteiro',
+        'inicio',
+        '   y <- x',
+        '   escreva(z)',
+        '   y <- z',
+        'fimalgoritmo'
+    ]
+    errors = []
+    semantic = SemanticAnalyzer(mock_lexemes(code), errors=errors)
+    semantic.validate()
+
+    # Each undeclared variable is reported once, at its first use
+    assert [error.message for error in errors] == [
+        'Double declaration for variable "x" at line 2:8',
+        'Undeclared variable "y" used at line 4:4.',
+        'Undeclared variable "z" used at line 5:12.',
+    ]
+    assert [(error.line, error.col) for error in errors] == [(2, 8), (4, 4), (5, 12)]
+
+def test_semantic_recovery_after_unparsable_header(tmp_path):
+    # The parser gives up on the header; only its diagnostic is reported
+    source = tmp_path / "cabecalho.por"
+    source.write_text('algoritmo P\ninicio\nfimalgoritmo\n', encoding='utf-8')
+    result = compiler.main(str(source), str(tmp_path / "out"), artifacts="nenhum", recover=True)
+
+    assert [(error.phase, error.line, error.col) for error in result.diagnostics] == [(PHASE_SYNTAX, 1, 11)]
+
+def test_semantic_builds_symbol_table():
+    code = [
+        'algoritmo "Symbols"',
+        'usar "ia"',
+        'var n : inteiro',
+        '    nome, m : cadeia',
+        'inicio',
+        '   m <- [[1, 2], [3, 4]]',
+        '   n <- ia_prever(m[0][1])',
+        'fimalgoritmo'
+    ]
+    semantic = SemanticAnalyzer(mock_lexemes(code))
+    semantic.validate()
+    symbols = semantic.symbols
+
+    assert [(symbol.name, symbol.type_name) for symbol in symbols.variables()] == [
+        ('n', 'inteiro'), ('nome', 'cadeia'), ('m', 'cadeia')
+    ]
+    assert symbols.lookup('nome').code_index == '4:5'
+    assert symbols.lookup('m').is_array and not symbols.lookup('n').is_array
+    assert [(symbol.name, symbol.kind) for symbol in symbols.functions()] == [('ia_prever', 'funcao')]
+    assert symbols.lookup('x') is None
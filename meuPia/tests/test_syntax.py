@@ -1,6 +1,9 @@
 import pytest
-from meuPia.analyzers.syntax_analyzer import Parser, SyntacticError
+from meuPia.analyzers import grammar
+from meuPia.analyzers.syntax_analyzer import Parser, RecursiveDescentParser, SyntacticError
 from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.ast_nodes import Assign, BinOp, Group, Index, Name, Not, Number, Program
+from meuPia.utils.token_enum import TokenKind
 
 def mock_lexemes(code_lines):
     all_lexemes = []
@@ -103,3 +106,263 @@ def test_syntax_complex_arrays():
     lexemes = mock_lexemes(code)
     parser = Parser(lexemes)
     parser.parse()
+
+def test_syntax_error_stops_pulling_tokens():
+    code = [
+        'algoritmo "Stream"',
+        'inicio',
+        '   se x > 10', # Missing entao
+        '       escreva("Erro")',
+        '   fim_se',
+    ] + ['   escreva("resto")'] * 1000 + ['fimalgoritmo']
+    pulled = []
+
+    def lazy_tokens():
+        for token in mock_lexemes(code):
+            pulled.append(token)
+            yield token
+
+    parser = Parser(lazy_tokens())
+    with pytest.raises(SyntacticError):
+        parser.parse()
+    assert len(pulled) < 20
+
+def test_syntax_builds_ast():
+    code = [
+        'algoritmo "AST"',
+        'var x, y : inteiro',
+        'inicio',
+        '   x <- 1 + 2 * y',
+        'fimalgoritmo'
+    ]
+    program = Parser(mock_lexemes(code)).parse()
+
+    assert isinstance(program, Program)
+    assert program.name == '"AST"'
+    assert [name.id for name in program.declarations[0].names] == ['x', 'y']
+    assert program.declarations[0].type_name == 'inteiro'
+
+    assign = program.body[0]
+    assert isinstance(assign, Assign)
+    assert (assign.line, assign.col) == (4, 4)
+    # * binds tighter than +
+    assert assign.value == BinOp(4, 9, Number(4, 9, '1'), TokenKind.OPMAIS,
+                                 BinOp(4, 13, Number(4, 13, '2'), TokenKind.OPMULTI, Name(4, 17, 'y')))
+
+def test_syntax_logic_ast():
+    code = [
+        'algoritmo "Logic"',
+        'var x : inteiro',
+        'inicio',
+        '   se x > 0 ou nao (x = 1) e x < 5 entao',
+        '   fim_se',
+        'fimalgoritmo'
+    ]
+    condition = Parser(mock_lexemes(code)).parse().body[0].condition
+
+    # e binds tighter than ou
+    assert condition.op == TokenKind.OU
+    assert condition.right.op == TokenKind.E
+    assert isinstance(condition.right.left, Not)
+    assert isinstance(condition.right.left.operand, Group)
+
+def test_syntax_indexed_assignment():
+    code = [
+        'algoritmo "Index"',
+        'var m, i : inteiro',
+        'inicio',
+        '   m[i][1] <- m[0][i] + 1',
+        'fimalgoritmo'
+    ]
+    lexemes = mock_lexemes(code)
+    assign = Parser(lexemes).parse().body[0]
+
+    # m[i][1] is (m[i])[1], as in an expression
+    assert isinstance(assign, Assign)
+    assert isinstance(assign.target, Index)
+    assert assign.target.index == Number(4, 9, '1')
+    assert assign.target.value == Index(4, 4, Name(4, 4, 'm'), Name(4, 6, 'i'))
+    assert RecursiveDescentParser(lexemes).parse().body[0] == assign
+
+def nested_parens(depth):
+    return [
+        'algoritmo "Deep"',
+        'var x : inteiro',
+        'inicio',
+        '   x <- ' + '(' * depth + 'x' + ')' * depth,
+        'fimalgoritmo'
+    ]
+
+def test_syntax_deep_nesting_without_recursion_error():
+    # Far beyond Python's recursion limit when parsed recursively
+    lexemes = mock_lexemes(nested_parens(5000))
+    program = Parser(lexemes, max_depth=None).parse()
+
+    value = program.body[0].value
+    for _ in range(5000):
+        value = value.expr
+    assert value == Name(4, 5009, 'x')
+
+def test_syntax_max_depth():
+    code = ['algoritmo "Blocks"', 'var x : inteiro', 'inicio']
+    code += ['   se x > 0 entao'] * 10 + ['   fim_se'] * 10 + ['fimalgoritmo']
+
+    Parser(mock_lexemes(code), max_depth=10).parse()
+    with pytest.raises(SyntacticError) as excinfo:
+        Parser(mock_lexemes(code), max_depth=9).parse()
+    assert 'limite de 9 níveis na linha 13:' in str(excinfo.value)
+
+    with pytest.raises(SyntacticError):
+        Parser(mock_lexemes(nested_parens(1000))).parse()
+
+def test_syntax_flat_chains_within_max_depth():
+    # Each precedence level counts once, however many operators it chains
+    code = [
+        'algoritmo "Chain"',
+        'var x : inteiro',
+        'inicio',
+        '   x <- ' + ' + '.join(['x * 2'] * 250),
+        '   se ' + ' e '.join(['x > 0'] * 250) + ' entao',
+        '   fim_se',
+        'fimalgoritmo'
+    ]
+    program = Parser(mock_lexemes(code), max_depth=2).parse()
+
+    value = program.body[0].value
+    for _ in range(249):
+        assert value.op == TokenKind.OPMAIS and value.right.op == TokenKind.OPMULTI
+        value = value.left
+    assert value == BinOp(4, 9, Name(4, 9, 'x'), TokenKind.OPMULTI, Number(4, 13, '2'))
+
+    with pytest.raises(SyntacticError):
+        Parser(mock_lexemes(code), max_depth=1).parse()
+
+def test_syntax_max_tokens():
+    code = [
+        'algoritmo "Tokens"',
+        'var x : inteiro',
+        'inicio',
+        '   x <- 1',
+        'fimalgoritmo'
+    ]
+    lexemes = mock_lexemes(code)
+
+    Parser(lexemes, max_tokens=len(lexemes)).parse()
+    with pytest.raises(SyntacticError) as excinfo:
+        Parser(lexemes, max_tokens=5).parse()
+    assert 'limite de 5 tokens' in str(excinfo.value)
+
+def test_syntax_recovery_collects_errors():
+    code = [
+        'algoritmo "Recover"',
+        'var x inteiro',      # Missing ':'
+        '    y : inteiro',
+        'inicio',
+        '   y <- 1 +',        # Missing operand
+        '   escreva(y)',
+        '   se y entao',      # Missing comparison
+        '       escreva(y)',
+        '   fim_se',
+        '   fimenquanto',     # Stray block end
+        '   y <- 2',
+        'fimalgoritmo'
+    ]
+    errors = []
+    program = Parser(mock_lexemes(code), errors=errors).parse()
+
+    assert [(error.phase, error.line) for error in errors] == [
+        ('sintatico', 2), ('sintatico', 6), ('sintatico', 7), ('sintatico', 10)
+    ]
+    assert errors[1].message == 'Esperado identificador ou valor na expressão, linha 6:4'
+    assert [name.id for name in program.declarations[0].names] == ['y']
+    assert [type(statement).__name__ for statement in program.body] == ['Escreva', 'Se', 'Assign']
+    assert program.body[1].condition is None
+    assert len(program.body[1].body) == 1
+
+def test_syntax_recovery_missing_block_end():
+    code = [
+        'algoritmo "Recover"',
+        'var x : inteiro',
+        'inicio',
+        '   enquanto x < 10 faca',
+        '       x <- x + 1',
+        'fimalgoritmo'
+    ]
+    errors = []
+    Parser(mock_lexemes(code), errors=errors).parse()
+
+    assert [error.message for error in errors] == [
+        'Esperado "fimenquanto", encontrado "fimalgoritmo" na linha 6:1'
+    ]
+
+def test_grammar_table_has_no_conflicts():
+    assert grammar.conflicts() == []
+
+PROGRAM = [
+    'algoritmo "Paridade"',
+    'usar "ia"',
+    'var a, b : inteiro',
+    '    s : cadeia',
+    'inicio',
+    '   leia(a)',
+    '   b <- a * 2 + 3 - a / 4',
+    '   se a > b e nao (b = 0) ou a <> 1 entao',
+    '       escreva(a)',
+    '   senao',
+    '       ia_treinar([[1, 2], []], f(b, a[1]))',
+    '   fim_se',
+    '   enquanto b >= 0 faca',
+    '       b <- b - 1',
+    '   fimenquanto',
+    '   para a de 1 ate b passo 2',
+    '       g()',
+    '   fim_para',
+    'fimalgoritmo',
+]
+
+@pytest.mark.parametrize("edit", [
+    None,
+    (1, 'usar ia'),
+    (3, '    s cadeia'),
+    (5, '   leia(5)'),
+    (6, '   b 2'),
+    (7, '   se a > b e entao'),
+    (10, '       ia_treinar(1 2)'),
+    (11, '   fim_para'),
+    (15, '   para a 1 ate b'),
+    (18, 'fimalgoritmo x'),
+    (18, ''),
+])
+def test_table_parser_matches_recursive_descent(edit):
+    code = list(PROGRAM)
+    if edit is not None:
+        code[edit[0]] = edit[1]
+    lexemes = mock_lexemes(code)
+
+    try:
+        expected = RecursiveDescentParser(lexemes).parse()
+    except SyntacticError as error:
+        with pytest.raises(SyntacticError) as excinfo:
+            Parser(lexemes).parse()
+        assert str(excinfo.value) == str(error)
+    else:
+        assert Parser(lexemes).parse() == expected
+
+def test_syntax_recovery_keeps_unclosed_block():
+    code = [
+        'algoritmo "Recover"',
+        'var x : inteiro',
+        'inicio',
+        '   se x > 1', # Missing entao
+        '       escreva(x)',
+        '   escreva(2)', # Missing fim_se
+        'fimalgoritmo'
+    ]
+    errors = []
+    program = Parser(mock_lexemes(code), errors=errors).parse()
+
+    assert [error.message for error in errors] == [
+        'Esperado "então", encontrado "escreva" na linha 5:8',
+        'Esperado "fim_se", encontrado "fimalgoritmo" na linha 7:1',
+    ]
+    assert [type(statement).__name__ for statement in program.body[0].body] == ['Escreva', 'Escreva']
@@ -0,0 +1,77 @@
+import pytest
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.token_buffer import TokenBuffer, TokenEdit
+
+SOURCE = (
+    'algoritmo "Editor"\n'
+    'var x, y: inteiro\n'
+    'inicio\n'
+    '   x <- 10\n'
+    '   y <- x + 1\n'
+    'fimalgoritmo\n'
+)
+
+def full_scan(text):
+    tokens = []
+    for i, line in enumerate(text.split('\n')):
+        tokens.extend(scan_line(line, i+1)[1])
+    return tokens
+
+def test_buffer_matches_full_scan():
+    buffer = TokenBuffer(SOURCE)
+    assert buffer.tokens() == full_scan(SOURCE)
+
+def test_edit_inside_line():
+    buffer = TokenBuffer(SOURCE)
+    # "x <- 10" -> "x <- 10 * y"
+    change = buffer.edit(4, 11, 4, 11, ' * y')
+
+    assert buffer.text() == SOURCE.replace('x <- 10', 'x <- 10 * y')
+    assert buffer.tokens() == full_scan(buffer.text())
+    assert change == TokenEdit(start=9, old_end=12, new_end=14)
+
+def test_edit_adding_lines_renumbers_following_tokens():
+    buffer = TokenBuffer(SOURCE)
+    buffer.edit(4, 1, 4, 1, '   escreva(x)\n   leia(y)\n')
+
+    assert buffer.tokens() == full_scan(buffer.text())
+    assert buffer.tokens()[-1].code_index == '8:1'
+
+def test_edit_joining_lines():
+    buffer = TokenBuffer(SOURCE)
+    change = buffer.edit(4, 11, 5, 4, ' ')
+
+    assert buffer.text() == SOURCE.replace('10\n   y', '10 y')
+    assert buffer.tokens() == full_scan(buffer.text())
+    assert change.old_end - change.start == 8
+    assert change.new_end - change.start == 8
+
+def test_edit_records_lexical_errors_per_line():
+    buffer = TokenBuffer(SOURCE)
+    buffer.edit(4, 4, 4, 4, '$')
+    assert 4 in buffer.errors
+
+    buffer.edit(1, 1, 1, 1, '\n')
+    assert list(buffer.errors) == [5]
+
+    buffer.edit(5, 4, 5, 5, '')
+    assert buffer.errors == {}
+    assert buffer.tokens() == full_scan(buffer.text())
+
+def test_edit_out_of_range():
+    buffer = TokenBuffer(SOURCE)
+    with pytest.raises(IndexError):
+        buffer.edit(10, 1, 10, 1, 'x')
+
+def test_edit_does_not_change_returned_tokens():
+    buffer = TokenBuffer(SOURCE)
+    last = buffer.tokens()[-1]
+    assert buffer.token_index(6) == 17
+
+    buffer.edit(2, 1, 2, 1, '\n\n')
+
+    # Tokens handed out before the edit keep their line; tokens() has the new one
+    assert last.code_index == '6:1'
+    assert buffer.tokens()[-1].code_index == '8:1'
+    assert buffer.tokens() == full_scan(buffer.text())
+    assert buffer.token_index(8) == 17
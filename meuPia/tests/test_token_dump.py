@@ -0,0 +1,75 @@
+import json
+import pytest
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.utils.token_dump import TokenDump, TokenDumpError, convert_to_json, read_tokens, write_tokens
+
+def mock_lexemes(code_lines):
+    all_lexemes = []
+    for i, line in enumerate(code_lines):
+        line_clean, lexemes = scan_line(line, i+1)
+        all_lexemes.extend(lexemes)
+    return all_lexemes
+
+CODE = [
+    'algoritmo "Dump"',
+    'var nome: cadeia',
+    'inicio',
+    '   nome <- "ação"',
+    '   escreva(nome)',
+    'fimalgoritmo'
+]
+
+def test_dump_roundtrip(tmp_path):
+    tokens = mock_lexemes(CODE)
+    dump_path = str(tmp_path / "prog.tkn")
+    write_tokens(dump_path, tokens)
+
+    assert read_tokens(dump_path) == tokens
+
+def test_dump_random_access(tmp_path):
+    tokens = mock_lexemes(CODE)
+    dump_path = str(tmp_path / "prog.tkn")
+    write_tokens(dump_path, tokens)
+
+    with TokenDump(dump_path) as dump:
+        assert len(dump) == len(tokens)
+        assert dump[-1] == tokens[-1]
+        assert dump[9].lexeme == '"ação"'
+        assert dump.string_count < len(tokens)  # Repeated lexemes are stored once
+
+def test_dump_to_json(tmp_path):
+    tokens = mock_lexemes(CODE)
+    dump_path = str(tmp_path / "prog.tkn")
+    json_path = str(tmp_path / "prog.json")
+    write_tokens(dump_path, tokens)
+    convert_to_json(dump_path, json_path)
+
+    with open(json_path, encoding='utf-8') as json_file:
+        assert json.load(json_file) == [token.to_dict() for token in tokens]
+
+def test_dump_rejects_other_files(tmp_path):
+    other = tmp_path / "prog.tem"
+    other.write_text('[]' * 20, encoding='utf-8')
+
+    with pytest.raises(TokenDumpError):
+        TokenDump(str(other))
+
+@pytest.mark.parametrize("size", [0, 3, 23, -5])
+def test_dump_rejects_truncated_files(tmp_path, size):
+    dump_path = tmp_path / "prog.tkn"
+    write_tokens(str(dump_path), mock_lexemes(CODE))
+    data = dump_path.read_bytes()
+    dump_path.write_bytes(data[:size])
+
+    with pytest.raises(TokenDumpError):
+        read_tokens(str(dump_path))
+
+def test_dump_rejects_corrupt_string_table(tmp_path):
+    dump_path = tmp_path / "prog.tkn"
+    write_tokens(str(dump_path), mock_lexemes(CODE))
+    data = bytearray(dump_path.read_bytes())
+    data[24:28] = (10 ** 6).to_bytes(4, 'little') # The first string ends past the blob
+    dump_path.write_bytes(bytes(data))
+
+    with pytest.raises(TokenDumpError):
+        read_tokens(str(dump_path))
@@ -0,0 +1,138 @@
+import ast
+import contextlib
+import io
+import pytest
+from meuPia.analyzers.code_generator import CodeGenerator
+from meuPia.analyzers.lexical_analyzer import scan_line
+from meuPia.analyzers.optimizer import OPTIMIZE_BASIC, Optimizer
+from meuPia.analyzers.python_ast_generator import PythonAstGenerator
+from meuPia.analyzers.syntax_analyzer import Parser
+from meuPia.analyzers.vectorizer import PRELUDE, elementwise_loops
+
+VECTOR_PROGRAM = """algoritmo "Vetor"
+var a, b, v, i, n, k: inteiro
+inicio
+n <- 4
+k <- 3
+a <- [1, 2, 3, 4, 5]
+b <- [10, 20, 30, 40, 50]
+v <- [0, 0, 0, 0, 0]
+para i de 0 ate n faca
+    v[i] <- a[i] * k + b[i]
+    a[i] <- (v[i] - i) * 2
+fim_para
+escreva(v)
+escreva(a)
+escreva(i)
+para i de 1 ate n faca
+    v[i] <- v[i - 1]
+fim_para
+escreva(v)
+fimalgoritmo"""
+
+def parse_snippet(portugol_code):
+    all_lexemes = []
+    for i, line in enumerate(portugol_code.split('\n')):
+        all_lexemes.extend(scan_line(line, i+1)[1])
+    return Parser(all_lexemes).parse()
+
+def run_python(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {'__name__': '__main__'})
+    return output.getvalue()
+
+def test_vectorizer_matches_elementwise_loops_only():
+    program = parse_snippet(VECTOR_PROGRAM)
+    loops = elementwise_loops(program)
+
+    # v[i] <- v[i - 1] depends on the previous iteration
+    assert [loop.node.line for loop in loops.values()] == [9]
+    loop = next(iter(loops.values()))
+    assert loop.lists == ["a", "b", "v"]
+    assert loop.written == ["v", "a"]
+    assert loop.scalars == ["k"]
+
+@pytest.mark.parametrize("body", [
+    "v[i] <- a[i] / 2",        # / is left to Python
+    "v[i] <- a[i + 1]",        # Not the current element
+    "escreva(v[i])",           # Not an assignment
+    "v[i] <- f(a[i])",         # Calls can do anything
+    "v[i] <- a[i] + i * v",    # v is both the list and a scalar
+])
+def test_vectorizer_rejects_other_loops(body):
+    code = VECTOR_PROGRAM.replace("    a[i] <- (v[i] - i) * 2", f"    {body}")
+    assert elementwise_loops(parse_snippet(code)) == {}
+
+def test_vectorizer_keeps_scalar_results():
+    expected = run_python(CodeGenerator(parse_snippet(VECTOR_PROGRAM)).generate())
+    code = CodeGenerator(parse_snippet(VECTOR_PROGRAM), vectorize=True).generate()
+
+    assert "_vetor(_vet_ini, _vet_fim, [a, b, v], [k], lambda _vet_a, _vet_b, _vet_v, _vet_k, _vet_i:" in code
+    assert "_vet_a, _vet_b, _vet_v = _vet_fatias" in code
+    assert "for i in range(_vet_ini, _vet_fim + 1):" in code
+    # Whether NumPy is installed or not, the program prints the same
+    assert run_python(code) == expected == "[13, 26, 39, 52, 65]\n[26, 50, 74, 98, 122]\n4\n[13, 13, 13, 13, 13]\n"
+
+def test_vectorizer_python_ast_matches_text_backend():
+    tree = PythonAstGenerator(parse_snippet(VECTOR_PROGRAM), vectorize=True).generate()
+    expected = ast.parse(CodeGenerator(parse_snippet(VECTOR_PROGRAM), vectorize=True).generate())
+
+    assert ast.dump(tree) == ast.dump(expected)
+    assert run_python(compile(tree, '<vetor>', 'exec')) == run_python(compile(expected, '<vetor>', 'exec'))
+
+def test_vectorizer_bounds_results_to_int64():
+    # v[i] <- a[i] * k + b[i]; a[i] <- (v[i] - i) * 2, bounded from the
+    # largest |a|, |b|, |v|, |k| and |i|. The second statement reads the new v
+    loop = next(iter(elementwise_loops(parse_snippet(VECTOR_PROGRAM)).values()))
+    namespace = {}
+    exec("\n".join(PRELUDE), namespace)
+    bounds = eval(loop.bound_lambda(), namespace)
+
+    assert bounds(5, 50, 0, 3, 4) == [65, 138]
+    assert max(bounds(2 ** 61, 0, 0, 3, 4)) >= 2 ** 63
+    # Multiplying by 0 still bounds the other factor
+    assert bounds(2 ** 62, 0, 0, 0, 4)[0] >= 2 ** 62
+
+def test_vectorizer_large_operands_match_scalar_loop():
+    # Near 2 ** 62, * 3 leaves int64: the vector path must not wrap around
+    code = VECTOR_PROGRAM.replace("a <- [1, 2, 3, 4, 5]", f"a <- [{2 ** 62}, 2, 3, 4, {2 ** 61}]")
+    expected = run_python(CodeGenerator(parse_snippet(code)).generate())
+
+    assert run_python(CodeGenerator(parse_snippet(code), vectorize=True).generate()) == expected
+    assert str(2 ** 62 * 3 + 10) in expected
+
+def test_vectorizer_bounds_folded_negative_literals():
+    # -O1 folds (0 - 4) into -4; its bound is 4, not max(-4, 1)
+    code = """algoritmo "Negativo"
+var a, v, i: inteiro
+inicio
+a <- [4611686018427387904, 3]
+v <- [0, 0]
+para i de 0 ate 1 faca
+    v[i] <- a[i] * (0 - 4)
+fim_para
+escreva(v)
+fimalgoritmo"""
+    program = Optimizer(parse_snippet(code), OPTIMIZE_BASIC).optimize()
+    loop = next(iter(elementwise_loops(program).values()))
+    namespace = {}
+    exec("\n".join(PRELUDE), namespace)
+    assert max(eval(loop.bound_lambda(), namespace)(2 ** 62, 0, 1)) >= 2 ** 63
+
+    expected = run_python(CodeGenerator(parse_snippet(code)).generate())
+    assert expected == "[-18446744073709551616, -12]\n"
+    assert run_python(CodeGenerator(program, vectorize=True).generate()) == expected
+
+def test_vectorizer_long_chains():
+    # 250 terms: neither the walks nor the generated code nest per operator
+    code = VECTOR_PROGRAM.replace("    a[i] <- (v[i] - i) * 2", "    a[i] <- " + " + ".join(["a[i] * k * i - 1"] * 250))
+    loop = next(iter(elementwise_loops(parse_snippet(code)).values()))
+    namespace = {}
+    exec("\n".join(PRELUDE), namespace)
+    assert eval(loop.bound_lambda(), namespace)(5, 50, 0, 3, 4) == [65, 250 * (5 * 3 * 4 + 1)]
+
+    expected = run_python(CodeGenerator(parse_snippet(code)).generate())
+    assert run_python(CodeGenerator(parse_snippet(code), vectorize=True).generate()) == expected
+    assert run_python(PythonAstGenerator(parse_snippet(code), vectorize=True).compile()) == expected
+    assert expected.split("\n")[1] == str([250 * (a * 3 * i - 1) for i, a in enumerate([1, 2, 3, 4, 5])])
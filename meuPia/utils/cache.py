@@ -0,0 +1,115 @@
+import hashlib
+import os
+import tempfile
+import time
+from typing import Optional, Union
+
+# ----------------
+# Content-addressed file cache: every entry is one file named after the
+# SHA-256 of its key parts. Writes go to a temporary file that is renamed into
+# place, so a crashed or concurrent compile never leaves a partial entry.
+# Reading an entry refreshes its mtime. Entries unused for more than
+# `max_age` seconds are removed, and when the directory grows past `max_bytes`
+# the least recently used ones go first. `hits` and `misses` count the lookups
+# made through this instance.
+# ----------------
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60 # 30 days
+ENTRY_SUFFIX = '.mpc'
+
+def default_cache_dir() -> str:
+  return os.environ.get('MEUPIA_CACHE') or os.path.join(os.path.expanduser('~'), '.cache', 'meupia')
+
+def content_key(*parts: Union[str, bytes]) -> str:
+  digest = hashlib.sha256()
+  for part in parts:
+    if isinstance(part, str):
+      part = part.encode('utf-8')
+    # Length prefix, so ('ab', 'c') and ('a', 'bc') do not collide
+    digest.update(len(part).to_bytes(8, 'little'))
+    digest.update(part)
+  return digest.hexdigest()
+
+class ContentCache:
+  def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES,
+               max_age: Optional[float] = DEFAULT_MAX_AGE):
+    self.directory = directory or default_cache_dir()
+    self.max_bytes = max_bytes
+    self.max_age = max_age # None: entries never expire
+    self.hits = 0
+    self.misses = 0
+
+  def path(self, key: str) -> str:
+    return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+  def get(self, key: str, count: bool = True) -> Optional[bytes]:
+    # `count`: False for bookkeeping reads that are not a compile lookup
+    path = self.path(key)
+    try:
+      with open(path, 'rb') as file:
+        data = file.read()
+      os.utime(path)
+    except OSError:
+      data = None
+    if count:
+      if data is None:
+        self.misses += 1
+      else:
+        self.hits += 1
+    return data
+
+  def put(self, key: str, data: bytes):
+    os.makedirs(self.directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+    try:
+      with os.fdopen(descriptor, 'wb') as file:
+        file.write(data)
+      os.replace(temporary, self.path(key))
+    except BaseException:
+      try:
+        os.unlink(temporary)
+      except OSError:
+        pass
+      raise
+
+    self.evict()
+
+  def evict(self):
+    entries = []
+    total = 0
+    try:
+      names = os.listdir(self.directory)
+    except OSError:
+      return
+    expired = time.time() - self.max_age if self.max_age is not None else None
+
+    for name in names:
+      if not name.endswith(ENTRY_SUFFIX):
+        continue
+      try:
+        stat = os.stat(os.path.join(self.directory, name))
+      except OSError:
+        continue
+      if expired is not None and stat.st_mtime < expired:
+        try:
+          os.unlink(os.path.join(self.directory, name))
+        except OSError:
+          pass
+        continue
+      entries.append((stat.st_mtime, stat.st_size, name))
+      total += stat.st_size
+
+    entries.sort()
+    for _, size, name in entries:
+      if total <= self.max_bytes:
+        break
+      try:
+        os.unlink(os.path.join(self.directory, name))
+      except OSError:
+        pass
+      total -= size
+
+  def clear(self):
+    for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+      if name.endswith(ENTRY_SUFFIX):
+        os.unlink(os.path.join(self.directory, name))
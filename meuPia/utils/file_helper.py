@@ -1,5 +1,38 @@
 import os
+from array import array
+from typing import Iterator, Optional
 
 def read_lines_from_file(file_path):
   with open(file_path, 'r', encoding='utf-8') as file:
     return file.readlines()
+
+class LineIndex:
+  # Byte offset of every line read so far, so a single source line can be
+  # fetched again for error reporting without keeping the file in memory.
+  def __init__(self, file_path: str):
+    self.file_path = file_path
+    self.offsets = array('Q')
+
+  def __len__(self) -> int:
+    return len(self.offsets)
+
+  def add(self, offset: int):
+    self.offsets.append(offset)
+
+  def line_text(self, line_number: int) -> Optional[str]:
+    if not 1 <= line_number <= len(self.offsets):
+      return None
+
+    with open(self.file_path, 'rb') as file:
+      file.seek(self.offsets[line_number - 1])
+      return file.readline().decode('utf-8').rstrip('\r\n')
+
+def iter_lines_from_file(file_path, line_index: Optional[LineIndex] = None) -> Iterator[str]:
+  # Buffered, line-at-a-time reading; offsets are recorded before each line is yielded
+  offset = 0
+  with open(file_path, 'rb') as file:
+    for raw_line in file:
+      if line_index is not None:
+        line_index.add(offset)
+      offset += len(raw_line)
+      yield raw_line.decode('utf-8')
@@ -0,0 +1,158 @@
+import json
+import os
+from importlib import metadata, util
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .cache import ContentCache, content_key
+
+# ----------------
+# Where each `usar "nome"` plugin lives and which functions it exports.
+#
+# The module comes from the plugin's entry point in the `meupia.plugins` group
+# (name = plugin, value = module), or from the bundled defaults below, or is
+# meupia_<nome>. A plugin package publishes its functions in a manifest,
+# meupia_plugin.json next to its __init__.py:
+#
+#   {"modulo": "meupia_ia.plugin_ia",
+#    "funcoes": {"ia_treinar": 0, "ia_prever": 1, "ia_log": [1, null]}}
+#
+# An arity is an exact count or [min, max], max null for any number. Nothing
+# is imported to find or read a manifest. Plugins without one keep the
+# `import *` and get no compile-time checks.
+#
+# Resolved plugins are kept in an index stored in the compiler's cache and
+# reused while the manifest file is unchanged (same path, size and mtime).
+# ----------------
+ENTRY_POINT_GROUP = 'meupia.plugins'
+MANIFEST_FILE = 'meupia_plugin.json'
+
+BUNDLED_PLUGINS = {
+  'ia': 'meupia_ia.plugin_ia',
+  'maker': 'meupia_maker.plugin_iot',
+  'espacial': 'meupia_espacial.plugin_ksp',
+}
+
+INDEX_KEY = content_key('plugin-index', '1')
+
+Arity = Tuple[int, Optional[int]] # (min, max); max None: any number
+
+class PluginManifestError(ValueError):
+  pass
+
+class PluginInfo(NamedTuple):
+  name: str
+  module: str
+  functions: Optional[Dict[str, Arity]] = None # None: no manifest
+
+  def import_line(self, called: Iterable[str] = ()) -> str:
+    # The called functions by name when the manifest lists them, else import *
+    if self.functions is None:
+      return f'from {self.module} import *'
+    names = [name for name in called if name in self.functions]
+    return f'from {self.module} import {", ".join(names)}' if names else f'import {self.module}'
+
+def default_module(name: str) -> str:
+  return BUNDLED_PLUGINS.get(name, f'meupia_{name}')
+
+def parse_arity(value) -> Arity:
+  if type(value) is int and value >= 0:
+    return (value, value)
+  if (isinstance(value, list) and len(value) == 2 and type(value[0]) is int and 0 <= value[0]
+      and (value[1] is None or (type(value[1]) is int and value[1] >= value[0]))):
+    return (value[0], value[1])
+  raise PluginManifestError(f'invalid arity {value!r}')
+
+def read_manifest(path: str, module: str) -> Tuple[str, Dict[str, Arity]]:
+  try:
+    with open(path, encoding='utf-8') as file:
+      data = json.load(file)
+    functions = {name: parse_arity(arity) for name, arity in data['funcoes'].items()}
+    return data.get('modulo', module), functions
+  except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+    raise PluginManifestError(f'Invalid plugin manifest {path}: {error}') from error
+
+def manifest_path(module: str) -> Optional[str]:
+  # Next to the top-level package's __init__.py; find_spec runs no plugin code
+  try:
+    spec = util.find_spec(module.split('.')[0])
+  except (ImportError, ValueError):
+    return None
+  if spec is None or not spec.submodule_search_locations:
+    return None
+  path = os.path.join(list(spec.submodule_search_locations)[0], MANIFEST_FILE)
+  return path if os.path.isfile(path) else None
+
+def file_signature(path: str) -> Optional[List[int]]:
+  try:
+    stat = os.stat(path)
+  except OSError:
+    return None
+  return [stat.st_size, stat.st_mtime_ns]
+
+class PluginIndex:
+  def __init__(self, cache: Optional[ContentCache] = None):
+    self.cache = cache
+    self.resolved: Dict[str, PluginInfo] = {}
+    self.entry_points: Optional[Dict[str, str]] = None
+    self.stored: Optional[dict] = None
+
+  def lookup(self, name: str) -> PluginInfo:
+    info = self.resolved.get(name)
+    if info is None:
+      info = self.load_stored(name) or self.resolve(name)
+      self.resolved[name] = info
+    return info
+
+  def plugins(self, names: Iterable[str]) -> Dict[str, PluginInfo]:
+    return {name: self.lookup(name) for name in names}
+
+  def resolve(self, name: str) -> PluginInfo:
+    module = self.entry_point_modules().get(name) or default_module(name)
+    path = manifest_path(module)
+    if path is None:
+      return PluginInfo(name, module)
+
+    signature = file_signature(path)
+    module, functions = read_manifest(path, module)
+    info = PluginInfo(name, module, functions)
+    self.store(name, info, path, signature)
+    return info
+
+  def entry_point_modules(self) -> Dict[str, str]:
+    # Scanning the installed distributions is the slow part: once per index
+    if self.entry_points is None:
+      self.entry_points = {entry.name: entry.value for entry in metadata.entry_points(group=ENTRY_POINT_GROUP)}
+    return self.entry_points
+
+  # ----------------
+  # Persistent index
+  # ----------------
+  def stored_entries(self) -> dict:
+    if self.stored is None:
+      self.stored = {}
+      data = self.cache.get(INDEX_KEY, count=False) if self.cache is not None else None
+      if data is not None:
+        try:
+          self.stored = json.loads(data)
+        except ValueError:
+          pass # Damaged index: rebuilt as plugins are resolved
+    return self.stored
+
+  def load_stored(self, name: str) -> Optional[PluginInfo]:
+    entry = self.stored_entries().get(name)
+    if entry is None or file_signature(entry['manifesto']) != entry['assinatura']:
+      return None
+    functions = {function: (arity[0], arity[1]) for function, arity in entry['funcoes'].items()}
+    return PluginInfo(name, entry['modulo'], functions)
+
+  def store(self, name: str, info: PluginInfo, path: str, signature: Optional[List[int]]):
+    if self.cache is None or signature is None:
+      return
+    entries = self.stored_entries()
+    entries[name] = {
+      'modulo': info.module,
+      'manifesto': path,
+      'assinatura': signature,
+      'funcoes': {function: list(arity) for function, arity in info.functions.items()},
+    }
+    self.cache.put(INDEX_KEY, json.dumps(entries, sort_keys=True).encode('utf-8'))
@@ -0,0 +1,96 @@
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+# ----------------
+# Per-line profiler for compiled Portugol programs. A sys.settrace hook traces
+# only the frames of the program's own code (plugins and the standard library
+# run untraced) and charges the time between two line events to the first
+# one, so a line's time includes the calls it makes. The tracer's own work is
+# left out of the measure.
+#
+# Python lines are turned into Portugol lines with a source map (see
+# CodeGenerator.source_map); code objects built by PythonAstGenerator already
+# carry Portugol lines and need none. Consecutive events of the same Portugol
+# line (a statement generated as several Python lines) count as one hit.
+# ----------------
+DEFAULT_TOP = 10
+
+class LineStats(NamedTuple):
+  line: int # Portugol line
+  hits: int
+  seconds: float
+
+class LineProfiler:
+  def __init__(self, filename: str, source_map: Optional[List[Optional[int]]] = None):
+    self.filename = filename
+    self.source_map = source_map
+    self.hits: Dict[int, int] = {}
+    self.seconds: Dict[int, float] = {}
+
+  def run(self, code, namespace: dict):
+    previous = sys.gettrace()
+    sys.settrace(self.trace_call)
+    try:
+      exec(code, namespace)
+    finally:
+      sys.settrace(previous)
+
+  def portugol_line(self, python_line: int) -> Optional[int]:
+    if self.source_map is None:
+      return python_line
+    return self.source_map[python_line - 1] if 0 < python_line <= len(self.source_map) else None
+
+  def trace_call(self, frame, event, arg):
+    # The module body only defines main() and calls it; its call line would
+    # hold the whole run
+    code = frame.f_code
+    if code.co_filename != self.filename or code.co_name == '<module>':
+      return None
+
+    hits, seconds, portugol_line, clock = self.hits, self.seconds, self.portugol_line, time.perf_counter
+    current = None
+    started = 0.0
+
+    def trace_line(frame, event, arg):
+      nonlocal current, started
+      now = clock()
+      if current is not None:
+        seconds[current] = seconds.get(current, 0.0) + now - started
+
+      if event == 'line':
+        line = portugol_line(frame.f_lineno)
+        if line is not None and line != current:
+          hits[line] = hits.get(line, 0) + 1
+        current = line if line is not None else current
+      elif event == 'return':
+        current = None
+      started = clock()
+      return trace_line
+
+    return trace_line
+
+  def stats(self) -> List[LineStats]:
+    # Every line that ran, in source order
+    return [LineStats(line, hits, self.seconds.get(line, 0.0)) for line, hits in sorted(self.hits.items())]
+
+  def report(self, source_lines: List[str], top: int = DEFAULT_TOP) -> str:
+    stats = self.stats()
+    total = sum(entry.seconds for entry in stats) or 1.0
+
+    def text(line):
+      return source_lines[line - 1].strip() if 0 < line <= len(source_lines) else ''
+
+    lines = ['[PERFIL] tempo acumulado por linha do Portugol',
+             f'{"linha":>6} {"execuções":>10} {"tempo (ms)":>11} {"%":>6}  código']
+    for entry in stats:
+      lines.append(f'{entry.line:>6} {entry.hits:>10} {entry.seconds * 1000:>11.3f} '
+                   f'{entry.seconds / total:>6.1%}  {text(entry.line)}')
+
+    hottest = sorted(stats, key=lambda entry: entry.seconds, reverse=True)[:top]
+    lines.append('')
+    lines.append(f'[PERFIL] {len(hottest)} linha(s) mais lenta(s)')
+    for position, entry in enumerate(hottest, 1):
+      lines.append(f'{position:>3}. linha {entry.line}: {entry.seconds / total:.1%} '
+                   f'({entry.seconds * 1000:.3f} ms, {entry.hits} execuções)  {text(entry.line)}')
+    return '\n'.join(lines)
@@ -0,0 +1,75 @@
+from typing import Dict, Optional
+
+from .token_enum import TOKEN_KINDS, TOKEN_NAMES
+
+class Token:
+  # Compact token: integer kind (see TokenKind), interned lexeme and integer
+  # 1-based line/column. It also behaves as a read-only dict with the keys
+  # 'token', 'lexeme' and 'code_index' used by the JSON artifacts.
+  __slots__ = ('kind', 'lexeme', 'line', 'col')
+
+  KEYS = ('token', 'lexeme', 'code_index')
+
+  def __init__(self, kind: int, lexeme: str, line: int, col: int):
+    self.kind = kind
+    self.lexeme = lexeme
+    self.line = line
+    self.col = col
+
+  @property
+  def name(self) -> str:
+    return TOKEN_NAMES[self.kind]
+
+  @property
+  def code_index(self) -> str:
+    return f'{self.line}:{self.col}'
+
+  @classmethod
+  def from_dict(cls, data: Dict[str, str]) -> 'Token':
+    line, col = data['code_index'].split(':')
+    return cls(TOKEN_KINDS[data['token']], data['lexeme'], int(line), int(col))
+
+  def to_dict(self) -> Dict[str, str]:
+    return {'token': self.name, 'lexeme': self.lexeme, 'code_index': self.code_index}
+
+  # ----------------
+  # Dict-compatible view
+  # ----------------
+  def __getitem__(self, key: str) -> str:
+    if key == 'token':
+      return self.name
+    if key == 'lexeme':
+      return self.lexeme
+    if key == 'code_index':
+      return self.code_index
+
+    raise KeyError(key)
+
+  def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+    try:
+      return self[key]
+    except KeyError:
+      return default
+
+  def keys(self):
+    return self.KEYS
+
+  def items(self):
+    return [(key, self[key]) for key in self.KEYS]
+
+  def __iter__(self):
+    return iter(self.KEYS)
+
+  def __eq__(self, other) -> bool:
+    if isinstance(other, Token):
+      return (self.kind, self.lexeme, self.line, self.col) == (other.kind, other.lexeme, other.line, other.col)
+    if isinstance(other, dict):
+      return self.to_dict() == other
+
+    return NotImplemented
+
+  def __hash__(self) -> int:
+    return hash((self.kind, self.lexeme, self.line, self.col))
+
+  def __repr__(self) -> str:
+    return f'Token({self.name}, {self.lexeme!r}, {self.code_index})'
@@ -0,0 +1,169 @@
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, List
+
+from .token import Token
+
+# Binary token stream (.tkn), little-endian:
+#
+#   header   magic, version, record size, string count, token count, blob size
+#   offsets  uint32[string count + 1], start of each string inside the blob
+#   blob     interned lexemes as UTF-8, padded to 4 bytes
+#   records  uint32[token count * 4], (kind, string id, line, col) per token
+#
+# Every section is 4-byte aligned, so the file can be memory-mapped and the
+# offsets/records read in place.
+MAGIC = b'MPTK'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIII')
+RECORD_FIELDS = 4
+RECORD_SIZE = RECORD_FIELDS * 4
+
+class TokenDumpError(Exception):
+  pass
+
+def write_tokens(file_path: str, tokens: Iterable[Token]):
+  string_ids = {}
+  strings = []
+  records = array('I')
+
+  for token in tokens:
+    string_id = string_ids.get(token.lexeme)
+    if string_id is None:
+      string_id = string_ids[token.lexeme] = len(strings)
+      strings.append(token.lexeme.encode('utf-8'))
+    records.extend((token.kind, string_id, token.line, token.col))
+
+  offsets = array('I', [0])
+  for encoded in strings:
+    offsets.append(offsets[-1] + len(encoded))
+  blob = b''.join(strings)
+  blob += b'\0' * (-len(blob) % 4)
+
+  if sys.byteorder != 'little':
+    offsets.byteswap()
+    records.byteswap()
+
+  with open(file_path, 'wb') as dump_file:
+    dump_file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, len(strings), len(records) // RECORD_FIELDS, len(blob)))
+    dump_file.write(offsets.tobytes())
+    dump_file.write(blob)
+    dump_file.write(records.tobytes())
+
+class TokenDump:
+  # Memory-mapped reader: tokens are decoded on access, so tools can index or
+  # slice a large dump without loading it whole.
+  def __init__(self, file_path: str):
+    self.file_path = file_path
+    self.file = open(file_path, 'rb')
+    try:
+      self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+      self.file.close()
+      raise TokenDumpError(f'Empty token dump "{file_path}"')
+
+    if len(self.buffer) < HEADER.size:
+      self.close()
+      raise TokenDumpError(f'Truncated token dump "{file_path}"')
+
+    (magic, version, record_size, self.string_count, self.token_count, blob_size) = HEADER.unpack_from(self.buffer)
+    if magic != MAGIC:
+      self.close()
+      raise TokenDumpError(f'"{file_path}" is not a meuPia token dump')
+    if version != VERSION or record_size != RECORD_SIZE:
+      self.close()
+      raise TokenDumpError(f'Unsupported token dump version {version} in "{file_path}"')
+
+    offsets_start = HEADER.size
+    self.blob_start = offsets_start + (self.string_count + 1) * 4
+    records_start = self.blob_start + blob_size
+    records_end = records_start + self.token_count * RECORD_SIZE
+    if records_end > len(self.buffer):
+      self.close()
+      raise TokenDumpError(f'Truncated token dump "{file_path}"')
+
+    self.offsets = self.read_words(offsets_start, self.blob_start)
+    self.records = self.read_words(records_start, records_end)
+    self.strings = [None] * self.string_count
+    # The strings must lie inside the blob; each one is checked again when read
+    if self.offsets[0] != 0 or self.offsets[self.string_count] > blob_size:
+      self.close()
+      raise TokenDumpError(f'Corrupt string table in token dump "{file_path}"')
+    self.blob_size = blob_size
+
+  def read_words(self, start: int, end: int):
+    if sys.byteorder == 'little':
+      return memoryview(self.buffer)[start:end].cast('I')
+
+    words = array('I', self.buffer[start:end])
+    words.byteswap()
+    return words
+
+  def string(self, string_id: int) -> str:
+    if string_id >= self.string_count:
+      raise TokenDumpError(f'String id {string_id} out of range in token dump "{self.file_path}"')
+    text = self.strings[string_id]
+    if text is None:
+      start = self.offsets[string_id]
+      end = self.offsets[string_id + 1]
+      if not start <= end <= self.blob_size:
+        raise TokenDumpError(f'Corrupt string table in token dump "{self.file_path}"')
+      start += self.blob_start
+      end += self.blob_start
+      text = self.strings[string_id] = sys.intern(self.buffer[start:end].decode('utf-8'))
+    return text
+
+  def __len__(self) -> int:
+    return self.token_count
+
+  def __getitem__(self, index: int) -> Token:
+    if index < 0:
+      index += self.token_count
+    if not 0 <= index < self.token_count:
+      raise IndexError('token index out of range')
+
+    base = index * RECORD_FIELDS
+    records = self.records
+    return Token(records[base], self.string(records[base + 1]), records[base + 2], records[base + 3])
+
+  def __iter__(self) -> Iterator[Token]:
+    for index in range(self.token_count):
+      yield self[index]
+
+  def close(self):
+    # memoryviews must be released before the map can be closed
+    for view in (getattr(self, 'offsets', None), getattr(self, 'records', None)):
+      if isinstance(view, memoryview):
+        view.release()
+    self.buffer.close()
+    self.file.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+def read_tokens(file_path: str) -> List[Token]:
+  with TokenDump(file_path) as dump:
+    return list(dump)
+
+def convert_to_json(file_path: str, json_path: str):
+  # Same layout as the <file>_lexic-lexems.tem JSON artifact
+  with TokenDump(file_path) as dump, open(json_path, 'w', encoding='utf-8') as json_file:
+    json.dump([token.to_dict() for token in dump], json_file, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Converte um dump binário de tokens (.tkn) para o JSON legível")
+  parser.add_argument("entrada", help="Arquivo .tkn gerado pelo compilador")
+  parser.add_argument("saida", nargs="?", help="Arquivo JSON de saída (padrão: <entrada>.json)")
+  args = parser.parse_args(argv)
+
+  convert_to_json(args.entrada, args.saida or f'{args.entrada}.json')
+
+if __name__ == "__main__":
+  main()
@@ -47,3 +47,15 @@ class TokenEnum(Enum):
   FIMALGORITMO = 'fimalgoritmo'
   USAR = 'usar'
   END_OF_FILE = '__EOF__'
+
+# Integer token kinds for the compact token stream, numbered in TokenEnum order.
+# A plain class (not an Enum) keeps attribute lookups on the analyzers' hot path cheap.
+class TokenKind:
+  pass
+
+TOKEN_NAMES = tuple(token.name for token in TokenEnum)
+TOKEN_VALUES = tuple(token.value for token in TokenEnum)
+TOKEN_KINDS = {name: kind for kind, name in enumerate(TOKEN_NAMES)}
+
+for kind, token_name in enumerate(TOKEN_NAMES):
+  setattr(TokenKind, token_name, kind)
@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Iterable, Optional
+
+from .token import Token
+
+class TokenStream:
+  # Pulls tokens lazily from any iterable (a list or a lexer generator) and
+  # keeps only a bounded lookahead window in memory.
+  def __init__(self, tokens: Iterable[Token], lookahead: int = 2):
+    self.source = iter(tokens)
+    self.window = deque()
+    self.lookahead = lookahead
+    self.last = None # Last token pulled from the source, used for EOF errors
+    self.position = 0
+
+  def fill(self, size: int) -> bool:
+    while len(self.window) < size:
+      token = next(self.source, None)
+      if token is None:
+        return False
+      self.window.append(token)
+      self.last = token
+
+    return True
+
+  def peek(self, offset: int = 0) -> Optional[Token]:
+    if offset >= self.lookahead:
+      raise IndexError(f'Lookahead {offset} exceeds window of {self.lookahead} tokens')
+
+    if len(self.window) > offset or self.fill(offset + 1):
+      return self.window[offset]
+
+    return None
+
+  def current(self) -> Optional[Token]:
+    # Hot path for the parser: the window is almost never empty
+    if self.window:
+      return self.window[0]
+
+    return self.peek(0)
+
+  def advance(self):
+    if self.window or self.fill(1):
+      self.window.popleft()
+      self.position += 1
+
+  def at_end(self) -> bool:
+    return self.current() is None
+
+  def last_code_index(self) -> str:
+    if self.last is None:
+      return 'unknown'
+
+    return self.last.code_index
+
+def as_token_stream(tokens, lookahead: int = 2) -> TokenStream:
+  if isinstance(tokens, TokenStream):
+    return tokens
+
+  return TokenStream(tokens, lookahead)
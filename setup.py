@@ -11,7 +11,8 @@ setup(
     entry_points={
         'console_scripts': [
             'mpgp=meuPia.tools.mpgp:main',
-            'meupia=meuPia.compiler:main',
+            'meupia=meuPia.compiler:cli',
+            'meupia-lote=meuPia.batch:cli',
         ],
     },
 )
\ No newline at end of file